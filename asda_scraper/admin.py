@@ -8,7 +8,10 @@ import logging
 from django.contrib import admin
 from django.utils.html import format_html
 from django.db.models import Count, Q
-from .models import Category, Product, NutritionInfo, CrawlSession, CrawledURL, CrawlQueue
+from .models import (
+    Category, Product, NutritionInfo, CrawlSession, CrawledURL, CrawlQueue,
+    IngredientProductMatch
+)
 
 logger = logging.getLogger(__name__)
 
@@ -195,4 +198,22 @@ class CrawlQueueAdmin(admin.ModelAdmin):
     def url_preview(self, obj):
         """Show truncated URL."""
         return obj.url[:80] + '...' if len(obj.url) > 80 else obj.url
-    url_preview.short_description = 'URL'
\ No newline at end of file
+    url_preview.short_description = 'URL'
+
+
+@admin.register(IngredientProductMatch)
+class IngredientProductMatchAdmin(admin.ModelAdmin):
+    """Admin interface for IngredientProductMatch model."""
+
+    list_display = [
+        'normalized_name',
+        'ingredient',
+        'product',
+        'score',
+        'matched_at'
+    ]
+    list_filter = ['matched_at']
+    search_fields = ['normalized_name', 'product__name']
+    raw_id_fields = ['ingredient', 'product']
+    readonly_fields = ['matched_at']
+    ordering = ['normalized_name', '-score']
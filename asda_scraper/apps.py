@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AsdaScraperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'asda_scraper'
+
+    def ready(self):
+        """Import signal handlers when app is ready."""
+        import asda_scraper.signals
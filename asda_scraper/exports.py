@@ -0,0 +1,278 @@
+"""
+Streaming catalogue export.
+
+Streams every product joined with its nutrition data and category names
+as CSV, NDJSON or Parquet. Rows are read through a server-side cursor and
+encoded chunk by chunk, so memory use does not grow with catalogue size.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import OuterRef, Subquery
+
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'parquet')
+COMPRESSIONS = ('zstd',)
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+CATEGORY_DELIMITER = '|'
+
+# (column name, ORM lookup, Parquet type)
+EXPORT_COLUMNS = [
+    ('id', 'id', 'int64'),
+    ('asda_id', 'asda_id', 'string'),
+    ('name', 'name', 'string'),
+    ('brand', 'brand', 'string'),
+    ('price', 'price', 'decimal'),
+    ('price_per_unit', 'price_per_unit', 'string'),
+    ('on_offer', 'on_offer', 'bool'),
+    ('offer_text', 'offer_text', 'string'),
+    ('is_available', 'is_available', 'bool'),
+    ('categories', 'category_names', 'string'),
+    ('url', 'url', 'string'),
+    ('image_url', 'image_url', 'string'),
+    ('energy_kj', 'nutrition__energy_kj', 'int64'),
+    ('energy_kcal', 'nutrition__energy_kcal', 'int64'),
+    ('fat', 'nutrition__fat', 'decimal'),
+    ('saturated_fat', 'nutrition__saturated_fat', 'decimal'),
+    ('carbohydrates', 'nutrition__carbohydrates', 'decimal'),
+    ('sugars', 'nutrition__sugars', 'decimal'),
+    ('fibre', 'nutrition__fibre', 'decimal'),
+    ('protein', 'nutrition__protein', 'decimal'),
+    ('salt', 'nutrition__salt', 'decimal'),
+    ('last_scraped', 'last_scraped', 'timestamp'),
+    ('updated_at', 'updated_at', 'timestamp'),
+]
+
+COLUMN_NAMES = [name for name, _, _ in EXPORT_COLUMNS]
+
+
+def get_chunk_size() -> int:
+    """Rows fetched per cursor round trip, from ASDA_SCRAPER_SETTINGS."""
+    return getattr(settings, 'ASDA_SCRAPER_SETTINGS', {}).get('EXPORT_CHUNK_SIZE', 2000)
+
+
+def content_type_for(export_format: str, compression: Optional[str] = None) -> str:
+    """Return the HTTP content type for an export."""
+    if compression == 'zstd' and export_format != 'parquet':
+        return 'application/zstd'
+    return CONTENT_TYPES[export_format]
+
+
+def filename_for(export_format: str, compression: Optional[str] = None) -> str:
+    """Return a dated download filename for an export."""
+    name = f"asda_products_{datetime.now():%Y%m%d}.{export_format}"
+    if compression == 'zstd' and export_format != 'parquet':
+        name += '.zst'
+    return name
+
+
+def iter_product_rows(chunk_size: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    Yield one tuple per product in ``EXPORT_COLUMNS`` order.
+
+    Category names are aggregated by a correlated subquery so the main
+    query needs no GROUP BY and rows stream as soon as the cursor opens.
+
+    Args:
+        chunk_size: Rows fetched per server-side cursor round trip
+
+    Yields:
+        tuple: Column values for one product
+    """
+    through = Product.categories.through
+    category_names = through.objects.filter(
+        product_id=OuterRef('pk')
+    ).values('product_id').annotate(
+        names=StringAgg(
+            'category__name',
+            delimiter=CATEGORY_DELIMITER,
+            ordering='category__name',
+        )
+    ).values('names')
+
+    queryset = Product.objects.annotate(
+        category_names=Subquery(category_names)
+    ).order_by('pk').values_list(*[lookup for _, lookup, _ in EXPORT_COLUMNS])
+
+    yield from queryset.iterator(chunk_size=chunk_size or get_chunk_size())
+
+
+def _chunked(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    """Group rows into lists of at most ``size``."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _json_value(value):
+    """Convert a database value to a JSON-serialisable value."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _encode_csv(chunks: Iterator[List[Tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as CSV, header first."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMN_NAMES)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _encode_ndjson(chunks: Iterator[List[Tuple]]) -> Iterator[bytes]:
+    """Encode row chunks as newline-delimited JSON objects."""
+    for chunk in chunks:
+        lines = [
+            json.dumps(
+                {name: _json_value(value) for name, value in zip(COLUMN_NAMES, row)},
+                ensure_ascii=False,
+            )
+            for row in chunk
+        ]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class _ByteSink:
+    """Minimal writable file that hands written bytes back to a generator."""
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+
+def _encode_parquet(
+    chunks: Iterator[List[Tuple]],
+    compression: Optional[str] = None
+) -> Iterator[bytes]:
+    """
+    Encode row chunks as Parquet, one row group per chunk.
+
+    Requires pyarrow. Compression is applied inside the file (per column
+    chunk) rather than around it, so readers can still seek row groups.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    types = {
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'decimal': pa.decimal128(10, 2),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    schema = pa.schema([(name, types[kind]) for name, _, kind in EXPORT_COLUMNS])
+
+    sink = _ByteSink()
+    writer = pq.ParquetWriter(
+        pa.PythonFile(sink, mode='w'),
+        schema,
+        compression=compression or 'snappy',
+    )
+    try:
+        for chunk in chunks:
+            columns = list(zip(*chunk))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                schema=schema,
+            ))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _zstd_stream(parts: Iterator[bytes]) -> Iterator[bytes]:
+    """Compress a byte stream with zstd as it is produced."""
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for part in parts:
+        data = compressor.compress(part)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    export_format: str = 'csv',
+    compression: Optional[str] = None,
+    chunk_size: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Stream the product catalogue as encoded bytes.
+
+    Args:
+        export_format: One of ``EXPORT_FORMATS``
+        compression: 'zstd' or None
+        chunk_size: Rows per cursor round trip and per encoded chunk
+
+    Yields:
+        bytes: Successive pieces of the export file
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    if compression and compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression: {compression}")
+
+    chunk_size = chunk_size or get_chunk_size()
+    chunks = _chunked(iter_product_rows(chunk_size), chunk_size)
+
+    logger.info(f"Starting catalogue export: format={export_format}, compression={compression}")
+
+    if export_format == 'parquet':
+        return _encode_parquet(chunks, compression)
+
+    encoded = _encode_csv(chunks) if export_format == 'csv' else _encode_ndjson(chunks)
+    if compression == 'zstd':
+        return _zstd_stream(encoded)
+    return encoded
@@ -0,0 +1,76 @@
+"""
+Django management command to export the product catalogue.
+
+Usage:
+    python manage.py export_products [--format csv|ndjson|parquet]
+        [--compress zstd] [--output PATH] [--chunk-size N]
+"""
+
+import logging
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from asda_scraper.exports import COMPRESSIONS, EXPORT_FORMATS, filename_for, stream_export
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to stream products with nutrition to a file."""
+
+    help = 'Export products with nutrition and categories as CSV, NDJSON or Parquet'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='csv',
+            help='Output format (default: csv)',
+        )
+        parser.add_argument(
+            '--compress',
+            choices=COMPRESSIONS,
+            help='Compress the output (Parquet compresses internally)',
+        )
+        parser.add_argument(
+            '--output',
+            help="Output file path; '-' for stdout (default: dated file in the current directory)",
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Rows fetched per database round trip',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        export_format = options['format']
+        compression = options['compress']
+        output = options['output'] or filename_for(export_format, compression)
+
+        started = time.monotonic()
+        written = 0
+        try:
+            parts = stream_export(export_format, compression, options['chunk_size'])
+            if output == '-':
+                for part in parts:
+                    sys.stdout.buffer.write(part)
+                    written += len(part)
+                sys.stdout.buffer.flush()
+            else:
+                with open(output, 'wb') as handle:
+                    for part in parts:
+                        handle.write(part)
+                        written += len(part)
+        except (RuntimeError, ValueError, OSError) as e:
+            logger.error(f"Catalogue export failed: {str(e)}")
+            raise CommandError(str(e))
+
+        if output != '-':
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {written / 1024:.1f} KiB to {output} "
+                f"in {time.monotonic() - started:.1f}s"
+            ))
@@ -0,0 +1,77 @@
+"""
+Django management command to build the ingredient-to-product match index.
+
+Usage:
+    python manage.py match_ingredients [--rematch] [--threshold N]
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from asda_scraper.matching import match_ingredients, match_new_products
+from asda_scraper.models import IngredientProductMatch, Product
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to match recipe ingredients to ASDA products."""
+
+    help = 'Match recipe ingredients to ASDA products and store the best matches'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--rematch',
+            action='store_true',
+            help='Re-score every ingredient instead of only unmatched ones',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            help='Minimum match score (0-100) for linking a product',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Number of ingredients processed per batch',
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handle the command execution.
+
+        Matches unmatched ingredients, then re-scores stored matches against
+        products scraped since the previous run.
+        """
+        last_run = IngredientProductMatch.objects.aggregate(
+            latest=Max('matched_at')
+        )['latest']
+
+        self.stdout.write("Matching ingredients to ASDA products...")
+        stats = match_ingredients(
+            rematch=options['rematch'],
+            threshold=options['threshold'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingredients: {stats['processed']} processed, {stats['matched']} matched, "
+            f"{stats['reused']} names reused, {stats['unmatched']} unmatched"
+        ))
+
+        if last_run and not options['rematch']:
+            new_products = list(
+                Product.objects.filter(
+                    updated_at__gt=last_run, is_available=True
+                ).values_list('id', flat=True)
+            )
+            if new_products:
+                self.stdout.write(f"Re-scoring against {len(new_products)} new products...")
+                product_stats = match_new_products(
+                    new_products, threshold=options['threshold']
+                )
+                self.stdout.write(self.style.SUCCESS(
+                    f"Products: {product_stats['candidates']} candidate names, "
+                    f"{product_stats['rows_updated']} matches improved"
+                ))
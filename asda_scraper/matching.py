@@ -0,0 +1,424 @@
+"""
+Ingredient to ASDA product matching engine.
+
+Normalizes recipe ingredient names and scraped product names in batch,
+scores candidates with RapidFuzz's vectorized ``process.cdist`` over
+token-blocked candidate sets and persists the best product per ingredient
+in ``IngredientProductMatch``. Request-time code reads the stored matches
+through ``Ingredient.product_match`` and never runs fuzzy matching itself.
+"""
+
+import logging
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from django.dispatch import Signal
+from django.utils import timezone
+from rapidfuzz import fuzz, process
+
+from .models import IngredientProductMatch, Product
+
+logger = logging.getLogger(__name__)
+
+# Words that describe preparation, packaging or branding rather than the
+# product itself. They are dropped before scoring.
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'or', 'of', 'the', 'for', 'with', 'in', 'to', 'per',
+    'asda', 'extra', 'special', 'smart', 'price', 'just', 'essentials',
+    'fresh', 'freshly', 'chopped', 'sliced', 'diced', 'minced', 'grated',
+    'crushed', 'peeled', 'finely', 'roughly', 'thinly', 'large', 'small',
+    'medium', 'pack', 'packet', 'bag', 'tin', 'can', 'jar', 'bottle',
+    'taste', 'optional', 'approx', 'x',
+})
+
+_QUANTITY_RE = re.compile(
+    r'\d+(?:[.,]\d+)?\s*(?:x\s*\d+(?:[.,]\d+)?\s*)?'
+    r'(?:kg|g|mg|ml|cl|l|ltr|litres?|liters?|oz|lb|pk|pcs)?\b'
+)
+_NON_ALPHA_RE = re.compile(r'[^a-z\s]+')
+
+# Sent after stored matches change so dependent caches can be refreshed.
+# Receivers get ``stats`` and the affected ``ingredient_ids``.
+matches_updated = Signal()
+
+# Sent once per batch of products saved by a crawl, rather than per
+# product save, so price-dependent caches are invalidated once per batch.
+# Receivers get the saved ``product_ids``.
+products_updated = Signal()
+
+_index_lock = threading.Lock()
+_index_cache: Dict[str, object] = {'key': None, 'index': None}
+
+
+def _get_setting(name: str, default):
+    """Read a matching option from ASDA_SCRAPER_SETTINGS."""
+    return getattr(settings, 'ASDA_SCRAPER_SETTINGS', {}).get(name, default)
+
+
+def _singularize(token: str) -> str:
+    """Reduce a plural token to a naive singular form."""
+    if len(token) <= 3 or token.endswith('ss'):
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith(('oes', 'ches', 'shes', 'sses', 'xes')):
+        return token[:-2]
+    if token.endswith('s'):
+        return token[:-1]
+    return token
+
+
+def normalize_name(text: Optional[str]) -> str:
+    """
+    Normalize an ingredient or product name for matching.
+
+    Lowercases, strips pack sizes and punctuation, drops stopwords and
+    singularizes the remaining tokens.
+
+    Args:
+        text: Raw ingredient or product name
+
+    Returns:
+        str: Space-separated normalized tokens (may be empty)
+    """
+    if not text:
+        return ''
+
+    text = _QUANTITY_RE.sub(' ', text.lower())
+    text = _NON_ALPHA_RE.sub(' ', text)
+
+    tokens = []
+    for token in text.split():
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        token = _singularize(token)
+        if token not in tokens:
+            tokens.append(token)
+
+    return ' '.join(tokens)
+
+
+def _score_matrix(queries: List[str], choices: List[str]) -> np.ndarray:
+    """
+    Score every query against every choice.
+
+    Blends ``token_set_ratio`` (rewards containment) with
+    ``token_sort_ratio`` (penalizes extra words) so "onion" prefers
+    "onion" over "onion chutney".
+
+    Returns:
+        np.ndarray: Matrix of shape (len(queries), len(choices))
+    """
+    set_scores = process.cdist(
+        queries, choices, scorer=fuzz.token_set_ratio,
+        dtype=np.float32, workers=-1
+    )
+    sort_scores = process.cdist(
+        queries, choices, scorer=fuzz.token_sort_ratio,
+        dtype=np.float32, workers=-1
+    )
+    return (set_scores + sort_scores) / 2
+
+
+class ProductIndex:
+    """
+    Token-blocked index of normalized product names.
+
+    Each product is listed under every token of its normalized name.
+    Queries are only scored against products that share a token with
+    them, which keeps the ``cdist`` matrices small.
+    """
+
+    def __init__(self, products: Iterable[Tuple[int, str]]) -> None:
+        """
+        Build the index.
+
+        Args:
+            products: Iterable of (product_id, product_name) pairs
+        """
+        self.product_ids: List[int] = []
+        self.names: List[str] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+
+        for product_id, name in products:
+            normalized = normalize_name(name)
+            if not normalized:
+                continue
+            position = len(self.names)
+            self.product_ids.append(product_id)
+            self.names.append(normalized)
+            for token in normalized.split():
+                self.postings[token].append(position)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def tokens(self) -> set:
+        """Return the set of tokens present in the index."""
+        return set(self.postings)
+
+    def best_matches(
+        self,
+        queries: List[str],
+        max_block_size: Optional[int] = None
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Find the best product for each normalized query.
+
+        Queries are grouped by shared token; each group is scored with a
+        single ``cdist`` call against that token's posting list. Tokens
+        whose posting list exceeds ``max_block_size`` are skipped unless a
+        query has no other usable token.
+
+        Args:
+            queries: Unique normalized ingredient names
+            max_block_size: Largest candidate block to score
+
+        Returns:
+            dict: query -> (product_id, score) for queries with candidates
+        """
+        if not queries or not self.names:
+            return {}
+
+        if max_block_size is None:
+            max_block_size = _get_setting('MATCH_MAX_BLOCK_SIZE', 5000)
+
+        blocks: Dict[str, List[int]] = defaultdict(list)
+        for query_position, query in enumerate(queries):
+            tokens = [t for t in query.split() if t in self.postings]
+            usable = [
+                t for t in tokens if len(self.postings[t]) <= max_block_size
+            ]
+            for token in usable or tokens:
+                blocks[token].append(query_position)
+
+        best_scores = np.zeros(len(queries), dtype=np.float32)
+        best_positions = np.full(len(queries), -1, dtype=np.int64)
+
+        for token, query_positions in blocks.items():
+            choice_positions = np.asarray(self.postings[token], dtype=np.int64)
+            scores = _score_matrix(
+                [queries[i] for i in query_positions],
+                [self.names[i] for i in choice_positions]
+            )
+            columns = scores.argmax(axis=1)
+            row_best = scores[np.arange(len(query_positions)), columns]
+
+            rows = np.asarray(query_positions, dtype=np.int64)
+            improved = row_best > best_scores[rows]
+            best_scores[rows[improved]] = row_best[improved]
+            best_positions[rows[improved]] = choice_positions[columns[improved]]
+
+        return {
+            queries[i]: (self.product_ids[best_positions[i]], float(best_scores[i]))
+            for i in range(len(queries))
+            if best_positions[i] >= 0
+        }
+
+
+def get_product_index() -> ProductIndex:
+    """
+    Return the in-process index of available products.
+
+    The index is rebuilt only when the product count or the latest
+    ``updated_at`` changes, so repeated batches reuse it.
+    """
+    available = Product.objects.filter(is_available=True)
+    stats = available.aggregate(count=Count('id'), latest=Max('updated_at'))
+    key = (stats['count'], stats['latest'])
+
+    with _index_lock:
+        if _index_cache['key'] != key:
+            logger.info(f"Building product match index for {stats['count']} products")
+            _index_cache['index'] = ProductIndex(
+                available.values_list('id', 'name').iterator(chunk_size=2000)
+            )
+            _index_cache['key'] = key
+        return _index_cache['index']
+
+
+def _chunked(iterable: Iterable, size: int):
+    """Yield lists of up to ``size`` items."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def match_ingredients(
+    ingredient_ids: Optional[List[int]] = None,
+    rematch: bool = False,
+    threshold: Optional[float] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Match ingredients to products and persist the results.
+
+    By default only ingredients without a stored match are processed.
+    Names that already have a match elsewhere reuse it without scoring.
+
+    Args:
+        ingredient_ids: Restrict matching to these ingredients
+        rematch: Re-score every selected ingredient, ignoring stored matches
+        threshold: Minimum score for a product to be linked
+        batch_size: Ingredients processed per batch
+
+    Returns:
+        dict: Counts of processed, matched, reused and unmatched ingredients
+    """
+    from recipe_hub.models import Ingredient
+
+    if threshold is None:
+        threshold = _get_setting('MATCH_THRESHOLD', 70)
+    if batch_size is None:
+        batch_size = _get_setting('MATCH_BATCH_SIZE', 1000)
+
+    queryset = Ingredient.objects.order_by('pk')
+    if ingredient_ids is not None:
+        queryset = queryset.filter(pk__in=ingredient_ids)
+    elif not rematch:
+        queryset = queryset.filter(product_match__isnull=True)
+
+    stats = {'processed': 0, 'matched': 0, 'reused': 0, 'unmatched': 0}
+    index = None
+    touched_ids: List[int] = []
+
+    rows = queryset.values_list('id', 'name').iterator(chunk_size=batch_size)
+    for chunk in _chunked(rows, batch_size):
+        normalized = {pk: normalize_name(name) for pk, name in chunk}
+
+        if ingredient_ids is not None and not rematch:
+            # Skip rows whose name has not changed since they were matched
+            unchanged = set(
+                IngredientProductMatch.objects.filter(
+                    ingredient_id__in=normalized.keys()
+                ).values_list('ingredient_id', 'normalized_name')
+            )
+            normalized = {
+                pk: name for pk, name in normalized.items()
+                if (pk, name) not in unchanged
+            }
+
+        unique_names = sorted({name for name in normalized.values() if name})
+        results: Dict[str, Tuple[Optional[int], float]] = {}
+
+        if unique_names and not rematch:
+            for name, product_id, score in IngredientProductMatch.objects.filter(
+                normalized_name__in=unique_names,
+                product__isnull=False
+            ).order_by('normalized_name', '-score').values_list(
+                'normalized_name', 'product_id', 'score'
+            ):
+                results.setdefault(name, (product_id, score))
+            stats['reused'] += len(results)
+
+        to_score = [name for name in unique_names if name not in results]
+        if to_score:
+            if index is None:
+                index = get_product_index()
+            results.update(index.best_matches(to_score))
+
+        matches = []
+        for pk, name in normalized.items():
+            product_id, score = results.get(name, (None, 0.0))
+            if score < threshold:
+                product_id = None
+                stats['unmatched'] += 1
+            else:
+                stats['matched'] += 1
+            matches.append(IngredientProductMatch(
+                ingredient_id=pk,
+                product_id=product_id,
+                normalized_name=name[:200],
+                score=round(score, 2),
+            ))
+
+        if matches:
+            IngredientProductMatch.objects.bulk_create(
+                matches,
+                update_conflicts=True,
+                unique_fields=['ingredient'],
+                update_fields=['product', 'normalized_name', 'score', 'matched_at'],
+            )
+        stats['processed'] += len(matches)
+        touched_ids.extend(match.ingredient_id for match in matches)
+
+    if stats['processed']:
+        matches_updated.send(
+            sender=IngredientProductMatch, stats=stats, ingredient_ids=touched_ids
+        )
+    logger.info(f"Ingredient matching finished: {stats}")
+    return stats
+
+
+def match_new_products(
+    product_ids: List[int],
+    threshold: Optional[float] = None
+) -> Dict[str, int]:
+    """
+    Re-score stored matches against newly scraped products.
+
+    Only ingredient names sharing a token with the new products are
+    scored, and only against those products. A name's rows are updated
+    when a new product beats its current best score.
+
+    Args:
+        product_ids: IDs of new or changed products
+        threshold: Minimum score for a product to be linked
+
+    Returns:
+        dict: Counts of candidate names and updated rows
+    """
+    if threshold is None:
+        threshold = _get_setting('MATCH_THRESHOLD', 70)
+
+    stats = {'candidates': 0, 'improved': 0, 'rows_updated': 0}
+    if not product_ids:
+        return stats
+
+    new_index = ProductIndex(
+        Product.objects.filter(
+            pk__in=product_ids, is_available=True
+        ).values_list('id', 'name')
+    )
+    if not len(new_index):
+        return stats
+
+    new_tokens = new_index.tokens()
+    current_best = {}
+    for row in IngredientProductMatch.objects.values(
+        'normalized_name'
+    ).annotate(best=Max('score')).iterator(chunk_size=2000):
+        name = row['normalized_name']
+        if name and new_tokens.intersection(name.split()):
+            current_best[name] = row['best'] or 0
+
+    stats['candidates'] = len(current_best)
+    results = new_index.best_matches(sorted(current_best))
+
+    now = timezone.now()
+    touched_ids: List[int] = []
+    for name, (product_id, score) in results.items():
+        if score >= threshold and score > current_best[name]:
+            stats['improved'] += 1
+            rows = IngredientProductMatch.objects.filter(normalized_name=name)
+            touched_ids.extend(rows.values_list('ingredient_id', flat=True))
+            stats['rows_updated'] += rows.update(
+                product_id=product_id, score=round(score, 2), matched_at=now
+            )
+
+    if stats['rows_updated']:
+        matches_updated.send(
+            sender=IngredientProductMatch, stats=stats, ingredient_ids=touched_ids
+        )
+    logger.info(f"Product match refresh finished for {len(product_ids)} products: {stats}")
+    return stats
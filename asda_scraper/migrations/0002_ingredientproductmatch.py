@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asda_scraper', '0001_initial'),
+        ('recipe_hub', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngredientProductMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normalized_name', models.CharField(db_index=True, max_length=200)),
+                ('score', models.FloatField(default=0, help_text='Match confidence from 0 to 100')),
+                ('matched_at', models.DateTimeField(auto_now=True)),
+                ('ingredient', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='product_match', to='recipe_hub.ingredient')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ingredient_matches', to='asda_scraper.product')),
+            ],
+            options={
+                'verbose_name': 'Ingredient Product Match',
+                'verbose_name_plural': 'Ingredient Product Matches',
+                'indexes': [models.Index(fields=['normalized_name', '-score'], name='asda_scrape_normali_515a65_idx'), models.Index(fields=['matched_at'], name='asda_scrape_matched_83a7d8_idx')],
+            },
+        ),
+    ]
@@ -374,4 +374,48 @@ class CrawlQueue(models.Model):
             self.url_hash = hashlib.sha256(
                 self.url.encode('utf-8')
             ).hexdigest()
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+class IngredientProductMatch(models.Model):
+    """
+    Precomputed link between a recipe ingredient and its best ASDA product.
+
+    Rows are written in batch by ``asda_scraper.matching`` so request-time
+    code only ever follows ``ingredient.product_match.product`` through a
+    single indexed join; no fuzzy matching happens in the request path.
+    A row with no product records that matching was attempted but nothing
+    scored above the confidence threshold.
+    """
+
+    ingredient = models.OneToOneField(
+        'recipe_hub.Ingredient',
+        on_delete=models.CASCADE,
+        related_name='product_match'
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ingredient_matches'
+    )
+    normalized_name = models.CharField(max_length=200, db_index=True)
+    score = models.FloatField(
+        default=0,
+        help_text="Match confidence from 0 to 100"
+    )
+    matched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta options for IngredientProductMatch model."""
+        verbose_name = "Ingredient Product Match"
+        verbose_name_plural = "Ingredient Product Matches"
+        indexes = [
+            models.Index(fields=['normalized_name', '-score']),
+            models.Index(fields=['matched_at']),
+        ]
+
+    def __str__(self):
+        """String representation of ingredient match."""
+        target = self.product.name if self.product else "no match"
+        return f"{self.normalized_name} -> {target} ({self.score:.0f})"
@@ -0,0 +1,256 @@
+"""
+Background writer for scraper debug artifacts.
+
+Screenshots and page-source dumps taken on errors are handed to a
+bounded queue and written by a single daemon thread into a managed
+directory, so an error burst never blocks the crawl loop on disk I/O.
+The directory is pruned by age and total size as files are written.
+"""
+
+import gzip
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL = 60  # Seconds between retention sweeps
+
+
+class ArtifactWriter:
+    """
+    Queue-backed writer for screenshots and page-source dumps.
+
+    Capturing still talks to the WebDriver on the caller's thread (the
+    driver is not thread-safe), but captures are rate-limited and dropped
+    when the queue is full; encoding, compression, disk writes and
+    retention all happen on the writer thread.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        queue_size: int = 50,
+        max_total_bytes: int = 500 * 1024 * 1024,
+        max_age_seconds: int = 7 * 24 * 3600,
+        min_interval: float = 5.0
+    ) -> None:
+        """
+        Initialize the writer and start its worker thread.
+
+        Args:
+            directory: Root directory for artifacts
+            queue_size: Maximum artifacts waiting to be written
+            max_total_bytes: Size cap for the directory
+            max_age_seconds: Artifacts older than this are deleted
+            min_interval: Minimum seconds between captures
+        """
+        self.directory = Path(directory)
+        self.max_total_bytes = max_total_bytes
+        self.max_age_seconds = max_age_seconds
+        self.min_interval = min_interval
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._last_capture = 0.0
+        self._sequence = 0
+        self._last_prune = 0.0
+
+        self.written = 0
+        self.dropped = 0
+        self.throttled = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name='scraper-artifact-writer', daemon=True
+        )
+        self._thread.start()
+
+    def capture(
+        self,
+        driver,
+        prefix: str,
+        session_id: Optional[int] = None,
+        page_source: bool = True
+    ) -> List[str]:
+        """
+        Capture a screenshot (and optionally page source) for later writing.
+
+        Args:
+            driver: Selenium WebDriver to capture from
+            prefix: Filename prefix, e.g. 'error' or 'debug_final'
+            session_id: CrawlSession ID used as the subdirectory
+            page_source: Also dump the page HTML
+
+        Returns:
+            list: Paths (relative to the artifact directory) that will be
+                written; empty if the capture was throttled or dropped
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_capture < self.min_interval:
+                self.throttled += 1
+                return []
+            if self._queue.full():
+                self.dropped += 1
+                return []
+            self._last_capture = now
+            self._sequence += 1
+            sequence = self._sequence
+
+        stem = (
+            f"{session_id or 'no_session'}/"
+            f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{sequence}"
+        )
+        paths = []
+
+        try:
+            if self._enqueue(f"{stem}.png", driver.get_screenshot_as_png()):
+                paths.append(f"{stem}.png")
+        except Exception as e:
+            logger.debug(f"Screenshot capture failed: {str(e)}")
+
+        if page_source:
+            try:
+                if self._enqueue(f"{stem}.html.gz", driver.page_source):
+                    paths.append(f"{stem}.html.gz")
+            except Exception as e:
+                logger.debug(f"Page source capture failed: {str(e)}")
+
+        return paths
+
+    def drain(self, timeout: float = 5.0) -> bool:
+        """
+        Wait for queued artifacts to be written.
+
+        Args:
+            timeout: Maximum seconds to wait
+
+        Returns:
+            bool: True if the queue emptied in time
+        """
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def stats(self) -> dict:
+        """Return writer counters."""
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'throttled': self.throttled,
+            'pending': self._queue.qsize(),
+        }
+
+    def _enqueue(self, relative_path: str, payload) -> bool:
+        """Queue one artifact without blocking."""
+        try:
+            self._queue.put_nowait((relative_path, payload))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        """Worker loop: write queued artifacts and apply retention."""
+        while True:
+            relative_path, payload = self._queue.get()
+            try:
+                self._write(relative_path, payload)
+                self.written += 1
+            except Exception as e:
+                logger.error(f"Error writing scraper artifact {relative_path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+            if time.monotonic() - self._last_prune >= PRUNE_INTERVAL:
+                self._last_prune = time.monotonic()
+                try:
+                    self.prune()
+                except Exception as e:
+                    logger.error(f"Error pruning scraper artifacts: {str(e)}")
+
+    def _write(self, relative_path: str, payload) -> None:
+        """Write one artifact atomically, compressing page source."""
+        path = self.directory / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if relative_path.endswith('.gz'):
+            data = gzip.compress(payload.encode('utf-8'), compresslevel=6)
+        else:
+            data = payload
+
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def prune(self) -> int:
+        """
+        Delete artifacts past the age limit, then oldest-first over the size cap.
+
+        Returns:
+            int: Number of files deleted
+        """
+        if not self.directory.exists():
+            return 0
+
+        cutoff = time.time() - self.max_age_seconds
+        files = []
+        deleted = 0
+
+        for path in self.directory.rglob('*'):
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            if stat.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                deleted += 1
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_total_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            deleted += 1
+
+        for subdir in self.directory.iterdir():
+            if subdir.is_dir() and not any(subdir.iterdir()):
+                subdir.rmdir()
+
+        if deleted:
+            logger.info(f"Pruned {deleted} scraper artifacts")
+        return deleted
+
+
+_writer: Optional[ArtifactWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """Return the process-wide artifact writer, creating it on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            options = getattr(settings, 'ASDA_SCRAPER_SETTINGS', {})
+            _writer = ArtifactWriter(
+                directory=options.get(
+                    'ARTIFACT_DIR', str(Path(settings.BASE_DIR) / 'logs' / 'scraper_artifacts')
+                ),
+                queue_size=options.get('ARTIFACT_QUEUE_SIZE', 50),
+                max_total_bytes=options.get('ARTIFACT_MAX_TOTAL_MB', 500) * 1024 * 1024,
+                max_age_seconds=options.get('ARTIFACT_MAX_AGE_DAYS', 7) * 24 * 3600,
+                min_interval=options.get('ARTIFACT_MIN_INTERVAL', 5),
+            )
+        return _writer
@@ -23,7 +23,6 @@ import traceback
 from abc import ABC, abstractmethod
 from typing import Optional, Dict, Any, List, Callable, Tuple
 from urllib.parse import urlparse
-from datetime import datetime, timedelta
 from collections import deque
 from functools import wraps
 from contextlib import contextmanager
@@ -43,6 +42,7 @@ from django.utils import timezone
 from django.db import transaction, DatabaseError
 
 from ..models import CrawlSession, CrawledURL
+from .artifacts import get_artifact_writer
 
 
 logger = logging.getLogger(__name__)
@@ -444,17 +444,18 @@ class BaseScraper(ABC):
                 logger.info("🧹 Closing Chrome WebDriver")
                 # Take screenshot before closing if in debug mode
                 if self.settings.get('DEBUG_MODE', False):
-                    try:
-                        filename = f"debug_final_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                        self.driver.save_screenshot(filename)
-                        logger.info(f"📸 Debug screenshot saved: {filename}")
-                    except:
-                        pass
+                    artifacts = self._capture_artifacts('debug_final', page_source=False)
+                    if artifacts:
+                        logger.info(f"📸 Debug screenshot queued: {artifacts[0]}")
                 
                 self.driver.quit()
                 self.driver = None
                 self.wait = None
                 logger.info("✅ Chrome WebDriver closed successfully")
+            
+            # Give queued artifacts a moment to reach disk before the process exits
+            if not get_artifact_writer().drain(timeout=5):
+                logger.warning("⚠️ Some scraper artifacts were still pending at teardown")
         except Exception as e:
             logger.error(f"❌ Error closing Chrome WebDriver: {str(e)}")
             # Force cleanup
@@ -608,6 +609,13 @@ class BaseScraper(ABC):
         else:
             error_type = "permanent"
         
+        # Queue debug screenshot and page source if enabled
+        artifacts = []
+        if self.settings.get('SCREENSHOT_ON_ERROR', False):
+            artifacts = self._capture_artifacts(
+                'error', page_source=self.settings.get('PAGE_SOURCE_ON_ERROR', True)
+            )
+        
         # Update session if available
         if self.session:
             try:
@@ -615,6 +623,8 @@ class BaseScraper(ABC):
                 timestamp = timezone.now().strftime("%Y-%m-%d %H:%M:%S")
                 new_entry = f"[{timestamp}] [{error_type}] {error_message}\n"
                 new_entry += f"Context: {json.dumps(context)}\n"
+                if artifacts:
+                    new_entry += f"Artifacts: {', '.join(artifacts)}\n"
                 new_entry += f"Traceback: {traceback.format_exc()}\n"
                 new_entry += "-" * 80 + "\n"
                 
@@ -622,15 +632,30 @@ class BaseScraper(ABC):
                 self.session.save(update_fields=['error_log', 'updated_at'])
             except Exception as e:
                 logger.error(f"❌ Error updating session error log: {str(e)}")
-        
-        # Take debug screenshot if enabled
-        if self.settings.get('SCREENSHOT_ON_ERROR', False) and self.driver:
-            try:
-                filename = f"error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                self.driver.save_screenshot(filename)
-                logger.info(f"📸 Error screenshot saved: {filename}")
-            except:
-                pass
+
+    def _capture_artifacts(self, prefix: str, page_source: bool = True) -> List[str]:
+        """
+        Queue a screenshot (and page source) for the background artifact writer.
+
+        Args:
+            prefix: Filename prefix for the artifacts
+            page_source: Also dump the current page HTML
+
+        Returns:
+            list: Artifact paths relative to the artifact directory
+        """
+        if not self.driver:
+            return []
+        try:
+            return get_artifact_writer().capture(
+                self.driver,
+                prefix,
+                session_id=self.session.pk if self.session else None,
+                page_source=page_source,
+            )
+        except Exception as e:
+            logger.debug(f"Artifact capture failed: {str(e)}")
+            return []
 
     @abstractmethod
     def scrape(self) -> None:
@@ -25,6 +25,8 @@ import time
 from .base_scraper import BaseScraper
 from ..models import Product, Category, CrawlQueue
 from .utils import handle_all_popups, parse_price, parse_unit_price, extract_product_id_from_url
+from ..matching import products_updated
+from ..tasks import match_new_products_task
 import time
 
 logger = logging.getLogger(__name__)
@@ -591,6 +593,8 @@ class ProductListCrawler(BaseScraper):
         Args:
             products: List of product data dictionaries
         """
+        created_ids = []
+        saved_ids = []
         try:
             with transaction.atomic():
                 for product_data in products:
@@ -622,8 +626,10 @@ class ProductListCrawler(BaseScraper):
                             self._add_to_detail_queue(product)
 
                         self.products_found += 1
+                        saved_ids.append(product.pk)
 
                         if created:
+                            created_ids.append(product.pk)
                             logger.info(f"Created product: {product.name}")
                         else:
                             logger.debug(f"Updated product: {product.name}")
@@ -639,6 +645,20 @@ class ProductListCrawler(BaseScraper):
             logger.error(f"Error in save_products transaction: {str(e)}")
             raise
 
+        # One price-change notification for the whole batch
+        if saved_ids:
+            try:
+                products_updated.send(sender=Product, product_ids=saved_ids)
+            except Exception as e:
+                logger.error(f"Error sending products_updated: {str(e)}")
+
+        # Link new products to recipe ingredients they match better
+        if created_ids:
+            try:
+                match_new_products_task.delay(created_ids)
+            except Exception as e:
+                logger.error(f"Error queueing product matching: {str(e)}")
+
     def _add_to_detail_queue(self, product: Product) -> None:
         """
         Add product URL to detail crawler queue.
@@ -0,0 +1,37 @@
+"""
+Signal handlers for ASDA scraper app.
+
+Keeps the ingredient-to-product match index current as recipes change.
+"""
+
+import logging
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from recipe_hub.models import Ingredient
+from .matching import normalize_name
+from .models import IngredientProductMatch
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Ingredient)
+def mark_ingredient_unmatched(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Drop the stored product match of a renamed ingredient.
+
+    No matching runs here: new and renamed ingredients are left without
+    a match row and picked up by the periodic ``match_ingredients_task``
+    sweep, which matches every unmatched ingredient in one batch.
+    """
+    if raw or created:
+        return
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    try:
+        IngredientProductMatch.objects.filter(ingredient_id=instance.pk).exclude(
+            normalized_name=normalize_name(instance.name)
+        ).delete()
+    except Exception as e:
+        logger.error(f"Error clearing match for ingredient {instance.pk}: {str(e)}")
@@ -0,0 +1,53 @@
+"""
+Celery tasks for ASDA product data.
+
+Runs ingredient-to-product matching off the request path.
+"""
+
+import logging
+from typing import List, Optional
+
+from celery import shared_task
+
+from .matching import match_ingredients, match_new_products
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def match_ingredients_task(ingredient_ids: Optional[List[int]] = None) -> dict:
+    """
+    Match ingredients to ASDA products.
+
+    Scheduled every 5 minutes without arguments by CELERY_BEAT_SCHEDULE,
+    which matches every ingredient added or renamed since the last run.
+
+    Args:
+        ingredient_ids: Ingredients to (re)match; all unmatched if omitted
+
+    Returns:
+        Dictionary with matching statistics
+    """
+    try:
+        return match_ingredients(ingredient_ids=ingredient_ids)
+    except Exception as e:
+        logger.error(f"Error in match_ingredients_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def match_new_products_task(product_ids: List[int]) -> dict:
+    """
+    Re-score stored ingredient matches against new products.
+
+    Args:
+        product_ids: IDs of newly scraped products
+
+    Returns:
+        Dictionary with refresh statistics
+    """
+    try:
+        return match_new_products(product_ids)
+    except Exception as e:
+        logger.error(f"Error in match_new_products_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
@@ -33,4 +33,7 @@ urlpatterns = [
     
     # AJAX endpoints for status updates
     path('crawler-status/', views.crawler_status, name='crawler_status'),
+
+    # Catalogue export
+    path('export-products/', views.export_products, name='export_products'),
 ]
\ No newline at end of file
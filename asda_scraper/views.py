@@ -13,10 +13,13 @@ from django.views.generic import TemplateView
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.auth.decorators import user_passes_test
 from django.core.management import call_command
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.db.models import Count, Q
 from django.utils import timezone
+from .exports import (
+    COMPRESSIONS, EXPORT_FORMATS, content_type_for, filename_for, stream_export
+)
 from .models import Product, Category, CrawlSession, NutritionInfo, CrawlQueue
 
 logger = logging.getLogger(__name__)
@@ -585,4 +588,45 @@ def crawler_status(request):
 
     except Exception as e:
         logger.error(f"Error getting crawler status: {str(e)}")
-        return JsonResponse({'error': 'Failed to get status'}, status=500)
\ No newline at end of file
+        return JsonResponse({'error': 'Failed to get status'}, status=500)
+
+@user_passes_test(is_admin_user)
+def export_products(request):
+    """
+    Stream the product catalogue with nutrition and categories.
+
+    Query parameters:
+        format: csv (default), ndjson or parquet
+        compress: zstd to compress the download
+
+    Args:
+        request: HTTP request object
+
+    Returns:
+        StreamingHttpResponse: Export file download
+    """
+    export_format = request.GET.get('format', 'csv')
+    compression = request.GET.get('compress') or None
+
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': f'Unsupported format: {export_format}'}, status=400)
+    if compression and compression not in COMPRESSIONS:
+        return JsonResponse({'error': f'Unsupported compression: {compression}'}, status=400)
+
+    try:
+        response = StreamingHttpResponse(
+            stream_export(export_format, compression),
+            content_type=content_type_for(export_format, compression),
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename_for(export_format, compression)}"'
+        )
+        logger.info(
+            f"Catalogue export ({export_format}, {compression or 'uncompressed'}) "
+            f"started by {request.user.username}"
+        )
+        return response
+
+    except Exception as e:
+        logger.error(f"Error starting catalogue export: {str(e)}")
+        return JsonResponse({'error': 'Failed to start export'}, status=500)
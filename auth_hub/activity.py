@@ -0,0 +1,187 @@
+"""
+Buffered activity logging.
+
+Activity events are appended to an in-process buffer and written by a
+background thread with one bulk insert per batch, so logging adds no
+database round trip to the request that triggered it. The buffer is
+flushed when it reaches the batch size, after the flush interval, and
+when the process exits.
+
+Set ``ACTIVITY_LOG_SYNC = True`` to write every event immediately (for
+tests and one-off scripts that inspect the log right away).
+"""
+
+import atexit
+import logging
+import os
+import threading
+from collections import deque
+from typing import Deque, List
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = getattr(settings, 'ACTIVITY_LOG_BATCH_SIZE', 200)
+FLUSH_INTERVAL = getattr(settings, 'ACTIVITY_LOG_FLUSH_INTERVAL', 2.0)
+# Above this many pending events the caller flushes inline rather than
+# letting the buffer grow without bound
+MAX_PENDING = getattr(settings, 'ACTIVITY_LOG_MAX_PENDING', 10000)
+
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_wakeup = threading.Event()
+_pending: Deque = deque()
+_state = {'thread': None}
+
+
+def _request_meta(request) -> tuple:
+    """(IP address, user agent) of the client that made ``request``."""
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip_address = x_forwarded_for.split(',')[0].strip()
+    else:
+        ip_address = request.META.get('REMOTE_ADDR')
+    return ip_address, request.META.get('HTTP_USER_AGENT', '')
+
+
+def log_activity(user, action, details=None, request=None) -> None:
+    """
+    Record a user activity without writing it on the calling thread.
+
+    The event is timestamped now and inserted with the next batch.
+
+    Args:
+        user: The user performing the action
+        action: The action being performed
+        details: Additional details about the action
+        request: The HTTP request object (for IP and user agent)
+    """
+    from .models import ActivityLog
+
+    activity = ActivityLog(
+        user_id=user.pk,
+        action=action,
+        details=details or {},
+        created_at=timezone.now()
+    )
+    if request:
+        activity.ip_address, activity.user_agent = _request_meta(request)
+
+    if getattr(settings, 'ACTIVITY_LOG_SYNC', False):
+        activity.save()
+    else:
+        _enqueue(activity)
+    logger.info(f"Activity logged: {user.email} - {action}")
+
+
+def _enqueue(activity) -> None:
+    """Add an unsaved ActivityLog to the buffer and wake the writer."""
+    with _lock:
+        _pending.append(activity)
+        pending = len(_pending)
+        _ensure_writer()
+
+    if pending >= MAX_PENDING:
+        logger.warning(f"Activity log buffer has {pending} events, flushing inline")
+        flush_activity()
+    elif pending >= BATCH_SIZE:
+        _wakeup.set()
+
+
+def _ensure_writer() -> None:
+    """Start the writer thread for this process if it is not running."""
+    thread = _state['thread']
+    if thread is None or not thread.is_alive():
+        thread = threading.Thread(
+            target=_writer_loop, name='activity-log-writer', daemon=True
+        )
+        _state['thread'] = thread
+        thread.start()
+
+
+def _writer_loop() -> None:
+    """Flush the buffer every interval, or sooner when a batch fills."""
+    while True:
+        _wakeup.wait(FLUSH_INTERVAL)
+        _wakeup.clear()
+        try:
+            close_old_connections()
+            flush_activity()
+        except Exception as e:
+            logger.error(f"Activity log writer error: {str(e)}")
+
+
+def _take_batch() -> List:
+    with _lock:
+        return [_pending.popleft() for _ in range(min(BATCH_SIZE, len(_pending)))]
+
+
+def flush_activity() -> int:
+    """
+    Write every buffered event to the database.
+
+    Returns:
+        int: Number of events written
+    """
+    from .models import ActivityLog
+
+    written = 0
+    with _flush_lock:
+        while True:
+            batch = _take_batch()
+            if not batch:
+                break
+            try:
+                ActivityLog.objects.bulk_create(batch)
+                written += len(batch)
+            except Exception as e:
+                # One bad row (e.g. a user deleted since) must not lose the rest
+                logger.error(f"Bulk activity log insert failed, saving individually: {str(e)}")
+                for activity in batch:
+                    try:
+                        activity.save()
+                        written += 1
+                    except Exception as row_error:
+                        logger.error(
+                            f"Dropped activity log {activity.action} for user "
+                            f"{activity.user_id}: {str(row_error)}"
+                        )
+
+    if written:
+        logger.debug(f"Flushed {written} activity log events")
+    return written
+
+
+def pending_activity_count() -> int:
+    """Number of events waiting to be written."""
+    return len(_pending)
+
+
+def _flush_on_exit() -> None:
+    """Write whatever is still buffered when the process shuts down."""
+    if not _pending:
+        return
+    try:
+        flush_activity()
+    except Exception as e:
+        logger.error(f"Could not flush activity log on exit: {str(e)}")
+    finally:
+        connections.close_all()
+
+
+def _reset_after_fork() -> None:
+    """Forked workers start with an empty buffer and no writer thread."""
+    global _lock, _flush_lock, _wakeup
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+    _wakeup = threading.Event()
+    _pending.clear()
+    _state['thread'] = None
+
+
+atexit.register(_flush_on_exit)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,211 @@
+"""
+Retention, archiving and daily rollups for activity logs.
+
+ActivityLog only holds the last ``ACTIVITY_LOG_RETENTION_DAYS`` days of
+events (the hot table that recent-activity lists read). Older days are
+counted into ActivityDailyRollup and then moved, whole days at a time,
+to ActivityLogArchive, which is purged after
+``ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS`` (None keeps archived events
+forever). Aggregates are served from the rollups, so their cost depends
+on the number of days asked for rather than the number of events.
+"""
+
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import ActivityDailyRollup, ActivityLog, ActivityLogArchive
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = getattr(settings, 'ACTIVITY_LOG_RETENTION_DAYS', 90)
+ARCHIVE_RETENTION_DAYS = getattr(settings, 'ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS', 730)
+# Days recounted on every run so buffered events written after
+# midnight still land in the previous day's rollup
+ROLLUP_LOOKBACK_DAYS = 2
+BATCH_SIZE = 5000
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'action', 'details', 'ip_address', 'user_agent', 'created_at')
+
+
+def _day_start(day: date) -> datetime:
+    """Aware datetime at local midnight starting ``day``."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def rollup_activity(start_day: date, end_day: date) -> int:
+    """
+    Recount daily rollups from the hot table.
+
+    Args:
+        start_day: First day to count
+        end_day: Day after the last day to count
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    counts = (
+        ActivityLog.objects
+        .filter(created_at__gte=_day_start(start_day), created_at__lt=_day_start(end_day))
+        .annotate(day=TruncDate('created_at'))
+        .values('user_id', 'action', 'day')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    rollups = [ActivityDailyRollup(**row) for row in counts]
+    if rollups:
+        ActivityDailyRollup.objects.bulk_create(
+            rollups,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user', 'action', 'day'],
+            update_fields=['count'],
+        )
+    logger.debug(f"Rolled up activity for {start_day} to {end_day}: {len(rollups)} rows")
+    return len(rollups)
+
+
+def rollup_pending_days(today: Optional[date] = None) -> int:
+    """
+    Count every complete day not rolled up yet (plus the lookback window).
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    today = today or timezone.localdate()
+    last_day = ActivityDailyRollup.objects.aggregate(last=Max('day'))['last']
+    if last_day is None:
+        first_event = ActivityLog.objects.aggregate(first=Min('created_at'))['first']
+        if first_event is None:
+            return 0
+        start_day = timezone.localdate(first_event)
+    else:
+        start_day = min(last_day + timedelta(days=1), today - timedelta(days=ROLLUP_LOOKBACK_DAYS))
+
+    if start_day >= today:
+        return 0
+    return rollup_activity(start_day, today)
+
+
+def archive_activity(before: datetime) -> int:
+    """
+    Move hot activity logs older than ``before`` to the archive table.
+
+    Each batch is copied and deleted in one transaction.
+
+    Returns:
+        int: Number of events archived
+    """
+    archived = 0
+    while True:
+        rows = list(
+            ActivityLog.objects.filter(created_at__lt=before)
+            .order_by('pk')
+            .values(*ARCHIVED_FIELDS)[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+
+        with transaction.atomic():
+            ActivityLogArchive.objects.bulk_create(
+                [ActivityLogArchive(**row) for row in rows], ignore_conflicts=True
+            )
+            ActivityLog.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        archived += len(rows)
+
+    if archived:
+        logger.info(f"Archived {archived} activity logs older than {before}")
+    return archived
+
+
+def purge_archive(before: datetime) -> int:
+    """
+    Delete archived activity logs older than ``before``.
+
+    Returns:
+        int: Number of events deleted
+    """
+    deleted = 0
+    while True:
+        pks = list(
+            ActivityLogArchive.objects.filter(created_at__lt=before)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:BATCH_SIZE]
+        )
+        if not pks:
+            break
+        deleted += ActivityLogArchive.objects.filter(pk__in=pks).delete()[0]
+
+    if deleted:
+        logger.info(f"Purged {deleted} archived activity logs older than {before}")
+    return deleted
+
+
+def maintain_activity_logs() -> Dict[str, int]:
+    """
+    Roll up, archive and purge activity logs according to the retention settings.
+
+    Days are rolled up before they are archived, so the rollups keep
+    counting events that have left the hot table.
+
+    Returns:
+        dict: Counts of rollup rows written and events archived and purged
+    """
+    today = timezone.localdate()
+    result = {'rolled_up': rollup_pending_days(today), 'archived': 0, 'purged': 0}
+
+    result['archived'] = archive_activity(_day_start(today - timedelta(days=RETENTION_DAYS)))
+    if ARCHIVE_RETENTION_DAYS is not None:
+        result['purged'] = purge_archive(
+            _day_start(today - timedelta(days=ARCHIVE_RETENTION_DAYS))
+        )
+    return result
+
+
+def activity_summary(user, days: int = 30) -> Dict:
+    """
+    Activity counts for a user over the last ``days`` days.
+
+    Complete days come from the rollups; today is counted from the hot
+    table through its (user, created_at) index.
+
+    Args:
+        user: The user to summarize
+        days: Number of days including today
+
+    Returns:
+        dict: 'days', 'totals' (action -> count) and 'daily'
+        (list of {'day', 'count'}, oldest first)
+    """
+    today = timezone.localdate()
+    since = today - timedelta(days=days - 1)
+
+    totals: Dict[str, int] = {}
+    daily: Dict[date, int] = {}
+    rollups = ActivityDailyRollup.objects.filter(
+        user=user, day__gte=since, day__lt=today
+    ).values_list('action', 'day', 'count')
+    for action, day, count in rollups:
+        totals[action] = totals.get(action, 0) + count
+        daily[day] = daily.get(day, 0) + count
+
+    todays = ActivityLog.objects.filter(
+        user=user, created_at__gte=_day_start(today)
+    ).values('action').annotate(count=Count('id')).order_by()
+    for row in todays:
+        totals[row['action']] = totals.get(row['action'], 0) + row['count']
+        daily[today] = daily.get(today, 0) + row['count']
+
+    return {
+        'days': days,
+        'totals': totals,
+        'daily': [
+            {'day': day.isoformat(), 'count': daily[day]} for day in sorted(daily)
+        ],
+    }
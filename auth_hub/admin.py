@@ -16,7 +16,8 @@ from .models import (
     SubscriptionTier,
     UserProfile,
     MenuShare,
-    ActivityLog
+    ActivityLog,
+    ActivityDailyRollup
 )
 
 
@@ -306,6 +307,34 @@ class ActivityLogAdmin(admin.ModelAdmin):
         return False
 
 
+@admin.register(ActivityDailyRollup)
+class ActivityDailyRollupAdmin(admin.ModelAdmin):
+    """Read-only admin for daily activity counts."""
+    list_display = (
+        'user',
+        'action',
+        'day',
+        'count',
+    )
+    list_filter = (
+        'action',
+        'day',
+    )
+    search_fields = (
+        'user__email',
+    )
+    date_hierarchy = 'day'
+    ordering = ('-day', 'action')
+    
+    def has_add_permission(self, request):
+        """Rollups are written by the scheduled maintenance task."""
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        """Disable editing of rollups."""
+        return False
+
+
 # Re-register UserAdmin
 admin.site.unregister(User)
 admin.site.register(User, UserAdmin)
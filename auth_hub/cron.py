@@ -13,6 +13,7 @@ from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
 
+from . import activity_history
 from .models import UserProfile, ActivityLog
 
 logger = logging.getLogger(__name__)
@@ -112,6 +113,22 @@ def send_downgrade_reminders():
     return f"Sent {sent_count} reminder emails with {error_count} errors"
 
 
+def maintain_activity_logs():
+    """
+    Roll up, archive and purge activity logs.
+
+    This function runs daily so recent-activity queries only touch the
+    retention window and aggregates come from the daily rollups.
+    """
+    logger.info("Starting activity log maintenance...")
+    result = activity_history.maintain_activity_logs()
+    logger.info(f"Activity log maintenance completed: {result}")
+    return (
+        f"Wrote {result['rolled_up']} rollups, archived {result['archived']} "
+        f"and purged {result['purged']} activity logs"
+    )
+
+
 def _send_downgrade_completed_email(user, old_tier, new_tier):
     """Send email confirming the downgrade has been processed."""
     context = {
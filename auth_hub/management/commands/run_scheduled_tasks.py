@@ -10,11 +10,15 @@ Usage:
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
-from auth_hub.cron import process_pending_downgrades, send_downgrade_reminders
+from auth_hub.cron import (
+    maintain_activity_logs,
+    process_pending_downgrades,
+    send_downgrade_reminders,
+)
 
 
 class Command(BaseCommand):
-    help = 'Run all scheduled tasks (downgrades and reminders)'
+    help = 'Run all scheduled tasks (downgrades, reminders and activity log maintenance)'
 
     def handle(self, *args, **options):
         self.stdout.write('='*50)
@@ -37,6 +41,14 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'   ✗ Error: {str(e)}'))
         
+        # Roll up and archive activity logs
+        self.stdout.write('\n3. Maintaining activity logs...')
+        try:
+            result = maintain_activity_logs()
+            self.stdout.write(self.style.SUCCESS(f'   ✓ {result}'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'   ✗ Error: {str(e)}'))
+        
         self.stdout.write('\n' + '='*50)
         self.stdout.write('Scheduled tasks completed')
         self.stdout.write('='*50 + '\n')
\ No newline at end of file
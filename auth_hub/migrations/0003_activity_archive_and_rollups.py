@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:11
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth_hub', '0002_activitylog_created_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=50)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Activity Daily Rollup',
+                'verbose_name_plural': 'Activity Daily Rollups',
+                'ordering': ['-day', 'action'],
+                'indexes': [models.Index(fields=['user', '-day'], name='auth_hub_ac_user_id_229d23_idx'), models.Index(fields=['day', 'action'], name='auth_hub_ac_day_481558_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'action', 'day'), name='unique_activity_rollup_per_day')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ActivityLogArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=50)),
+                ('details', models.JSONField(blank=True, default=dict)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_activity_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Activity Log',
+                'verbose_name_plural': 'Archived Activity Logs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='auth_hub_ac_user_id_bb5a50_idx'), django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='activity_archive_created_brin')],
+            },
+        ),
+    ]
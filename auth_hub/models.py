@@ -8,6 +8,7 @@ functionality in the KitchenCompass application.
 import logging
 from datetime import timedelta
 from django.db import models
+from django.contrib.postgres.indexes import BrinIndex
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.conf import settings
@@ -434,7 +435,8 @@ class ActivityLog(models.Model):
     details = models.JSONField(default=dict, blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered write lands
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     
     class Meta:
         verbose_name = "Activity Log"
@@ -451,6 +453,79 @@ class ActivityLog(models.Model):
     
 
 
+class ActivityLogArchive(models.Model):
+    """
+    Activity logs moved out of ActivityLog after the hot retention period.
+
+    Keeps the hot table (and its indexes) sized to recent traffic while
+    older events stay available for audits until the archive retention
+    period ends.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_activity_logs'
+    )
+    action = models.CharField(max_length=50)
+    details = models.JSONField(default=dict, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Archived Activity Log"
+        verbose_name_plural = "Archived Activity Logs"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            # Rows arrive in time order, so a block range index stays tiny
+            BrinIndex(fields=['created_at'], name='activity_archive_created_brin'),
+        ]
+
+    def __str__(self):
+        """String representation of the archived activity log."""
+        return f"{self.user_id} - {self.action} - {self.created_at}"
+
+
+class ActivityDailyRollup(models.Model):
+    """
+    Number of activity events per user, action and day.
+
+    Aggregate views read these instead of counting raw log rows, so
+    their cost does not grow with the size of the log.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity_rollups'
+    )
+    action = models.CharField(max_length=50)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Activity Daily Rollup"
+        verbose_name_plural = "Activity Daily Rollups"
+        ordering = ['-day', 'action']
+        indexes = [
+            models.Index(fields=['user', '-day']),
+            models.Index(fields=['day', 'action']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'action', 'day'],
+                name='unique_activity_rollup_per_day'
+            )
+        ]
+
+    def __str__(self):
+        """String representation of the rollup."""
+        return f"{self.user_id} - {self.action} - {self.day}: {self.count}"
+
+
 # Add this model to your existing models.py
 
 class MicrosoftOAuthToken(models.Model):
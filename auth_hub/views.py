@@ -29,6 +29,8 @@ from django.views import View
 from django.views.generic import CreateView, UpdateView, ListView, DetailView
 
 
+from .activity import log_activity
+from .activity_history import activity_summary
 from .forms import (
     CustomUserCreationForm,
     UserProfileForm,
@@ -45,37 +47,6 @@ from .models import (
 logger = logging.getLogger(__name__)
 
 
-def log_activity(user, action, details=None, request=None):
-    """
-    Helper function to log user activities.
-    
-    Args:
-        user: The user performing the action
-        action: The action being performed
-        details: Additional details about the action
-        request: The HTTP request object (for IP and user agent)
-    """
-    activity = ActivityLog(
-        user=user,
-        action=action,
-        details=details or {}
-    )
-    
-    if request:
-        # Get IP address
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            activity.ip_address = x_forwarded_for.split(',')[0]
-        else:
-            activity.ip_address = request.META.get('REMOTE_ADDR')
-        
-        # Get user agent
-        activity.user_agent = request.META.get('HTTP_USER_AGENT', '')
-    
-    activity.save()
-    logger.info(f"Activity logged: {user.email} - {action}")
-
-
 class CustomLoginView(LoginView):
     """
     Custom login view with activity logging.
@@ -690,8 +661,17 @@ def check_share_limit(request):
 
 @login_required
 def activity_log_api(request):
-    """API endpoint for fetching activity logs."""
+    """
+    API endpoint for fetching activity logs.
+
+    Recent events are paged from the hot activity table; the summary
+    counts come from the daily rollups.
+    """
     page = request.GET.get('page', 1)
+    try:
+        days = min(max(int(request.GET.get('days', 30)), 1), 366)
+    except ValueError:
+        days = 30
     activities = ActivityLog.objects.filter(
         user=request.user
     ).order_by('-created_at')
@@ -714,6 +694,7 @@ def activity_log_api(request):
         'has_previous': page_obj.has_previous(),
         'total_pages': paginator.num_pages,
         'current_page': page_obj.number,
+        'summary': activity_summary(request.user, days),
     }
     
     return JsonResponse(data)
@@ -751,10 +732,10 @@ def microsoft_auth_start(request):
         auth_url = auth_service.get_auth_url(state)
         
         # Log the authentication attempt
-        ActivityLog.objects.create(
-            user=request.user,
-            action='microsoft_auth_start',
-            details='Started Microsoft OAuth flow'
+        log_activity(
+            request.user,
+            'microsoft_auth_start',
+            'Started Microsoft OAuth flow'
         )
         
         return HttpResponseRedirect(auth_url)
@@ -796,10 +777,10 @@ def microsoft_auth_callback(request):
         auth_service.save_tokens(request.user, token_data)
         
         # Log success
-        ActivityLog.objects.create(
-            user=request.user,
-            action='microsoft_auth_complete',
-            details='Successfully connected Microsoft account'
+        log_activity(
+            request.user,
+            'microsoft_auth_complete',
+            'Successfully connected Microsoft account'
         )
         
         messages.success(request, "Successfully connected your Microsoft account!")
@@ -828,10 +809,10 @@ def disconnect_microsoft(request):
         CalendarEvent.objects.filter(user=request.user).delete()
         
         # Log disconnection
-        ActivityLog.objects.create(
-            user=request.user,
-            action='microsoft_disconnect',
-            details='Disconnected Microsoft account'
+        log_activity(
+            request.user,
+            'microsoft_disconnect',
+            'Disconnected Microsoft account'
         )
         
         messages.success(request, "Microsoft account disconnected successfully.")
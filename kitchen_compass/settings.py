@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Third-party apps
     "crispy_forms",
@@ -196,25 +197,87 @@ STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 # CELERY CONFIGURATION
 # ===========================
 
+# Point REDIS_URL (or CELERY_BROKER_URL) at a real broker and run a
+# worker plus `celery -A kitchen_compass beat`. Without one, tasks run
+# eagerly inside the request that queued them (CSV imports included)
+# and the beat schedule below never fires.
+REDIS_URL = os.getenv("REDIS_URL", "")
+
 CELERY_TIMEZONE = TIME_ZONE
-CELERY_BROKER_URL = 'memory://'
-CELERY_RESULT_BACKEND = 'cache+memory://'
-CELERY_TASK_ALWAYS_EAGER = True
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL or 'memory://')
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", REDIS_URL or 'cache+memory://')
+CELERY_TASK_ALWAYS_EAGER = CELERY_BROKER_URL == 'memory://'
 CELERY_TASK_EAGER_PROPAGATES = True
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 
+CELERY_BEAT_SCHEDULE = {
+    # Re-queue CSV imports whose worker died mid-file
+    'resume-stalled-csv-uploads': {
+        'task': 'meal_planner.tasks.resume_stalled_csv_uploads',
+        'schedule': 600.0,
+    },
+    # Match ingredients created or renamed since the last sweep
+    'match-unmatched-ingredients': {
+        'task': 'asda_scraper.tasks.match_ingredients_task',
+        'schedule': 300.0,
+    },
+    # Similar-recipe lists of recipes changed since the last run
+    'refresh-pending-similar-recipes': {
+        'task': 'recipe_hub.tasks.refresh_pending_similar_recipes_task',
+        'schedule': 300.0,
+    },
+    # Fold the autocomplete delta back into a fresh base index
+    'rebuild-autocomplete-index': {
+        'task': 'recipe_hub.tasks.rebuild_autocomplete_index_task',
+        'schedule': 3600.0,
+    },
+    # Image variants for uploads that do not have them yet
+    'generate-missing-image-derivatives': {
+        'task': 'recipe_hub.tasks.generate_missing_image_derivatives_task',
+        'schedule': 300.0,
+    },
+}
+
 # ===========================
 # CACHING
 # ===========================
 
-CACHES = {
-    "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
-        "LOCATION": "unique-snowflake"
+# Version keys (recipe fragments, shopping lists, the ingredient
+# categorizer, autocomplete) only invalidate across processes through a
+# shared cache, so every multi-process deployment must set REDIS_URL.
+# The local-memory fallback is for single-process development only.
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
     }
-}
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "unique-snowflake"
+        }
+    }
+
+# ===========================
+# ACTIVITY LOGGING
+# ===========================
+
+# Activity events are buffered in-process and bulk inserted by a
+# background thread; set ACTIVITY_LOG_SYNC to write them immediately
+ACTIVITY_LOG_SYNC = os.getenv("ACTIVITY_LOG_SYNC", "False") == "True"
+ACTIVITY_LOG_BATCH_SIZE = 200
+ACTIVITY_LOG_FLUSH_INTERVAL = 2.0  # seconds
+
+# Days of events kept in the hot ActivityLog table before they are
+# archived, and days archived events are kept (None keeps them forever).
+# Daily per-user counts are kept in ActivityDailyRollup regardless.
+ACTIVITY_LOG_RETENTION_DAYS = 90
+ACTIVITY_LOG_ARCHIVE_RETENTION_DAYS = 730
 
 # ===========================
 # SESSION CONFIGURATION
@@ -476,6 +539,12 @@ ASDA_SCRAPER_SETTINGS = {
 
     # Error Handling Settings
     'SCREENSHOT_ON_ERROR': True,      # Take screenshot on errors
+    'PAGE_SOURCE_ON_ERROR': True,     # Also dump page HTML on errors
+    'ARTIFACT_DIR': str(LOGS_DIR / 'scraper_artifacts'),  # Where screenshots/dumps are written
+    'ARTIFACT_QUEUE_SIZE': 50,        # Pending artifacts before new ones are dropped
+    'ARTIFACT_MIN_INTERVAL': 5,       # Seconds between error captures
+    'ARTIFACT_MAX_TOTAL_MB': 500,     # Delete oldest artifacts beyond this size
+    'ARTIFACT_MAX_AGE_DAYS': 7,       # Delete artifacts older than this
     'CONTINUE_ON_ERROR': True,        # Continue processing after errors
     'ERROR_THRESHOLD': 0.1,          # Stop if error rate exceeds 10%
 
@@ -506,6 +575,14 @@ ASDA_SCRAPER_SETTINGS = {
     'AUTO_RECOVERY': True,           # Attempt automatic recovery
     'RECOVERY_WAIT_TIME': 300,       # Wait time before recovery attempt
     'MAX_RECOVERY_ATTEMPTS': 3,      # Max recovery attempts
+
+    # Product Matching Settings
+    'MATCH_THRESHOLD': 70,           # Minimum score to link ingredient to product
+    'MATCH_BATCH_SIZE': 1000,        # Ingredients matched per batch
+    'MATCH_MAX_BLOCK_SIZE': 5000,    # Skip tokens shared by more products than this
+
+    # Catalogue Export Settings
+    'EXPORT_CHUNK_SIZE': 2000,       # Rows fetched per server-side cursor round trip
 }
 
 # ===========================
@@ -0,0 +1,36 @@
+"""
+Management command to resume interrupted recipe CSV imports.
+
+Requeues uploads left in 'processing' by a worker that stopped, so they
+continue after their last committed row, and uploads left 'queued' whose
+task never reached a worker.
+
+Usage:
+    python manage.py resume_csv_uploads
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+from meal_planner.tasks import resume_stalled_csv_uploads
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Requeue stalled CSV uploads."""
+
+    help = 'Requeues recipe CSV uploads whose background processing stopped'
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        result = resume_stalled_csv_uploads()
+        upload_ids = result['upload_ids']
+
+        if not upload_ids:
+            self.stdout.write("No stalled CSV uploads found")
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Requeued {len(upload_ids)} CSV uploads: "
+            f"{', '.join(str(pk) for pk in upload_ids)}"
+        ))
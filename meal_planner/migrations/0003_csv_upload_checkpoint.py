@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal_planner', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipecsvupload',
+            name='checkpoint_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipecsvupload',
+            name='last_processed_row',
+            field=models.IntegerField(default=0, help_text='CSV row number (header is row 1) processing resumes after'),
+        ),
+        migrations.AlterField(
+            model_name='recipecsvupload',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('queued', 'Queued'), ('processing', 'Processing'), ('completed', 'Completed'), ('failed', 'Failed'), ('partial', 'Partially Completed')], default='pending', max_length=20),
+        ),
+    ]
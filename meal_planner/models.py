@@ -7,7 +7,7 @@ meal plans, meal slots, and meal plan templates.
 
 import logging
 from datetime import date, timedelta
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
@@ -150,6 +150,7 @@ class MealPlan(models.Model):
         
         return weeks
 
+    @transaction.atomic
     def duplicate(self, new_start_date=None, new_name=None):
         """Create a duplicate of this meal plan with a new date range."""
         if not new_start_date:
@@ -339,6 +340,7 @@ class MealPlanTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.duration_days} days)"
 
+    @transaction.atomic
     def create_meal_plan(self, start_date, name=None):
         """Create a new meal plan from this template."""
         end_date = start_date + timedelta(days=self.duration_days - 1)
@@ -502,12 +504,15 @@ class RecipeCSVUpload(models.Model):
         total_rows: Total rows in CSV
         successful_imports: Number of successful imports
         failed_imports: Number of failed imports
+        last_processed_row: CSV row number of the last committed chunk
+        checkpoint_at: When the last chunk was committed
         error_log: JSON field containing processing errors
         notes: Admin notes about the upload
     """
     
     STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('queued', 'Queued'),
         ('processing', 'Processing'),
         ('completed', 'Completed'),
         ('failed', 'Failed'),
@@ -539,6 +544,13 @@ class RecipeCSVUpload(models.Model):
     successful_imports = models.IntegerField(default=0)
     failed_imports = models.IntegerField(default=0)
     
+    # Background processing checkpoint
+    last_processed_row = models.IntegerField(
+        default=0,
+        help_text="CSV row number (header is row 1) processing resumes after"
+    )
+    checkpoint_at = models.DateTimeField(null=True, blank=True)
+    
     # Error tracking
     error_log = models.JSONField(
         default=dict,
@@ -572,6 +584,25 @@ class RecipeCSVUpload(models.Model):
             return 0
         return round((self.successful_imports / self.total_rows) * 100, 1)
     
+    @property
+    def processed_rows(self):
+        """Number of data rows committed so far."""
+        return max(self.last_processed_row - 1, 0)
+    
+    @property
+    def progress_percent(self):
+        """Processing progress percentage."""
+        if self.status in ('completed', 'failed', 'partial'):
+            return 100
+        if self.total_rows == 0:
+            return 0
+        return min(round((self.processed_rows / self.total_rows) * 100, 1), 100)
+    
+    @property
+    def is_running(self):
+        """Whether the upload is waiting for or in background processing."""
+        return self.status in ('queued', 'processing')
+    
     def mark_completed(self):
         """Mark upload as completed."""
         self.processed_at = timezone.now()
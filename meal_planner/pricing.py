@@ -0,0 +1,192 @@
+"""
+Shopping list cost estimation.
+
+Estimates what a meal plan's shopping list costs at ASDA using the
+precomputed ingredient-to-product matches. The lines priced are those of
+the plan's shopping list, so ingredients it merges (by canonical
+ingredient and base unit) are bought once, and each line is priced with
+the best-scoring product matched to any of its ingredients. Results are
+cached per meal plan and invalidated when the plan's shopping list,
+ingredient categories or scraped prices change. Crawls report price
+changes once per saved batch of products.
+"""
+
+import logging
+import math
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from asda_scraper.scrapers.utils import parse_unit_price
+from recipe_hub.categorizer import VERSION_KEY as CATEGORIZER_VERSION_KEY
+from recipe_hub.units import lookup_unit
+from .models import MealSlot
+from .shopping import ITEM_KEY, get_shopping_list
+
+logger = logging.getLogger(__name__)
+
+COST_CACHE_TIMEOUT = 60 * 60 * 24
+PRICE_VERSION_KEY = 'meal_plan_cost:price_version'
+
+# Unit price denominators as scraped ("£1.50/kg", "50p/100g", "£2 per litre")
+PRICE_UNITS = {
+    'kg': ('mass', 1000), 'g': ('mass', 1), '100g': ('mass', 100),
+    'l': ('volume', 1000), 'ltr': ('volume', 1000), 'litre': ('volume', 1000),
+    'liter': ('volume', 1000), 'ml': ('volume', 1), '100ml': ('volume', 100),
+    '75cl': ('volume', 750), '70cl': ('volume', 700),
+    'each': ('count', 1), 'ea': ('count', 1), 'item': ('count', 1),
+}
+
+
+def _cost_cache_key(meal_plan_id: int) -> str:
+    """Build the cache key for a plan's cost estimate at the current price and categorizer versions."""
+    version = cache.get_or_set(PRICE_VERSION_KEY, 1, None)
+    categorizer = cache.get(CATEGORIZER_VERSION_KEY)
+    return f"meal_plan_cost:{meal_plan_id}:v{version}:c{categorizer}"
+
+
+def invalidate_meal_plan_cost(*meal_plan_ids: int) -> None:
+    """Drop cached cost estimates for the given meal plans."""
+    if meal_plan_ids:
+        cache.delete_many([_cost_cache_key(pk) for pk in meal_plan_ids])
+
+
+def bump_price_version() -> None:
+    """Invalidate every cached cost estimate after prices or matches change."""
+    try:
+        cache.incr(PRICE_VERSION_KEY)
+    except ValueError:
+        cache.set(PRICE_VERSION_KEY, 2, None)
+
+
+def estimate_line_cost(
+    quantity: Optional[Decimal],
+    unit: str,
+    price: Optional[Decimal],
+    price_per_unit: Optional[str]
+) -> Optional[Decimal]:
+    """
+    Estimate the cost of one aggregated shopping list line.
+
+    When the ingredient unit and the product's unit price share a
+    dimension (mass, volume or count) the cost is prorated from the unit
+    price. Otherwise whole packs are assumed: one pack, or one per item for
+    counted ingredients.
+
+    Args:
+        quantity: Total quantity needed
+        unit: Unit of the line (base unit, or the unit as entered)
+        price: Product shelf price
+        price_per_unit: Raw unit price text from the product listing
+
+    Returns:
+        Decimal: Estimated cost, or None if the product has no price
+    """
+    ingredient_unit = lookup_unit(unit)
+    parsed = parse_unit_price(price_per_unit) if price_per_unit else None
+
+    if quantity and ingredient_unit and parsed:
+        price_unit = PRICE_UNITS.get(str(parsed['unit']).lower())
+        if price_unit and price_unit[0] == ingredient_unit[0]:
+            base_amount = quantity * Decimal(str(ingredient_unit[1]))
+            return (base_amount / Decimal(str(price_unit[1]))) * parsed['price']
+
+    if price is None:
+        return None
+
+    if quantity and ingredient_unit and ingredient_unit[0] == 'count':
+        return price * max(1, math.ceil(quantity))
+    return price
+
+
+def _matched_products(meal_plan) -> Dict[str, Tuple[Optional[Decimal], Optional[str]]]:
+    """
+    The best-scoring matched product of each shopping list item, as one query.
+
+    Args:
+        meal_plan: MealPlan instance
+
+    Returns:
+        dict: Item key to (shelf price, unit price text)
+    """
+    product = 'recipe__ingredients__product_match__product__'
+    rows = (
+        MealSlot.objects
+        .filter(meal_plan=meal_plan, **{f'{product}isnull': False})
+        .annotate(item_key=ITEM_KEY)
+        .order_by('item_key', '-recipe__ingredients__product_match__score')
+        .distinct('item_key')
+        .values_list('item_key', f'{product}price', f'{product}price_per_unit')
+    )
+    return {key: (price, price_per_unit) for key, price, price_per_unit in rows}
+
+
+def compute_shopping_list_cost(meal_plan) -> Dict:
+    """
+    Compute the estimated basket cost for a meal plan.
+
+    Prices each line of the plan's shopping list with the product matched
+    to its ingredients; lines without a priced product are counted as
+    unpriced.
+
+    Args:
+        meal_plan: MealPlan instance
+
+    Returns:
+        dict: Plan total, per-category totals and priced/unpriced counts
+    """
+    products = _matched_products(meal_plan)
+
+    category_totals = defaultdict(lambda: Decimal('0'))
+    total = Decimal('0')
+    priced = unpriced = 0
+
+    for item in get_shopping_list(meal_plan).items:
+        price, price_per_unit = products.get(item.key, (None, None))
+        cost = estimate_line_cost(item.base_quantity, item.base_unit, price, price_per_unit)
+        if cost is None:
+            unpriced += 1
+            continue
+        cost = cost.quantize(Decimal('0.01'))
+        category_totals[item.category] += cost
+        total += cost
+        priced += 1
+
+    return {
+        'total': total,
+        'by_category': dict(category_totals),
+        'priced_items': priced,
+        'unpriced_items': unpriced,
+        'computed_at': timezone.now(),
+    }
+
+
+def get_shopping_list_cost(meal_plan) -> Dict:
+    """
+    Return the cached cost estimate for a meal plan, computing it on a miss.
+
+    Args:
+        meal_plan: MealPlan instance
+
+    Returns:
+        dict: Cost estimate as produced by ``compute_shopping_list_cost``
+    """
+    key = _cost_cache_key(meal_plan.pk)
+    estimate = cache.get(key)
+    if estimate is None:
+        try:
+            estimate = compute_shopping_list_cost(meal_plan)
+            cache.set(key, estimate, COST_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.error(f"Error estimating cost for meal plan {meal_plan.pk}: {str(e)}")
+            estimate = {
+                'total': None,
+                'by_category': {},
+                'priced_items': 0,
+                'unpriced_items': 0,
+                'computed_at': None,
+            }
+    return estimate
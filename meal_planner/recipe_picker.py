@@ -0,0 +1,91 @@
+"""
+Recipe picker queries.
+
+The "add recipe" modal of the meal plan page and the calendar's recipe
+list load recipes a page at a time from a JSON endpoint instead of
+embedding every recipe the user can see in the page. Results are the
+user's own recipes plus public ones, filtered by meal type, category,
+dietary flags, difficulty and total time, and searched with the
+type-ahead prefix query. Unsearched pages are keyset-paginated on
+(created_at, id); search results are ranked and use offset cursors.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+from django.db.models import F, Q
+
+from recipe_hub.dietary import filter_by_diets
+from recipe_hub.models import Recipe
+from recipe_hub.pagination import DEFAULT_SORT_KEYS, SortKeys, order_by_keys
+from recipe_hub.search import build_prefix_query, search_recipes
+
+logger = logging.getLogger(__name__)
+
+PICKER_PAGE_SIZE = 20
+PICKER_MAX_PAGE_SIZE = 50
+
+_DIFFICULTIES = {value for value, _ in Recipe._meta.get_field('difficulty').choices}
+
+
+def _positive_int(value) -> Optional[int]:
+    """Parse a positive integer query parameter, ignoring anything else."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def picker_page_size(params) -> int:
+    """Requested page size, clamped to 1..PICKER_MAX_PAGE_SIZE."""
+    limit = _positive_int(params.get('limit')) or PICKER_PAGE_SIZE
+    return min(limit, PICKER_MAX_PAGE_SIZE)
+
+
+def picker_recipes(user, params) -> Tuple:
+    """
+    Build the filtered, ordered recipe queryset for the recipe picker.
+
+    Args:
+        user: User choosing a recipe (own recipes are included)
+        params: QueryDict with optional ``q``, ``meal_type`` (ID),
+            ``category`` (ID), ``dietary`` (repeated flag names),
+            ``difficulty`` and ``max_time`` (minutes)
+
+    Returns:
+        tuple: (queryset, keyset sort keys or None for relevance ordering)
+    """
+    queryset = Recipe.objects.filter(
+        Q(author=user) | Q(is_public=True)
+    ).select_related('author').prefetch_related('categories')
+
+    meal_type = _positive_int(params.get('meal_type'))
+    if meal_type:
+        queryset = queryset.filter(meal_types=meal_type)
+
+    category = _positive_int(params.get('category'))
+    if category:
+        queryset = queryset.filter(categories=category)
+
+    dietary = params.getlist('dietary')
+    if dietary:
+        queryset = filter_by_diets(queryset, dietary)
+
+    difficulty = params.get('difficulty')
+    if difficulty in _DIFFICULTIES:
+        queryset = queryset.filter(difficulty=difficulty)
+
+    # 'total_time' is a model property, so annotate another name
+    max_time = _positive_int(params.get('max_time'))
+    if max_time:
+        queryset = queryset.annotate(
+            total_minutes=F('prep_time') + F('cook_time')
+        ).filter(total_minutes__lte=max_time)
+
+    query = build_prefix_query(params.get('q', '').strip())
+    if query is not None:
+        return search_recipes(queryset, query).order_by('-rank', '-id'), None
+
+    sort_keys: SortKeys = DEFAULT_SORT_KEYS
+    return queryset.order_by(*order_by_keys(sort_keys)), sort_keys
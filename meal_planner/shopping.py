@@ -0,0 +1,344 @@
+"""
+Shopping list aggregation.
+
+Builds a meal plan's shopping list with one grouped query: every recipe
+ingredient of the plan's slots is summed as ``base_quantity * servings``
+per canonical ingredient and base unit, with its category and the
+recipes that need it. The detail page preview, the shopping list page
+and the CSV download all render the same ``ShoppingList``, read from a
+cache keyed on the plan's shopping-list version (and the categorizer
+version, so category edits regroup cached lists).
+
+Slot changes and ingredient edits on recipes used by a plan bump its
+version once the transaction commits, and the new list of a current plan
+is precomputed by a background task, so views and downloads after an
+edit are normally a cache read.
+
+Ingredients not yet resolved to a canonical ingredient (see
+``backfill_canonical_ingredients``) are grouped by lower-cased name and
+raw unit instead.
+"""
+
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, DecimalField, F, Min, Q, Sum, When
+from django.db.models.functions import Coalesce, Lower, Trim
+from django.utils import timezone
+
+from recipe_hub.categorizer import VERSION_KEY as CATEGORIZER_VERSION_KEY, get_categorizer
+from recipe_hub.units import format_quantity
+from .models import MealSlot
+
+logger = logging.getLogger(__name__)
+
+OTHER_CATEGORY = 'Other'
+OTHER_DISPLAY_ORDER = 999
+
+_INGREDIENT = 'recipe__ingredients__'
+_RESOLVED = Q(recipe__ingredients__canonical__isnull=False)
+
+# What a shopping list line groups a slot's ingredients by (with the unit)
+ITEM_KEY = Coalesce(F(f'{_INGREDIENT}canonical__name'), Lower(Trim(f'{_INGREDIENT}name')))
+
+VERSION_KEY = 'shopping_list:version:{pk}'
+CACHE_KEY = 'shopping_list:{pk}:v{version}:c{categorizer}'
+# How long a computed list is kept; a version bump makes it unreachable sooner
+SHOPPING_LIST_TIMEOUT = 60 * 60 * 24
+
+_pending = threading.local()
+
+
+class ShoppingListItem:
+    """One aggregated line of a shopping list."""
+
+    def __init__(
+        self,
+        name: str,
+        base_quantity: Optional[Decimal],
+        base_unit: str,
+        category: str,
+        recipes: List[str],
+        key: Optional[str] = None
+    ) -> None:
+        """
+        Initialize the item.
+
+        Args:
+            name: Display name
+            base_quantity: Total in ``base_unit`` (None when no amount was given)
+            base_unit: Aggregation unit (g, ml, item or a normalized unit name)
+            category: Ingredient category name
+            recipes: Titles of the recipes needing the item
+            key: Grouping key (canonical name, else lower-cased name)
+        """
+        self.key = key if key is not None else name.lower()
+        self.name = name
+        self.base_quantity = base_quantity
+        self.base_unit = base_unit
+        self.category = category
+        self.recipes = recipes
+        self.quantity, self.unit = format_quantity(base_quantity, base_unit)
+
+    def __repr__(self) -> str:
+        return f"<ShoppingListItem {self.quantity} {self.unit} {self.name}>"
+
+
+class ShoppingListCategory:
+    """Items of one category, sorted by name."""
+
+    def __init__(self, name: str, display_order: int, items: List[ShoppingListItem]) -> None:
+        self.name = name
+        self.display_order = display_order
+        self.items = sorted(items, key=lambda item: item.name.lower())
+
+
+class ShoppingList:
+    """
+    Aggregated shopping list of a meal plan, grouped by category.
+
+    Usage:
+        shopping_list = get_shopping_list(meal_plan)
+        for group in shopping_list.categories:
+            ...
+    """
+
+    def __init__(self, categories: List[ShoppingListCategory]) -> None:
+        self.categories = sorted(categories, key=lambda group: (group.display_order, group.name))
+
+    @property
+    def items(self) -> List[ShoppingListItem]:
+        """Every item, in category then name order."""
+        return [item for group in self.categories for item in group.items]
+
+    @property
+    def total_items(self) -> int:
+        return sum(len(group.items) for group in self.categories)
+
+    def __bool__(self) -> bool:
+        return bool(self.categories)
+
+
+def _aggregate_rows(meal_plan):
+    """The grouped ingredient totals of a meal plan, as one query."""
+    return (
+        MealSlot.objects
+        .filter(meal_plan=meal_plan, recipe__isnull=False, recipe__ingredients__isnull=False)
+        .annotate(
+            item_key=ITEM_KEY,
+            item_unit=Case(
+                When(_RESOLVED, then=F(f'{_INGREDIENT}base_unit')),
+                default=Lower(Trim(f'{_INGREDIENT}unit')),
+            ),
+        )
+        .values('item_key', 'item_unit')
+        .annotate(
+            name=Min(Coalesce(
+                F(f'{_INGREDIENT}canonical__display_name'), F(f'{_INGREDIENT}name')
+            )),
+            total=Sum(
+                Case(
+                    When(_RESOLVED, then=F(f'{_INGREDIENT}base_quantity')),
+                    default=F(f'{_INGREDIENT}quantity'),
+                ) * F('servings'),
+                output_field=DecimalField(max_digits=20, decimal_places=3),
+            ),
+            category_id=Min(Coalesce(
+                F(f'{_INGREDIENT}category_id'), F(f'{_INGREDIENT}canonical__category_id')
+            )),
+            recipes=ArrayAgg('recipe__title', distinct=True, ordering='recipe__title'),
+        )
+        .order_by()
+    )
+
+
+def resolve_category(categorizer, category_id: Optional[int], name: str) -> Tuple[str, int]:
+    """
+    The (name, display order) of the category a shopping list line goes in.
+
+    Args:
+        categorizer: Categorizer from ``get_categorizer()``
+        category_id: The ingredient's category, else its canonical ingredient's
+        name: Ingredient name, matched by keyword when the category is unusable
+
+    Returns:
+        tuple: Category name and display order, 'Other' when nothing matches
+    """
+    if category_id not in categorizer.names:
+        # Missing or inactive category
+        category_id = categorizer.match(name)
+    if category_id is None:
+        return OTHER_CATEGORY, OTHER_DISPLAY_ORDER
+    return categorizer.names[category_id], categorizer.orders[category_id]
+
+
+def build_shopping_list(meal_plan) -> ShoppingList:
+    """
+    Aggregate a meal plan's ingredients into a categorized shopping list.
+
+    Ingredients without a category take their canonical ingredient's,
+    then the keyword categorizer's, then 'Other'.
+
+    Args:
+        meal_plan: MealPlan instance
+
+    Returns:
+        ShoppingList: Items grouped by category in display order
+    """
+    categorizer = get_categorizer()
+    groups: Dict[str, Tuple[int, List[ShoppingListItem]]] = {}
+
+    for row in _aggregate_rows(meal_plan):
+        category, order = resolve_category(categorizer, row['category_id'], row['name'])
+        item = ShoppingListItem(
+            name=row['name'],
+            base_quantity=row['total'],
+            base_unit=row['item_unit'] or '',
+            category=category,
+            recipes=row['recipes'],
+            key=row['item_key'],
+        )
+        groups.setdefault(category, (order, []))[1].append(item)
+
+    shopping_list = ShoppingList([
+        ShoppingListCategory(name, order, items) for name, (order, items) in groups.items()
+    ])
+    logger.debug(
+        f"Built shopping list for meal plan {meal_plan.pk}: {shopping_list.total_items} items"
+    )
+    return shopping_list
+
+
+def _new_version() -> int:
+    # Time-based, so a version recreated after eviction never matches
+    # a list cached under an earlier one
+    return time.time_ns()
+
+
+def _cache_key(plan_id: int) -> str:
+    """Cache key of a plan's list under the current plan and categorizer versions."""
+    version_key = VERSION_KEY.format(pk=plan_id)
+    found = cache.get_many([version_key, CATEGORIZER_VERSION_KEY])
+    version = found.get(version_key)
+    if version is None:
+        version = _new_version()
+        if not cache.add(version_key, version, None):
+            version = cache.get(version_key, version)
+    return CACHE_KEY.format(
+        pk=plan_id, version=version, categorizer=found.get(CATEGORIZER_VERSION_KEY)
+    )
+
+
+def get_shopping_list(meal_plan) -> ShoppingList:
+    """
+    The plan's shopping list, from the cache when it is current.
+
+    Args:
+        meal_plan: MealPlan instance
+
+    Returns:
+        ShoppingList: Cached or freshly built list
+    """
+    key = _cache_key(meal_plan.pk)
+    shopping_list = cache.get(key)
+    if shopping_list is None:
+        shopping_list = build_shopping_list(meal_plan)
+        cache.set(key, shopping_list, SHOPPING_LIST_TIMEOUT)
+    return shopping_list
+
+
+def precompute_shopping_list(meal_plan) -> ShoppingList:
+    """Build a plan's list and store it under the current version."""
+    shopping_list = build_shopping_list(meal_plan)
+    cache.set(_cache_key(meal_plan.pk), shopping_list, SHOPPING_LIST_TIMEOUT)
+    return shopping_list
+
+
+def bump_shopping_list_versions(plan_ids: Iterable[int]) -> None:
+    """Invalidate the cached shopping lists of the given plans."""
+    plan_ids = set(plan_ids)
+    for pk in plan_ids:
+        key = VERSION_KEY.format(pk=pk)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+    logger.debug(f"Bumped shopping list versions for meal plans {sorted(plan_ids)}")
+
+
+def _flush_refresh():
+    """Invalidate and precompute the lists of every plan queued on this thread."""
+    from .models import MealPlan
+    from .pricing import invalidate_meal_plan_cost
+    from .tasks import precompute_shopping_list_task
+
+    plan_ids = getattr(_pending, 'plan_ids', set())
+    recipe_ids = getattr(_pending, 'recipe_ids', set())
+    _pending.plan_ids, _pending.recipe_ids = set(), set()
+    try:
+        if recipe_ids:
+            plan_ids |= set(
+                MealSlot.objects.filter(recipe_id__in=recipe_ids)
+                .values_list('meal_plan_id', flat=True).distinct()
+            )
+        if not plan_ids:
+            return
+        bump_shopping_list_versions(plan_ids)
+        # Cost estimates price the list, so they go stale with it
+        invalidate_meal_plan_cost(*plan_ids)
+
+        # Past plans are rarely reopened; they are rebuilt on their next view
+        current_ids = MealPlan.objects.filter(
+            pk__in=plan_ids, end_date__gte=timezone.localdate()
+        ).values_list('pk', flat=True)
+        for plan_id in current_ids:
+            precompute_shopping_list_task.delay(plan_id)
+    except Exception as e:
+        logger.error(f"Error refreshing shopping lists: {str(e)}")
+
+
+def queue_shopping_list_refresh(plan_ids: Iterable[int] = (), recipe_ids: Iterable[int] = ()) -> None:
+    """
+    Invalidate and precompute shopping lists once the transaction commits.
+
+    The plans' cost estimates, which price their lists, are dropped too.
+
+    Plans touched repeatedly in one transaction (e.g. a recipe saved with
+    all its ingredients) are refreshed once; plans using a queued recipe
+    are looked up with one query at commit.
+
+    Args:
+        plan_ids: MealPlan primary keys
+        recipe_ids: Recipe primary keys whose plans need refreshing
+    """
+    plan_ids = {pk for pk in plan_ids if pk}
+    recipe_ids = {pk for pk in recipe_ids if pk}
+    if not plan_ids and not recipe_ids:
+        return
+    if not hasattr(_pending, 'plan_ids'):
+        _pending.plan_ids, _pending.recipe_ids = set(), set()
+    _pending.plan_ids.update(plan_ids)
+    _pending.recipe_ids.update(recipe_ids)
+    transaction.on_commit(_flush_refresh)
+
+
+def write_shopping_list_csv(writer, shopping_list: ShoppingList) -> None:
+    """
+    Write shopping list rows (one per item) to a ``csv.writer``.
+
+    Columns: Category, Item, Quantity, Unit, Needed For.
+    """
+    for item in shopping_list.items:
+        writer.writerow([
+            item.category,
+            item.name,
+            item.quantity if item.base_quantity is not None else '',
+            item.unit,
+            ', '.join(item.recipes),
+        ])
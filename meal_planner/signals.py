@@ -21,10 +21,14 @@ Handles automatic calendar synchronization when meal plans change.
 """
 
 import logging
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, pre_delete
 from django.dispatch import receiver
 
+from asda_scraper.matching import matches_updated, products_updated
 from meal_planner.models import MealSlot, CalendarEvent
+from meal_planner.pricing import bump_price_version
+from meal_planner.shopping import queue_shopping_list_refresh
+from recipe_hub.models import Ingredient, Recipe
 # Commented out to avoid Celery errors in development
 # from meal_planner.tasks import sync_user_calendar, delete_calendar_event
 
@@ -70,4 +74,70 @@ def remove_meal_slot_from_calendar(sender, instance, **kwargs):
             logger.info(f"Calendar event deletion would be triggered for meal slot {instance.id} (disabled in dev)")
             
     except Exception as e:
-        logger.error(f"Error in calendar removal signal: {str(e)}")
\ No newline at end of file
+        logger.error(f"Error in calendar removal signal: {str(e)}")
+
+@receiver(post_save, sender=MealSlot)
+@receiver(post_delete, sender=MealSlot)
+def refresh_shopping_list_on_slot_change(sender, instance, raw=False, **kwargs):
+    """Invalidate and precompute a plan's shopping list when its slots change."""
+    if raw:
+        return
+    try:
+        queue_shopping_list_refresh(plan_ids=[instance.meal_plan_id])
+    except Exception as e:
+        logger.error(f"Error queueing shopping list refresh: {str(e)}")
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def refresh_shopping_list_on_ingredient_change(sender, instance, raw=False, **kwargs):
+    """Invalidate and precompute shopping lists of plans using the edited recipe."""
+    if raw:
+        return
+    try:
+        queue_shopping_list_refresh(recipe_ids=[instance.recipe_id])
+    except Exception as e:
+        logger.error(f"Error queueing shopping list refresh: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_shopping_list_on_title_change(sender, instance, created, raw=False,
+                                          update_fields=None, **kwargs):
+    """Refresh shopping lists that name a recipe when its title may have changed."""
+    if raw or created:
+        return
+    if update_fields is not None and 'title' not in update_fields:
+        return
+    try:
+        queue_shopping_list_refresh(recipe_ids=[instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing shopping list refresh: {str(e)}")
+
+
+@receiver(pre_delete, sender=Recipe)
+def refresh_shopping_list_on_recipe_delete(sender, instance, **kwargs):
+    """
+    Refresh the plans (and cost estimates) using a recipe that is being deleted.
+
+    Their slots are emptied (SET_NULL) without a MealSlot signal, and
+    afterwards the plans can no longer be found from the recipe, so
+    they are looked up before the delete.
+    """
+    try:
+        plan_ids = list(
+            MealSlot.objects.filter(recipe=instance)
+            .values_list('meal_plan_id', flat=True).distinct()
+        )
+        queue_shopping_list_refresh(plan_ids=plan_ids)
+    except Exception as e:
+        logger.error(f"Error queueing shopping list refresh for deleted recipe {instance.pk}: {str(e)}")
+
+
+@receiver(products_updated)
+@receiver(matches_updated)
+def invalidate_meal_plan_costs_on_price_change(sender, **kwargs):
+    """Invalidate all cost estimates when prices or product matches change."""
+    try:
+        bump_price_version()
+    except Exception as e:
+        logger.error(f"Error bumping price version: {str(e)}")
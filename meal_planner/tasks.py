@@ -1,19 +1,26 @@
 """
-Celery tasks for calendar synchronization.
+Celery tasks for calendar synchronization, CSV recipe imports and
+shopping lists.
 
-Handles background synchronization of meal plans with Outlook calendar.
+Handles background synchronization of meal plans with Outlook calendar,
+background processing of admin recipe CSV uploads and precomputation of
+meal plan shopping lists after edits.
 """
 
 import logging
+from datetime import timedelta
 from typing import List
 
 from celery import shared_task
 from django.contrib.auth.models import User
+from django.db.models import Q
 from django.utils import timezone
 
 from auth_hub.services.microsoft_auth import OutlookCalendarService
 from meal_planner.models import MealSlot, CalendarEvent
-from meal_planner.models import MealPlan
+from meal_planner.models import MealPlan, RecipeCSVUpload
+from meal_planner.shopping import precompute_shopping_list
+from meal_planner.utils.csv_processor import RecipeCSVProcessor
 
 logger = logging.getLogger(__name__)
 
@@ -289,3 +296,137 @@ def sync_meal_plan_to_outlook(meal_plan_id: int, user_id: int) -> dict:
         results['errors'].append(str(e))
 
     return results
+
+
+# A processing upload without a checkpoint for this long is assumed to
+# belong to a worker that died and may be claimed again
+CSV_STALE_AFTER = timedelta(minutes=10)
+
+
+def _stale():
+    """Uploads not queued or checkpointed within CSV_STALE_AFTER."""
+    stale_before = timezone.now() - CSV_STALE_AFTER
+    return (
+        Q(checkpoint_at__lt=stale_before) |
+        Q(checkpoint_at__isnull=True, uploaded_at__lt=stale_before)
+    )
+
+
+def _claimable_uploads():
+    """Uploads waiting for a worker: queued, or processing but stalled."""
+    return RecipeCSVUpload.objects.filter(
+        Q(status='queued') | (Q(status='processing') & _stale())
+    )
+
+
+def enqueue_csv_upload(upload_id: int) -> bool:
+    """
+    Send a queued upload to a worker.
+    
+    If the broker refuses the message the upload is put back to
+    'pending', so it can be started again from the upload pages.
+    
+    Args:
+        upload_id: ID of the RecipeCSVUpload
+        
+    Returns:
+        bool: Whether the task was sent
+    """
+    try:
+        process_csv_upload.delay(upload_id)
+        return True
+    except Exception as e:
+        logger.error(f"Error queueing CSV upload {upload_id}: {str(e)}")
+        RecipeCSVUpload.objects.filter(pk=upload_id, status='queued').update(status='pending')
+        return False
+
+
+@shared_task(acks_late=True)
+def process_csv_upload(upload_id: int) -> dict:
+    """
+    Import a recipe CSV upload in checkpointed chunks.
+    
+    The upload is claimed atomically so only one worker processes it.
+    Re-running the task after a crash continues after the last
+    committed row.
+    
+    Args:
+        upload_id: ID of the RecipeCSVUpload
+        
+    Returns:
+        Dictionary with import results
+    """
+    claimed = _claimable_uploads().filter(pk=upload_id).update(
+        status='processing', checkpoint_at=timezone.now()
+    )
+    if not claimed:
+        logger.info(f"CSV upload {upload_id} is not waiting for processing, skipping")
+        return {'status': 'skipped', 'upload_id': upload_id}
+
+    csv_upload = RecipeCSVUpload.objects.select_related('uploaded_by').get(pk=upload_id)
+    try:
+        processor = RecipeCSVProcessor(csv_upload, csv_upload.uploaded_by)
+        success_count, failed_count, errors = processor.process()
+    except Exception as e:
+        logger.error(f"Error processing CSV upload {upload_id}: {str(e)}")
+        return {'status': 'error', 'upload_id': upload_id, 'reason': str(e)}
+
+    return {
+        'status': csv_upload.status,
+        'upload_id': upload_id,
+        'successful_imports': success_count,
+        'failed_imports': failed_count,
+    }
+
+
+@shared_task
+def resume_stalled_csv_uploads() -> dict:
+    """
+    Requeue uploads whose worker stopped before finishing.
+    
+    Covers uploads stalled while processing and queued uploads whose
+    task message never reached a worker. Scheduled every 10 minutes by
+    CELERY_BEAT_SCHEDULE; run the resume_csv_uploads command when no
+    beat process is running.
+    
+    Returns:
+        Dictionary with the requeued upload IDs
+    """
+    upload_ids = list(
+        RecipeCSVUpload.objects.filter(_stale(), status__in=['queued', 'processing'])
+        .values_list('pk', flat=True)
+    )
+    upload_ids = [upload_id for upload_id in upload_ids if enqueue_csv_upload(upload_id)]
+
+    if upload_ids:
+        logger.info(f"Requeued {len(upload_ids)} stalled CSV uploads")
+    return {'status': 'requeued', 'upload_ids': upload_ids}
+
+
+@shared_task
+def precompute_shopping_list_task(meal_plan_id: int) -> dict:
+    """
+    Build and cache a meal plan's shopping list after its version changed.
+    
+    Args:
+        meal_plan_id: ID of the MealPlan
+        
+    Returns:
+        Dictionary with the number of items cached
+    """
+    meal_plan = MealPlan.objects.filter(pk=meal_plan_id).first()
+    if meal_plan is None:
+        logger.info(f"Meal plan {meal_plan_id} no longer exists, skipping shopping list")
+        return {'status': 'skipped', 'meal_plan_id': meal_plan_id}
+
+    try:
+        shopping_list = precompute_shopping_list(meal_plan)
+    except Exception as e:
+        logger.error(f"Error precomputing shopping list for meal plan {meal_plan_id}: {str(e)}")
+        return {'status': 'error', 'meal_plan_id': meal_plan_id, 'reason': str(e)}
+
+    return {
+        'status': 'cached',
+        'meal_plan_id': meal_plan_id,
+        'total_items': shopping_list.total_items,
+    }
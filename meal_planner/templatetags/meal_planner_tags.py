@@ -11,6 +11,7 @@ from django import template
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 from django.core.serializers.json import DjangoJSONEncoder
+from recipe_hub.images import THUMB_WIDTH, image_variant_url
 
 logger = logging.getLogger(__name__)
 register = template.Library()
@@ -157,7 +158,7 @@ def recipe_to_json(recipe):
             'difficulty': recipe.difficulty,
             'difficulty_display': recipe.get_difficulty_display(),
             'categories': [cat.name for cat in recipe.categories.all()],
-            'image_url': recipe.image.url if recipe.image else None,
+            'image_url': image_variant_url(recipe, THUMB_WIDTH),
             'author': recipe.author.username,
             'is_public': recipe.is_public,
             'average_rating': getattr(recipe, 'avg_rating', 0) or 0,
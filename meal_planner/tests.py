@@ -1,3 +1,264 @@
-from django.test import TestCase
+"""
+Tests for meal_planner services.
+"""
 
-# Create your tests here.
+import datetime
+import shutil
+import tempfile
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from recipe_hub.categorizer import IngredientCategorizer
+from recipe_hub.models import Ingredient, IngredientCategory, Recipe
+from . import pricing, tasks
+from .models import MealPlan, MealSlot, MealType, RecipeCSVUpload
+from .shopping import (
+    OTHER_CATEGORY, OTHER_DISPLAY_ORDER, ShoppingList, ShoppingListCategory,
+    ShoppingListItem, build_shopping_list, get_shopping_list, queue_shopping_list_refresh,
+    resolve_category
+)
+from .utils.csv_processor import RecipeCSVProcessor
+
+
+class ResolveCategoryTests(SimpleTestCase):
+    """Which category a shopping list line is grouped under."""
+
+    def setUp(self):
+        self.categorizer = IngredientCategorizer([
+            (1, 'Produce', 1, ['tomato']),
+            (2, 'Dairy', 2, ['milk']),
+        ])
+
+    def test_ingredient_category_wins(self):
+        self.assertEqual(resolve_category(self.categorizer, 2, 'Tomato'), ('Dairy', 2))
+
+    def test_unusable_category_falls_back_to_keywords(self):
+        self.assertEqual(resolve_category(self.categorizer, None, 'Cherry tomatoes'), ('Produce', 1))
+        # Inactive categories are not in the categorizer
+        self.assertEqual(resolve_category(self.categorizer, 99, 'Whole milk'), ('Dairy', 2))
+
+    def test_unmatched_goes_to_other(self):
+        self.assertEqual(
+            resolve_category(self.categorizer, None, 'Saffron'),
+            (OTHER_CATEGORY, OTHER_DISPLAY_ORDER)
+        )
+
+
+class ShoppingListOrderingTests(SimpleTestCase):
+    """Categories sort by display order, items by name."""
+
+    def _item(self, name, category):
+        return ShoppingListItem(name, Decimal('1'), 'item', category, [])
+
+    def test_ordering(self):
+        shopping_list = ShoppingList([
+            ShoppingListCategory(OTHER_CATEGORY, OTHER_DISPLAY_ORDER, [self._item('salt', OTHER_CATEGORY)]),
+            ShoppingListCategory('Produce', 1, [
+                self._item('tomato', 'Produce'), self._item('Basil', 'Produce'),
+            ]),
+        ])
+        self.assertEqual([group.name for group in shopping_list.categories], ['Produce', OTHER_CATEGORY])
+        self.assertEqual([item.name for item in shopping_list.items], ['Basil', 'tomato', 'salt'])
+        self.assertEqual(shopping_list.total_items, 3)
+
+    def test_empty_list_is_falsy(self):
+        self.assertFalse(ShoppingList([]))
+
+
+class ShoppingListCostTests(SimpleTestCase):
+    """Cost estimates price the lines of the shopping list."""
+
+    def _estimate(self, items, products):
+        shopping_list = ShoppingList([ShoppingListCategory('Produce', 1, items)])
+        with mock.patch.object(pricing, 'get_shopping_list', return_value=shopping_list), \
+                mock.patch.object(pricing, '_matched_products', return_value=products):
+            return pricing.compute_shopping_list_cost(object())
+
+    def test_lines_are_priced_once_by_item_key(self):
+        estimate = self._estimate(
+            [
+                ShoppingListItem('Onions', Decimal('3'), 'item', 'Produce', [], key='onion'),
+                ShoppingListItem('Rice', Decimal('250'), 'g', 'Produce', [], key='rice'),
+                ShoppingListItem('Saffron', Decimal('1'), 'g', 'Produce', [], key='saffron'),
+            ],
+            {'onion': (Decimal('0.30'), None), 'rice': (Decimal('2.00'), '£2.00/kg')},
+        )
+        self.assertEqual(estimate['total'], Decimal('1.40'))
+        self.assertEqual(estimate['by_category'], {'Produce': Decimal('1.40')})
+        self.assertEqual((estimate['priced_items'], estimate['unpriced_items']), (2, 1))
+
+    def test_unit_price_in_another_dimension_buys_one_pack(self):
+        self.assertEqual(
+            pricing.estimate_line_cost(Decimal('20'), 'ml', Decimal('0.65'), '65p/750g'),
+            Decimal('0.65')
+        )
+
+
+class BuildShoppingListTests(TestCase):
+    """Aggregation of a plan's ingredients and the cached list."""
+
+    def setUp(self):
+        cache.clear()
+        self.dairy = IngredientCategory.objects.create(
+            name='Dairy', display_order=2, keywords='milk'
+        )
+        self.user = User.objects.create_user(username='planner', password='x', is_staff=True)
+        self.dinner = MealType.objects.create(name='Test dinner', display_order=3)
+        self.plan = MealPlan.objects.create(
+            owner=self.user, name='Week',
+            start_date=datetime.date(2026, 1, 5), end_date=datetime.date(2026, 1, 11)
+        )
+
+    def _recipe(self, title, *ingredients):
+        recipe = Recipe.objects.create(
+            author=self.user, title=title, description=title, prep_time=5, cook_time=10
+        )
+        for name, quantity, unit in ingredients:
+            Ingredient.objects.create(recipe=recipe, name=name, quantity=quantity, unit=unit)
+        return recipe
+
+    def _slot(self, day, recipe, servings=1):
+        return MealSlot.objects.create(
+            meal_plan=self.plan, date=datetime.date(2026, 1, day),
+            meal_type=self.dinner, recipe=recipe, servings=servings
+        )
+
+    def test_quantities_are_summed_across_recipes(self):
+        porridge = self._recipe('Porridge', ('Milk', Decimal('200'), 'ml'))
+        pancakes = self._recipe('Pancakes', ('milk', Decimal('100'), 'ml'))
+        self._slot(5, porridge, servings=2)
+        self._slot(6, pancakes)
+
+        shopping_list = build_shopping_list(self.plan)
+
+        self.assertEqual(shopping_list.total_items, 1)
+        item = shopping_list.items[0]
+        self.assertEqual(item.name.lower(), 'milk')
+        self.assertEqual(item.base_quantity, Decimal('500'))
+        self.assertEqual(item.category, 'Dairy')
+        self.assertEqual(item.recipes, ['Pancakes', 'Porridge'])
+
+    def test_empty_slots_are_ignored(self):
+        self._slot(5, None)
+        self.assertFalse(build_shopping_list(self.plan))
+
+    def test_cached_list_is_refreshed_after_commit(self):
+        recipe = self._recipe('Porridge', ('Milk', Decimal('200'), 'ml'))
+        self._slot(5, recipe)
+        self.assertEqual(get_shopping_list(self.plan).items[0].base_quantity, Decimal('200'))
+
+        Ingredient.objects.filter(recipe=recipe).update(
+            quantity=Decimal('300'), base_quantity=Decimal('300')
+        )
+        self.assertEqual(get_shopping_list(self.plan).items[0].base_quantity, Decimal('200'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            queue_shopping_list_refresh(recipe_ids=[recipe.pk])
+        self.assertEqual(get_shopping_list(self.plan).items[0].base_quantity, Decimal('300'))
+
+    def test_recipe_title_change_refreshes_list(self):
+        recipe = self._recipe('Porridge', ('Milk', Decimal('200'), 'ml'))
+        self._slot(5, recipe)
+        get_shopping_list(self.plan)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.title = 'Oat porridge'
+            recipe.save()
+        self.assertEqual(get_shopping_list(self.plan).items[0].recipes, ['Oat porridge'])
+
+    def test_recipe_delete_refreshes_list(self):
+        recipe = self._recipe('Porridge', ('Milk', Decimal('200'), 'ml'))
+        self._slot(5, recipe)
+        self.assertTrue(get_shopping_list(self.plan))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.delete()
+        self.assertFalse(get_shopping_list(self.plan))
+
+
+class CSVUploadResumeTests(TestCase):
+    """Checkpointed CSV imports and the sweep that restarts them."""
+
+    ROWS = 'title,description,prep_time,cook_time,servings,ingredients,instructions\n' + ''.join(
+        f'Recipe {n},Dish {n},5,10,2,1 cup rice,Cook|Serve\n' for n in range(1, 6)
+    )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='admin', password='x', is_staff=True)
+        self.upload = RecipeCSVUpload(uploaded_by=self.user, status='processing')
+        self.upload.file.save('recipes.csv', ContentFile(self.ROWS.encode('utf-8')))
+
+    def _stale(self, status):
+        RecipeCSVUpload.objects.filter(pk=self.upload.pk).update(
+            status=status, checkpoint_at=timezone.now() - tasks.CSV_STALE_AFTER * 2
+        )
+
+    def test_resume_continues_after_last_checkpoint(self):
+        checkpoint = RecipeCSVProcessor._checkpoint
+        calls = []
+
+        def die_after_first_chunk(processor, result):
+            calls.append(result)
+            if len(calls) > 1:
+                raise RuntimeError("worker stopped")
+            checkpoint(processor, result)
+
+        processor = RecipeCSVProcessor(self.upload, self.user)
+        processor.chunk_size = 2
+        with mock.patch.object(RecipeCSVProcessor, '_checkpoint', die_after_first_chunk):
+            with self.assertRaises(RuntimeError):
+                processor.process()
+
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.last_processed_row, 3)
+        self.assertEqual(self.upload.successful_imports, 2)
+        self.assertEqual(Recipe.objects.count(), 2)
+
+        self.upload.status = 'processing'
+        processor = RecipeCSVProcessor(self.upload, self.user)
+        processor.chunk_size = 2
+        self.assertEqual(processor.process()[:2], (5, 0))
+
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'completed')
+        self.assertEqual(self.upload.total_rows, 5)
+        self.assertEqual(
+            sorted(Recipe.objects.values_list('title', flat=True)),
+            [f'Recipe {n}' for n in range(1, 6)]
+        )
+
+    @mock.patch.object(tasks, 'process_csv_upload')
+    def test_stale_queued_and_processing_uploads_are_requeued(self, task):
+        for status in ('queued', 'processing'):
+            task.reset_mock()
+            self._stale(status)
+            self.assertEqual(tasks.resume_stalled_csv_uploads()['upload_ids'], [self.upload.pk])
+            task.delay.assert_called_once_with(self.upload.pk)
+
+    @mock.patch.object(tasks, 'process_csv_upload')
+    def test_recent_uploads_are_left_alone(self, task):
+        RecipeCSVUpload.objects.filter(pk=self.upload.pk).update(
+            status='queued', checkpoint_at=timezone.now()
+        )
+        self.assertEqual(tasks.resume_stalled_csv_uploads()['upload_ids'], [])
+        task.delay.assert_not_called()
+
+    @mock.patch.object(tasks, 'process_csv_upload')
+    def test_failed_enqueue_returns_upload_to_pending(self, task):
+        task.delay.side_effect = ConnectionError("broker down")
+        self._stale('queued')
+        self.assertEqual(tasks.resume_stalled_csv_uploads()['upload_ids'], [])
+        self.upload.refresh_from_db()
+        self.assertEqual(self.upload.status, 'pending')
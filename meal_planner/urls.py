@@ -10,6 +10,7 @@ from meal_planner.views.csv_upload_views import (
     CSVUploadView,
     csv_preview_view,
     csv_process_view,
+    csv_progress_view,
     csv_result_view,
     CSVHistoryView,
     csv_sample_download
@@ -37,6 +38,7 @@ urlpatterns = [
     path('slots/<int:pk>/update/', views.update_meal_slot, name='update_meal_slot'),
     path('slots/<int:pk>/delete/', views.delete_meal_slot, name='delete_meal_slot'),
     path('slots/create/', views.create_meal_slot, name='create_meal_slot'),
+    path('api/recipes/', views.recipe_picker_api, name='recipe_picker_api'),
     path('test/', views.test_endpoint, name='test_endpoint'),
    
     # Templates
@@ -59,6 +61,7 @@ urlpatterns = [
     path('admin/csv/upload/', CSVUploadView.as_view(), name='csv_upload'),
     path('admin/csv/preview/<int:upload_id>/', csv_preview_view, name='csv_preview'),
     path('admin/csv/process/<int:upload_id>/', csv_process_view, name='csv_process'),
+    path('admin/csv/progress/<int:upload_id>/', csv_progress_view, name='csv_progress'),
     path('admin/csv/result/<int:upload_id>/', csv_result_view, name='csv_result'),
     path('admin/csv/history/', CSVHistoryView.as_view(), name='csv_history'),
     path('admin/csv/sample/', csv_sample_download, name='csv_sample'),
@@ -1,19 +1,17 @@
 """
 CSV Processor for Recipe Imports
 
-Handles the actual processing of CSV files and recipe creation.
+Parses the admin recipe CSV layout and hands rows to the shared bulk
+import engine in ``recipe_hub.importing``.
 """
 
-import csv
-import io
 import json
 import logging
+import re
 from datetime import datetime
-from django.db import transaction
-from django.utils.text import slugify
 from django.contrib.auth import get_user_model
-from recipe_hub.models import Recipe, RecipeCategory, Ingredient, Instruction
-from meal_planner.models import MealType
+from django.utils import timezone
+from recipe_hub.importing import IMPORT_CHUNK_SIZE, ImportResult, RecipeBulkImporter, iter_csv_rows
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -23,9 +21,15 @@ class RecipeCSVProcessor:
     """
     Process CSV files and create recipes.
     
-    Handles parsing, validation, and database creation.
+    Handles parsing and validation; database creation is done in bulk
+    chunks by ``RecipeBulkImporter``. After every chunk the upload's
+    counters and ``last_processed_row`` are saved in the same transaction,
+    so an interrupted run resumes after the last committed row.
     """
     
+    # Rows written (and checkpointed) per transaction
+    chunk_size = IMPORT_CHUNK_SIZE
+    
     def __init__(self, csv_upload, user):
         """
         Initialize processor.
@@ -37,237 +41,196 @@ class RecipeCSVProcessor:
         self.csv_upload = csv_upload
         self.user = user
         self.errors = []
+        self.warnings = []
         self.success_count = 0
         self.failed_count = 0
+        self.total_rows = 0
+        self.last_row_read = 0
         
     def process(self):
         """
-        Process the entire CSV file.
+        Process the CSV file, resuming after the last checkpoint if any.
         
         Returns:
             tuple: (success_count, failed_count, errors)
         """
-        logger.info(f"Starting CSV processing for upload {self.csv_upload.id}")
+        upload = self.csv_upload
+        start_after = upload.last_processed_row
+        if start_after:
+            logger.info(f"Resuming CSV upload {upload.id} after row {start_after}")
+            # Totals of the rows already committed
+            self.success_count = upload.successful_imports
+            self.failed_count = upload.failed_imports
+            self.errors = list((upload.error_log or {}).get('errors', []))
+            self.warnings = list((upload.error_log or {}).get('warnings', []))
+        else:
+            logger.info(f"Starting CSV processing for upload {upload.id}")
         
         try:
-            # Read file content
-            self.csv_upload.file.seek(0)
-            content = self.csv_upload.file.read()
-            
-            # Decode content
-            decoded_content = self._decode_content(content)
-            
-            # Parse CSV
-            csv_reader = csv.DictReader(io.StringIO(decoded_content))
-            
-            # Process each row
-            total_rows = 0
-            for row_num, row in enumerate(csv_reader, start=2):
-                total_rows += 1
-                self._process_row(row, row_num)
+            result = ImportResult()
+            result.warnings.extend(self.warnings)
+            importer = RecipeBulkImporter(
+                self.user, create_missing_categories=True,
+                chunk_size=self.chunk_size, result=result
+            )
+            upload.file.open('rb')
+            try:
+                result = importer.import_rows(
+                    self._iter_recipes(result, start_after),
+                    on_chunk=self._checkpoint
+                )
+            finally:
+                upload.file.close()
             
             # Update upload record
-            self.csv_upload.total_rows = total_rows
-            self.csv_upload.successful_imports = self.success_count
-            self.csv_upload.failed_imports = self.failed_count
-            self.csv_upload.error_log = {
-                'errors': self.errors,
-                'processed_at': datetime.now().isoformat()
-            }
-            self.csv_upload.mark_completed()
+            self._apply_result(result)
+            upload.total_rows = self.total_rows
+            upload.mark_completed()
             
             logger.info(
-                f"CSV processing completed: {self.success_count} successful, "
-                f"{self.failed_count} failed out of {total_rows} total"
+                f"CSV processing completed: {upload.successful_imports} successful, "
+                f"{upload.failed_imports} failed out of {self.total_rows} total"
             )
             
         except Exception as e:
             logger.error(f"Fatal error processing CSV: {str(e)}")
-            self.csv_upload.status = 'failed'
-            self.csv_upload.error_log = {
+            upload.status = 'failed'
+            upload.error_log = {
+                **(upload.error_log or {}),
                 'fatal_error': str(e),
                 'processed_at': datetime.now().isoformat()
             }
-            self.csv_upload.save()
+            upload.save()
             raise
         
-        return self.success_count, self.failed_count, self.errors
+        return upload.successful_imports, upload.failed_imports, upload.error_log['errors']
     
-    def _decode_content(self, content):
-        """Try to decode content with different encodings."""
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
-            try:
-                return content.decode(encoding)
-            except UnicodeDecodeError:
+    def _apply_result(self, result):
+        """Copy running totals onto the upload record (unsaved)."""
+        upload = self.csv_upload
+        upload.successful_imports = self.success_count + result.created
+        upload.failed_imports = self.failed_count + result.failed
+        upload.last_processed_row = max(upload.last_processed_row, self.last_row_read)
+        upload.checkpoint_at = timezone.now()
+        upload.error_log = {
+            'errors': self.errors + result.error_messages(),
+            'warnings': result.warnings,
+            'processed_at': datetime.now().isoformat()
+        }
+    
+    def _checkpoint(self, result):
+        """Save progress; runs inside the transaction of the chunk just written."""
+        self._apply_result(result)
+        self.csv_upload.save(update_fields=[
+            'successful_imports', 'failed_imports', 'last_processed_row',
+            'checkpoint_at', 'error_log'
+        ])
+    
+    def _iter_recipes(self, result, start_after=0):
+        """
+        Stream normalized recipe dicts from the upload.
+        
+        Args:
+            result: ImportResult receiving row-level parse errors
+            start_after: Skip rows up to and including this row number
+            
+        Yields:
+            dict: Normalized recipe data for the bulk importer
+        """
+        for row_num, row in iter_csv_rows(self.csv_upload.file):
+            self.total_rows += 1
+            if row_num <= start_after:
                 continue
-        raise ValueError("Unable to decode CSV file")
+            # Rows are pulled chunk by chunk, so everything read so far is
+            # covered by the checkpoint written after the current chunk
+            self.last_row_read = row_num
+            try:
+                cleaned_row = {k: (v or '').strip() for k, v in row.items() if k}
+                yield self._parse_row(cleaned_row, row_num)
+            except Exception as e:
+                result.add_error(row_num, row.get('title') or '', str(e))
+                logger.error(f"Error processing row {row_num}: {str(e)}")
     
-    def _process_row(self, row, row_num):
+    def _parse_row(self, row, row_num):
         """
-        Process a single CSV row.
+        Convert a cleaned CSV row into the bulk importer's recipe dict.
         
         Args:
             row: Dictionary of row data
             row_num: Row number for error reporting
         """
-        try:
-            with transaction.atomic():
-                # Clean row data
-                cleaned_row = {k: v.strip() for k, v in row.items()}
-                
-                # Create recipe
-                recipe = self._create_recipe(cleaned_row)
-                
-                # Add categories
-                self._add_categories(recipe, cleaned_row.get('categories', ''))
-                
-                # Add meal types
-                self._add_meal_types(recipe, cleaned_row.get('meal_types', ''))
-                
-                # Add ingredients
-                self._add_ingredients(recipe, cleaned_row.get('ingredients', ''))
-                
-                # Add instructions
-                self._add_instructions(recipe, cleaned_row.get('instructions', ''))
-                
-                self.success_count += 1
-                logger.info(f"Successfully imported recipe: {recipe.title}")
-                
-        except Exception as e:
-            self.failed_count += 1
-            error_msg = f"Row {row_num}: {str(e)}"
-            self.errors.append(error_msg)
-            logger.error(f"Error processing row {row_num}: {str(e)}")
+        if not row.get('title'):
+            raise ValueError("Title is required")
+        
+        return {
+            'row_num': row_num,
+            'title': row['title'],
+            'description': row.get('description', ''),
+            'prep_time': int(row.get('prep_time') or 0),
+            'cook_time': int(row.get('cook_time') or 0),
+            'servings': int(row.get('servings') or 4),
+            'difficulty': row.get('difficulty', 'medium').lower(),
+            'is_public': row.get('is_public', '').lower() in ['true', '1', 'yes'],
+            'dietary_info': self._parse_dietary_info(row.get('dietary_info', '')),
+            'categories': self._split_list(row.get('categories', '')),
+            'meal_types': self._split_list(row.get('meal_types', '')),
+            'ingredients': self._parse_ingredients(row.get('ingredients', '')),
+            'instructions': self._parse_instructions(row.get('instructions', '')),
+        }
     
-    def _create_recipe(self, row):
-        """Create recipe from row data."""
-        # Generate unique slug
-        base_slug = slugify(row['title'])
-        slug = base_slug
-        counter = 1
-        while Recipe.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
-        
-        # Parse difficulty
-        difficulty = row.get('difficulty', 'medium').lower()
-        if difficulty not in ['easy', 'medium', 'hard']:
-            difficulty = 'medium'
-        
-        # Parse boolean fields
-        is_public = row.get('is_public', '').lower() in ['true', '1', 'yes']
-        
-        # Parse dietary info
-        dietary_info = {}
-        if row.get('dietary_info'):
-            try:
-                dietary_info = json.loads(row['dietary_info'])
-            except json.JSONDecodeError:
-                # Try comma-separated format
-                tags = [tag.strip() for tag in row['dietary_info'].split(',') if tag.strip()]
-                dietary_info = {'tags': tags}
-        
-        # Create recipe
-        recipe = Recipe.objects.create(
-            author=self.user,
-            title=row['title'],
-            slug=slug,
-            description=row['description'],
-            prep_time=int(row.get('prep_time', 0)),
-            cook_time=int(row.get('cook_time', 0)),
-            servings=int(row.get('servings', 4)),
-            difficulty=difficulty,
-            is_public=is_public,
-            dietary_info=dietary_info
-        )
-        
-        return recipe
+    def _split_list(self, value):
+        """Split a comma-separated list."""
+        return [item.strip() for item in value.split(',') if item.strip()]
     
-    def _add_categories(self, recipe, categories_str):
-        """Add categories to recipe."""
-        if not categories_str:
-            return
-        
-        categories = [cat.strip() for cat in categories_str.split(',') if cat.strip()]
-        
-        for cat_name in categories:
-            category, created = RecipeCategory.objects.get_or_create(
-                name=cat_name,
-                defaults={'slug': slugify(cat_name)}
-            )
-            recipe.categories.add(category)
-    
-    def _add_meal_types(self, recipe, meal_types_str):
-        """Add meal types to recipe."""
-        if not meal_types_str:
-            return
-        
-        meal_types = [mt.strip() for mt in meal_types_str.split(',') if mt.strip()]
-        
-        for mt_name in meal_types:
-            try:
-                meal_type = MealType.objects.get(name__iexact=mt_name)
-                recipe.meal_types.add(meal_type)
-            except MealType.DoesNotExist:
-                logger.warning(f"Meal type not found: {mt_name}")
+    def _parse_dietary_info(self, value):
+        """Parse dietary info as JSON, or as comma-separated tags."""
+        if not value:
+            return {}
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            # Try comma-separated format
+            return {'tags': self._split_list(value)}
     
-    def _add_ingredients(self, recipe, ingredients_str):
+    def _parse_ingredients(self, ingredients_str):
         """
-        Add ingredients to recipe.
+        Parse ingredients.
         
         Expected format: "2 cups flour, 1 tsp salt, 3 eggs"
         """
-        if not ingredients_str:
-            return
-        
-        ingredients = [ing.strip() for ing in ingredients_str.split(',') if ing.strip()]
-        
-        for order, ingredient_str in enumerate(ingredients, start=1):
+        ingredients = []
+        for order, ingredient_str in enumerate(self._split_list(ingredients_str), start=1):
             # Parse ingredient string
             parts = ingredient_str.split(' ', 2)
             
             if len(parts) >= 3:
-                quantity = parts[0]
-                unit = parts[1]
-                name = parts[2]
+                quantity, unit, name = parts[0], parts[1], parts[2]
             elif len(parts) == 2:
-                quantity = parts[0]
-                unit = ''
-                name = parts[1]
+                quantity, unit, name = parts[0], '', parts[1]
             else:
-                quantity = ''
-                unit = ''
-                name = ingredient_str
+                quantity, unit, name = '', '', ingredient_str
             
-            Ingredient.objects.create(
-                recipe=recipe,
-                name=name,
-                quantity=quantity,
-                unit=unit,
-                order=order
-            )
+            ingredients.append({
+                'name': name,
+                'quantity': quantity,
+                'unit': unit,
+                'order': order,
+            })
+        return ingredients
     
-    def _add_instructions(self, recipe, instructions_str):
+    def _parse_instructions(self, instructions_str):
         """
-        Add instructions to recipe.
+        Parse instructions.
         
         Expected format: "Step 1|Step 2|Step 3" or numbered list
         """
         if not instructions_str:
-            return
+            return []
         
         # Split by pipe or numbered patterns
         if '|' in instructions_str:
-            steps = [step.strip() for step in instructions_str.split('|') if step.strip()]
+            steps = instructions_str.split('|')
         else:
             # Try to split by numbered patterns (1., 2., etc.)
-            import re
             steps = re.split(r'\d+\.', instructions_str)
-            steps = [step.strip() for step in steps if step.strip()]
-        
-        for step_num, instruction in enumerate(steps, start=1):
-            Instruction.objects.create(
-                recipe=recipe,
-                step_number=step_num,
-                instruction=instruction
-            )
\ No newline at end of file
+        return [step.strip() for step in steps if step.strip()]
@@ -24,6 +24,7 @@ from .calendar_views import (
     create_meal_slot,
     update_meal_slot,
     delete_meal_slot,
+    recipe_picker_api,
     test_endpoint,
 )
 
@@ -61,6 +62,7 @@ __all__ = [
     'create_meal_slot',
     'update_meal_slot', 
     'delete_meal_slot',
+    'recipe_picker_api',
     'test_endpoint',
     
     # Template Views
@@ -12,16 +12,18 @@ from datetime import datetime, timedelta
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
 from django.http import JsonResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
 from django.views import View
 
 from auth_hub.models import ActivityLog
+from recipe_hub.images import THUMB_WIDTH, image_variant_url
 from recipe_hub.models import Recipe
+from recipe_hub.pagination import paginate_keyset
 from ..models import MealPlan, MealSlot, MealType
 from ..forms import QuickMealSlotForm
+from ..recipe_picker import picker_page_size, picker_recipes
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +34,7 @@ class MealPlanCalendarView(LoginRequiredMixin, View):
     """
     
     def get(self, request):
-        """Render calendar view with meal plans and recipes."""
+        """Render calendar view with meal plans (recipes load from the picker API)."""
         try:
             # Get user's meal slots (only ones with recipes assigned)
             try:
@@ -47,17 +49,6 @@ class MealPlanCalendarView(LoginRequiredMixin, View):
                 logger.error(f"Error querying meal slots: {str(e)}")
                 meal_slots = []
             
-            # Get user's recipes AND public recipes for the recipe selector
-            try:
-                user_recipes = Recipe.objects.filter(
-                    Q(author=request.user) | Q(is_public=True)
-                ).select_related('author').distinct()[:100]
-                
-                logger.info(f"Found {user_recipes.count()} recipes available for user {request.user.username}")
-            except Exception as e:
-                logger.error(f"Error querying recipes: {str(e)}")
-                user_recipes = []
-            
             # Serialize meal slots for calendar events
             calendar_events = []
             try:
@@ -85,28 +76,6 @@ class MealPlanCalendarView(LoginRequiredMixin, View):
                 logger.error(f"Error serializing meal slots: {str(e)}")
                 calendar_events = []
             
-            # Serialize recipes for the recipe selector
-            recipes_data = []
-            try:
-                for recipe in user_recipes:
-                    recipes_data.append({
-                        'id': recipe.id,
-                        'title': recipe.title,
-                        'slug': getattr(recipe, 'slug', ''),
-                        'prep_time': getattr(recipe, 'prep_time', 0),
-                        'cook_time': getattr(recipe, 'cook_time', 0),
-                        'total_time': getattr(recipe, 'prep_time', 0) + getattr(recipe, 'cook_time', 0),
-                        'servings': getattr(recipe, 'servings', 1),
-                        'difficulty': getattr(recipe, 'difficulty', 'medium'),
-                        'difficulty_display': recipe.get_difficulty_display() if hasattr(recipe, 'get_difficulty_display') else 'Medium',
-                        'image_url': recipe.image.url if hasattr(recipe, 'image') and recipe.image else None,
-                        'author': recipe.author.username,
-                        'is_public': getattr(recipe, 'is_public', False),
-                    })
-            except Exception as e:
-                logger.error(f"Error serializing recipes: {str(e)}")
-                recipes_data = []
-            
             # Get meal types
             meal_types_data = []
             try:
@@ -132,15 +101,13 @@ class MealPlanCalendarView(LoginRequiredMixin, View):
             
             context = {
                 'calendar_events': json.dumps(calendar_events),
-                'recipes_data': json.dumps(recipes_data),
                 'meal_types': json.dumps(meal_types_data),
                 'today': timezone.now().date().isoformat(),
                 'total_events': len(calendar_events),
-                'total_recipes': len(recipes_data),
             }
             
             logger.info(f"Calendar view loaded successfully for user {request.user.username}")
-            logger.info(f"Events: {len(calendar_events)}, Recipes: {len(recipes_data)}, Meal Types: {len(meal_types_data)}")
+            logger.info(f"Events: {len(calendar_events)}, Meal Types: {len(meal_types_data)}")
             
             return render(request, 'meal_planner/calendar.html', context)
             
@@ -526,7 +493,7 @@ def update_meal_slot(request, pk):
                         'cook_time': meal_slot.recipe.cook_time,
                         'servings': meal_slot.recipe.servings,
                         'difficulty': meal_slot.recipe.difficulty,
-                        'image_url': meal_slot.recipe.image.url if meal_slot.recipe.image else None,
+                        'image_url': image_variant_url(meal_slot.recipe, THUMB_WIDTH),
                     } if meal_slot.recipe else None,
                     'servings': meal_slot.servings,
                     'notes': meal_slot.notes,
@@ -591,6 +558,37 @@ def delete_meal_slot(request, pk):
         }, status=500)
 
 
+@login_required
+def recipe_picker_api(request):
+    """
+    JSON page of recipes for the meal slot recipe picker.
+
+    Accepts the filters of ``picker_recipes`` plus ``cursor`` and
+    ``limit``; returns one page with cursors for the neighbouring pages.
+    The recipes are loaded lazily by the meal plan and calendar pages.
+    """
+    if request.method != 'GET':
+        return JsonResponse({'success': False, 'error': 'GET required'}, status=405)
+
+    try:
+        queryset, sort_keys = picker_recipes(request.user, request.GET)
+        page = paginate_keyset(
+            queryset, sort_keys, request.GET.get('cursor'), picker_page_size(request.GET)
+        )
+        return JsonResponse({
+            'success': True,
+            'results': [serialize_recipe_for_json(recipe) for recipe in page.object_list],
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+        })
+    except Exception as e:
+        logger.error(f"Error loading picker recipes for user {request.user.username}: {str(e)}")
+        return JsonResponse({
+            'success': False,
+            'error': 'Unable to load recipes'
+        }, status=500)
+
+
 @login_required
 def test_endpoint(request):
     """Simple test endpoint to check if routing works."""
@@ -629,7 +627,7 @@ def serialize_recipe_for_json(recipe):
         'difficulty': getattr(recipe, 'difficulty', 'medium'),
         'difficulty_display': recipe.get_difficulty_display() if hasattr(recipe, 'get_difficulty_display') else 'Medium',
         'categories': [cat.name for cat in recipe.categories.all()] if hasattr(recipe, 'categories') else [],
-        'image_url': recipe.image.url if hasattr(recipe, 'image') and recipe.image else None,
+        'image_url': image_variant_url(recipe, THUMB_WIDTH),
         'author': recipe.author.username,
         'is_public': getattr(recipe, 'is_public', False),
         'average_rating': getattr(recipe, 'average_rating', 0),
@@ -14,13 +14,14 @@ from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.generic import ListView
 
 from meal_planner.forms.csv_upload import RecipeCSVUploadForm, CSVPreviewForm
 from meal_planner.models import RecipeCSVUpload
-from meal_planner.utils.csv_processor import RecipeCSVProcessor
+from meal_planner.tasks import enqueue_csv_upload
 
 logger = logging.getLogger(__name__)
 
@@ -165,51 +166,65 @@ def csv_preview_view(request, upload_id):
 @user_passes_test(is_admin_user)
 def csv_process_view(request, upload_id):
     """
-    Process the CSV file and create recipes.
+    Queue the CSV file for background import.
     
-    This is the actual import process.
+    Returns immediately; the result page shows progress until the
+    background task finishes.
     """
     csv_upload = get_object_or_404(RecipeCSVUpload, id=upload_id, uploaded_by=request.user)
     
-    if csv_upload.status != 'pending':
-        messages.warning(request, "This CSV has already been processed.")
-        return redirect('meal_planner:csv_history')
-    
     try:
-        # Update status
-        csv_upload.status = 'processing'
-        csv_upload.save()
+        with transaction.atomic():
+            queued = RecipeCSVUpload.objects.filter(
+                pk=csv_upload.pk, status='pending'
+            ).update(status='queued', checkpoint_at=timezone.now())
+            if queued:
+                transaction.on_commit(lambda: enqueue_csv_upload(csv_upload.pk))
         
-        # Process the CSV
-        processor = RecipeCSVProcessor(csv_upload, request.user)
-        success_count, failed_count, errors = processor.process()
-        
-        # Show results
-        if success_count > 0:
-            messages.success(
-                request, 
-                f"Successfully imported {success_count} recipes!"
-            )
-        
-        if failed_count > 0:
-            messages.warning(
-                request,
-                f"{failed_count} recipes failed to import. Check the error log for details."
-            )
+        if not queued:
+            messages.warning(request, "This CSV has already been processed.")
+            return redirect('meal_planner:csv_history')
         
+        logger.info(f"CSV upload {csv_upload.pk} queued by {request.user.username}")
+        messages.info(request, "Import started. You can leave this page while it runs.")
         return redirect('meal_planner:csv_result', upload_id=csv_upload.id)
         
     except Exception as e:
-        logger.error(f"Error processing CSV: {str(e)}")
+        logger.error(f"Error queueing CSV: {str(e)}")
         messages.error(request, f"Error processing CSV: {str(e)}")
-        
-        # Update status
-        csv_upload.status = 'failed'
-        csv_upload.save()
-        
         return redirect('meal_planner:csv_history')
 
 
+@login_required
+@user_passes_test(is_admin_user)
+def csv_progress_view(request, upload_id):
+    """
+    Return import progress for polling.
+    
+    Reads only the counter columns of the upload.
+    """
+    csv_upload = get_object_or_404(
+        RecipeCSVUpload.objects.only(
+            'status', 'total_rows', 'successful_imports', 'failed_imports',
+            'last_processed_row', 'checkpoint_at', 'processed_at'
+        ),
+        id=upload_id,
+        uploaded_by=request.user
+    )
+    
+    return JsonResponse({
+        'status': csv_upload.status,
+        'is_running': csv_upload.is_running,
+        'total_rows': csv_upload.total_rows,
+        'processed_rows': csv_upload.processed_rows,
+        'successful_imports': csv_upload.successful_imports,
+        'failed_imports': csv_upload.failed_imports,
+        'progress_percent': csv_upload.progress_percent,
+        'checkpoint_at': csv_upload.checkpoint_at.isoformat() if csv_upload.checkpoint_at else None,
+        'processed_at': csv_upload.processed_at.isoformat() if csv_upload.processed_at else None,
+    })
+
+
 @login_required
 @user_passes_test(is_admin_user)
 def csv_result_view(request, upload_id):
@@ -228,7 +243,8 @@ def csv_result_view(request, upload_id):
     context = {
         'csv_upload': csv_upload,
         'errors': errors,
-        'has_errors': len(errors) > 0
+        'has_errors': len(errors) > 0,
+        'progress_url': reverse('meal_planner:csv_progress', args=[csv_upload.id])
     }
     
     return render(request, 'meal_planner/admin/csv_result.html', context)
@@ -12,31 +12,26 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db import transaction
-from django.db.models import Q, Count, Avg
+from django.db.models import Count
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 import csv
 import logging
-from collections import defaultdict
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponse
 from django.shortcuts import render, get_object_or_404
 
 from ..models import MealPlan
-from recipe_hub.models import IngredientCategory
 
 logger = logging.getLogger(__name__)
-from auth_hub.models import ActivityLog
-from recipe_hub.models import Recipe
+from auth_hub.activity import log_activity
+from recipe_hub.dietary import DIETARY_FLAGS
 from ..models import MealPlan, MealSlot, MealType
 from ..forms import MealPlanForm, MealPlanFilterForm
 from django.http import HttpResponse
-from django.template.loader import render_to_string
-from collections import defaultdict
 import csv
-from decimal import Decimal
 import logging
 import traceback
 from datetime import date, datetime, timedelta
@@ -44,22 +39,18 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.db import transaction
-from django.db.models import Q, Count, Avg
+from django.db.models import Count
 from django.shortcuts import redirect, get_object_or_404, render  # Add get_object_or_404 and render here
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from django.http import HttpResponse  # Add this
-from django.template.loader import render_to_string  # Add this
-from collections import defaultdict  # Add this
 import csv  # Add this
-from decimal import Decimal  # Add this
 
-from auth_hub.models import ActivityLog
-from recipe_hub.models import Recipe
 from ..models import MealPlan, MealSlot, MealType
 from ..forms import MealPlanForm, MealPlanFilterForm
-from decimal import Decimal, InvalidOperation
+from ..pricing import get_shopping_list_cost
+from ..shopping import get_shopping_list, write_shopping_list_csv
 
 logger = logging.getLogger(__name__)
 
@@ -182,27 +173,6 @@ class MealPlanDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             'recipe__categories'
         ).order_by('date', 'meal_type__display_order')
         
-        # Get user's recipes AND public recipes for the recipe selector
-        try:
-            user_recipes = Recipe.objects.filter(
-                Q(author=self.request.user) | Q(is_public=True)
-            ).select_related(
-                'author'
-            ).prefetch_related(
-                'categories'
-            ).annotate(
-                annotated_avg_rating=Avg('ratings__rating'),
-                annotated_rating_count=Count('ratings')
-            ).order_by('-created_at')
-            
-            context['user_recipes'] = user_recipes
-            
-            logger.info(f"Found {user_recipes.count()} recipes available for user {self.request.user.username}")
-            
-        except Exception as e:
-            logger.error(f"Error fetching recipes for meal plan detail: {str(e)}")
-            context['user_recipes'] = Recipe.objects.none()
-        
         # Organize meal slots by week for better template display
         weeks = []
         current_date = meal_plan.start_date
@@ -238,7 +208,9 @@ class MealPlanDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
         context['organized_weeks'] = weeks
         context['meal_types'] = MealType.objects.all().order_by('display_order')
         
-        # Recipe categories for filtering in the modal
+        # Filter options for the recipe picker, which loads recipes lazily
+        # from meal_planner:recipe_picker_api
+        context['dietary_flags'] = DIETARY_FLAGS
         try:
             from recipe_hub.models import RecipeCategory
             context['recipe_categories'] = RecipeCategory.objects.filter(
@@ -248,40 +220,15 @@ class MealPlanDetailView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
             logger.warning(f"Error fetching recipe categories: {str(e)}")
             context['recipe_categories'] = []
         
-        # Shopping list preview (ingredients from all recipes)
-        ingredients = {}
-        for slot in meal_slots:
-            if slot.recipe:
-                try:
-                    # Handle the case where ingredients might not exist
-                    if hasattr(slot.recipe, 'ingredients'):
-                        for ingredient in slot.recipe.ingredients.all():
-                            key = f"{ingredient.name}_{ingredient.unit or 'unit'}"
-                            if key not in ingredients:
-                                ingredients[key] = {
-                                    'name': ingredient.name,
-                                    'unit': ingredient.unit or '',
-                                    'quantity': 0,
-                                    'recipes': []
-                                }
-                            
-                            # Calculate quantity based on servings
-                            multiplier = slot.servings or 1
-                            try:
-                                quantity = float(ingredient.quantity) * multiplier
-                                ingredients[key]['quantity'] += quantity
-                            except (ValueError, TypeError):
-                                # Handle non-numeric quantities
-                                pass
-                            
-                            if slot.recipe.title not in ingredients[key]['recipes']:
-                                ingredients[key]['recipes'].append(slot.recipe.title)
-                except Exception as e:
-                    logger.warning(f"Error processing ingredients for recipe {slot.recipe.id}: {str(e)}")
-                    continue
-        
-        context['ingredients_preview'] = list(ingredients.values())[:10]
-        context['total_ingredients'] = len(ingredients)
+        # Shopping list preview (cached per plan version, see meal_planner.shopping)
+        try:
+            shopping_list = get_shopping_list(meal_plan)
+            context['ingredients_preview'] = shopping_list.items[:10]
+            context['total_ingredients'] = shopping_list.total_items
+        except Exception as e:
+            logger.warning(f"Error building shopping list preview for meal plan {meal_plan.pk}: {str(e)}")
+            context['ingredients_preview'] = []
+            context['total_ingredients'] = 0
         
         # Meal plan statistics
         total_slots = meal_slots.count()
@@ -396,10 +343,10 @@ class MealPlanCreateView(CreateView):
                 
                 # Log activity
                 try:
-                    ActivityLog.objects.create(
-                        user=self.request.user,
-                        action='create_meal_plan',
-                        details=f"Created meal plan: {meal_plan.name} with {slots_created} slots"
+                    log_activity(
+                        self.request.user,
+                        'create_meal_plan',
+                        f"Created meal plan: {meal_plan.name} with {slots_created} slots"
                     )
                 except Exception as log_error:
                     logger.warning(f"Failed to log activity: {str(log_error)}")
@@ -469,10 +416,10 @@ class MealPlanUpdateView(UserPassesTestMixin, UpdateView):
         
         # Log activity
         try:
-            ActivityLog.objects.create(
-                user=self.request.user,
-                action='update_meal_plan',
-                details=f"Updated meal plan: {meal_plan.name}"
+            log_activity(
+                self.request.user,
+                'update_meal_plan',
+                f"Updated meal plan: {meal_plan.name}"
             )
         except Exception as log_error:
             logger.warning(f"Failed to log activity: {str(log_error)}")
@@ -510,31 +457,33 @@ class MealPlanUpdateView(UserPassesTestMixin, UpdateView):
                 self._create_default_meal_types()
                 meal_types = MealType.objects.all().order_by('display_order')
             
-            # Create missing slots for new dates
-            current_date = meal_plan.start_date
-            while current_date <= meal_plan.end_date:
-                for meal_type in meal_types:
-                    try:
-                        slot, created = MealSlot.objects.get_or_create(
-                            meal_plan=meal_plan,
-                            date=current_date,
-                            meal_type=meal_type,
-                            defaults={
-                                'servings': 1,
-                                'notes': ''
-                            }
-                        )
-                        if created:
-                            slots_created += 1
+            # Create missing slots for new dates; one transaction, so the
+            # plan's shopping list is refreshed once rather than per slot
+            with transaction.atomic():
+                current_date = meal_plan.start_date
+                while current_date <= meal_plan.end_date:
+                    for meal_type in meal_types:
+                        try:
+                            slot, created = MealSlot.objects.get_or_create(
+                                meal_plan=meal_plan,
+                                date=current_date,
+                                meal_type=meal_type,
+                                defaults={
+                                    'servings': 1,
+                                    'notes': ''
+                                }
+                            )
+                            if created:
+                                slots_created += 1
                             
-                    except Exception as slot_error:
-                        logger.error(
-                            f"Error creating meal slot for {current_date} "
-                            f"- {meal_type.name}: {str(slot_error)}"
-                        )
-                        continue
+                        except Exception as slot_error:
+                            logger.error(
+                                f"Error creating meal slot for {current_date} "
+                                f"- {meal_type.name}: {str(slot_error)}"
+                            )
+                            continue
                 
-                current_date += timedelta(days=1)
+                    current_date += timedelta(days=1)
             
             if slots_created > 0:
                 logger.info(f"Created {slots_created} new meal slots")
@@ -597,10 +546,10 @@ class MealPlanDeleteView(UserPassesTestMixin, DeleteView):
         
         try:
             # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='delete_meal_plan',
-                details=f"Deleted meal plan: {meal_plan_name}"
+            log_activity(
+                request.user,
+                'delete_meal_plan',
+                f"Deleted meal plan: {meal_plan_name}"
             )
             
             response = super().delete(request, *args, **kwargs)
@@ -643,118 +592,26 @@ def generate_shopping_list(request, pk):
     
     logger.info(f"Generating shopping list for meal plan {pk} by user {request.user.username}")
     
-    # Get all active categories
-    categories = IngredientCategory.objects.filter(is_active=True).order_by('display_order')
-    
-    # Initialize category buckets
-    categorized_ingredients = defaultdict(list)
-    uncategorized_ingredients = []
-    
-    # Aggregate ingredients
-    ingredients = defaultdict(lambda: {
-        'quantity': 0,
-        'unit': '',
-        'recipes': [],
-        'category': None
-    })
-    
-    # Get all meal slots with recipes
-    meal_slots = meal_plan.meal_slots.filter(
-        recipe__isnull=False
-    ).select_related('recipe').prefetch_related(
-        'recipe__ingredients__category'
-    )
+    shopping_list = get_shopping_list(meal_plan)
     
-    for slot in meal_slots:
-        if hasattr(slot.recipe, 'ingredients'):
-            for ingredient in slot.recipe.ingredients.all():
-                key = f"{ingredient.name}_{ingredient.unit or 'unit'}"
-                
-                # Store ingredient details
-                ingredients[key]['name'] = ingredient.name
-                ingredients[key]['unit'] = ingredient.unit or ''
-                ingredients[key]['category'] = ingredient.category
-                
-                # Calculate quantity based on servings
-                try:
-                    quantity = float(ingredient.quantity or 0) * (slot.servings or 1)
-                    ingredients[key]['quantity'] += quantity
-                except (ValueError, TypeError):
-                    logger.warning(
-                        f"Invalid quantity for ingredient {ingredient.name} "
-                        f"in recipe {slot.recipe.title}"
-                    )
-                
-                # Track which recipes use this ingredient
-                recipe_info = f"{slot.recipe.title} ({slot.date.strftime('%b %d')})"
-                if recipe_info not in ingredients[key]['recipes']:
-                    ingredients[key]['recipes'].append(recipe_info)
-    
-    # Sort ingredients into categories
-    for key, data in ingredients.items():
-        item = {
-            'name': data['name'],
-            'quantity': data['quantity'],
-            'unit': data['unit'],
-            'recipes': data['recipes']
+    # Estimated ASDA cost (cached per meal plan)
+    cost_estimate = get_shopping_list_cost(meal_plan)
+    shopping_list_by_category = [
+        {
+            'category': group,
+            'items': group.items,
+            'estimated_cost': cost_estimate['by_category'].get(group.name),
         }
-        
-        # Check if ingredient has a category
-        if data['category']:
-            categorized_ingredients[data['category'].name].append(item)
-        else:
-            # Try to auto-categorize based on keywords
-            categorized = False
-            ingredient_name_lower = data['name'].lower()
-            
-            for category in categories:
-                keywords = category.get_keywords_list()
-                if any(keyword in ingredient_name_lower for keyword in keywords):
-                    categorized_ingredients[category.name].append(item)
-                    categorized = True
-                    break
-            
-            if not categorized:
-                uncategorized_ingredients.append(item)
-    
-    # Sort items within each category
-    for category_name in categorized_ingredients:
-        categorized_ingredients[category_name].sort(key=lambda x: x['name'].lower())
-    
-    uncategorized_ingredients.sort(key=lambda x: x['name'].lower())
-    
-    # Add uncategorized items to "Other" category if it exists
-    if uncategorized_ingredients:
-        if 'Other' in [cat.name for cat in categories]:
-            categorized_ingredients['Other'].extend(uncategorized_ingredients)
-        else:
-            categorized_ingredients['Uncategorized'] = uncategorized_ingredients
-    
-    # Convert to list format for template
-    shopping_list_by_category = []
-    for category in categories:
-        if category.name in categorized_ingredients:
-            shopping_list_by_category.append({
-                'category': category,
-                'items': categorized_ingredients[category.name]
-            })
-    
-    # Add any remaining categories not in the database
-    for category_name, items in categorized_ingredients.items():
-        if not any(cat['category'].name == category_name for cat in shopping_list_by_category if 'category' in cat and hasattr(cat['category'], 'name')):
-            shopping_list_by_category.append({
-                'category': {'name': category_name},
-                'items': items
-            })
-    
-    # Calculate totals
-    total_items = sum(len(cat['items']) for cat in shopping_list_by_category)
+        for group in shopping_list.categories
+    ]
+    total_items = shopping_list.total_items
     
     context = {
         'meal_plan': meal_plan,
         'shopping_list_by_category': shopping_list_by_category,
         'total_items': total_items,
-        'meal_count': meal_slots.count()
+        'meal_count': meal_plan.meal_slots.filter(recipe__isnull=False).count(),
+        'cost_estimate': cost_estimate
     }
     
     logger.info(f"Generated shopping list with {total_items} items in {len(shopping_list_by_category)} categories")
@@ -802,85 +659,13 @@ def download_shopping_list(request, pk):
         writer.writerow([])  # Empty row
         writer.writerow(['Category', 'Item', 'Quantity', 'Unit', 'Needed For'])
         
-        # Get all meal slots with recipes
-        meal_slots = meal_plan.meal_slots.filter(
-            recipe__isnull=False
-        ).select_related(
-            'recipe'
-        ).prefetch_related(
-            'recipe__ingredients'
-        )
-        
-        # Aggregate ingredients (similar logic as generate_shopping_list)
-        ingredients_dict = defaultdict(lambda: {
-            'quantity': Decimal('0'),
-            'unit': '',
-            'category': 'Other',
-            'recipes': set()
-        })
-        
-        for slot in meal_slots:
-            try:
-                recipe = slot.recipe
-                if hasattr(recipe, 'ingredients'):
-                    for ingredient in recipe.ingredients.all():
-                        try:
-                            key = f"{ingredient.name.lower()}_{ingredient.unit or 'unit'}"
-                            
-                            try:
-                                quantity = Decimal(str(ingredient.quantity or 0))
-                            except (ValueError, TypeError, InvalidOperation):
-                                quantity = Decimal('0')
-                                
-                            adjusted_quantity = quantity * Decimal(str(slot.servings))
-                            
-                            ingredients_dict[key]['quantity'] += adjusted_quantity
-                            ingredients_dict[key]['unit'] = ingredient.unit or ''
-                            ingredients_dict[key]['name'] = ingredient.name
-                            ingredients_dict[key]['recipes'].add(recipe.title)
-                            
-                            # Same categorization logic
-                            ingredient_lower = ingredient.name.lower()
-                            if any(item in ingredient_lower for item in ['chicken', 'beef', 'pork', 'fish', 'salmon', 'shrimp', 'turkey', 'bacon']):
-                                ingredients_dict[key]['category'] = 'Meat & Seafood'
-                            elif any(item in ingredient_lower for item in ['milk', 'cheese', 'yogurt', 'cream', 'butter']):
-                                ingredients_dict[key]['category'] = 'Dairy'
-                            elif any(item in ingredient_lower for item in ['lettuce', 'tomato', 'onion', 'pepper', 'carrot', 'celery', 'garlic', 'potato', 'broccoli']):
-                                ingredients_dict[key]['category'] = 'Produce'
-                            elif any(item in ingredient_lower for item in ['bread', 'roll', 'bun', 'bagel', 'muffin']):
-                                ingredients_dict[key]['category'] = 'Bakery'
-                            elif any(item in ingredient_lower for item in ['flour', 'sugar', 'salt', 'pepper', 'oil', 'vinegar', 'rice', 'pasta']):
-                                ingredients_dict[key]['category'] = 'Pantry'
-                            
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Error processing ingredient for CSV: {str(e)}")
-                            continue
-                            
-            except Exception as e:
-                logger.error(f"Error processing slot for CSV: {str(e)}")
-                continue
-        
-        # Organize by category and write to CSV
-        organized = defaultdict(list)
-        for key, data in ingredients_dict.items():
-            organized[data['category']].append(data)
-        
-        # Write ingredients by category
-        for category in sorted(organized.keys()):
-            for ingredient in sorted(organized[category], key=lambda x: x['name'].lower()):
-                writer.writerow([
-                    category,
-                    ingredient['name'],
-                    f"{ingredient['quantity']:.2f}".rstrip('0').rstrip('.'),
-                    ingredient['unit'],
-                    ', '.join(sorted(ingredient['recipes']))
-                ])
+        write_shopping_list_csv(writer, get_shopping_list(meal_plan))
         
         # Log activity
-        ActivityLog.objects.create(
-            user=request.user,
-            action='download_shopping_list',
-            details=f"Downloaded shopping list for '{meal_plan.name}'"
+        log_activity(
+            request.user,
+            'download_shopping_list',
+            f"Downloaded shopping list for '{meal_plan.name}'"
         )
         
         logger.info(f"Successfully downloaded shopping list for user {request.user.username}")
@@ -11,6 +11,7 @@ from datetime import timedelta
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.db import transaction
 from django.db.models import Q, Count
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
@@ -19,7 +20,7 @@ from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, TemplateView
 
-from auth_hub.models import ActivityLog
+from auth_hub.activity import log_activity
 from ..models import MealPlan, MealSlot, MealType, MealPlanTemplate
 from ..forms import MealPlanTemplateForm, ApplyTemplateForm
 
@@ -76,10 +77,10 @@ class MealPlanTemplateCreateView(CreateView):
             response = super().form_valid(form)
             
             # Log activity
-            ActivityLog.objects.create(
-                user=self.request.user,
-                action='create_template',
-                details=f"Created template: {self.object.name}"
+            log_activity(
+                self.request.user,
+                'create_template',
+                f"Created template: {self.object.name}"
             )
             
             messages.success(
@@ -127,10 +128,10 @@ class MealPlanTemplateUpdateView(UserPassesTestMixin, UpdateView):
             response = super().form_valid(form)
             
             # Log activity
-            ActivityLog.objects.create(
-                user=self.request.user,
-                action='update_template',
-                details=f"Updated template: {self.object.name}"
+            log_activity(
+                self.request.user,
+                'update_template',
+                f"Updated template: {self.object.name}"
             )
             
             messages.success(
@@ -172,10 +173,10 @@ class MealPlanTemplateDeleteView(UserPassesTestMixin, DeleteView):
         
         try:
             # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='delete_template',
-                details=f"Deleted template: {template_name}"
+            log_activity(
+                request.user,
+                'delete_template',
+                f"Deleted template: {template_name}"
             )
             
             response = super().delete(request, *args, **kwargs)
@@ -236,10 +237,10 @@ def apply_template(request):
                 meal_plan = template.create_meal_plan(start_date, name)
                 
                 # Log activity
-                ActivityLog.objects.create(
-                    user=request.user,
-                    action='apply_template',
-                    details=f"Created meal plan from template: {template.name}"
+                log_activity(
+                    request.user,
+                    'apply_template',
+                    f"Created meal plan from template: {template.name}"
                 )
                 
                 messages.success(
@@ -292,26 +293,28 @@ def create_meal_slots_for_plan(request):
                 MealType.objects.create(name='Snack', display_order=4),
             ]
         
-        # Create meal slots for each day and meal type
-        created_count = 0
-        current_date = meal_plan.start_date
+        # Create meal slots for each day and meal type in one transaction,
+        # so the shopping list is refreshed once rather than per slot
+        with transaction.atomic():
+            created_count = 0
+            current_date = meal_plan.start_date
         
-        while current_date <= meal_plan.end_date:
-            for meal_type in meal_types:
-                # Create slot if it doesn't exist
-                slot, created = MealSlot.objects.get_or_create(
-                    meal_plan=meal_plan,
-                    date=current_date,
-                    meal_type=meal_type,
-                    defaults={
-                        'servings': 1,
-                        'notes': ''
-                    }
-                )
-                if created:
-                    created_count += 1
+            while current_date <= meal_plan.end_date:
+                for meal_type in meal_types:
+                    # Create slot if it doesn't exist
+                    slot, created = MealSlot.objects.get_or_create(
+                        meal_plan=meal_plan,
+                        date=current_date,
+                        meal_type=meal_type,
+                        defaults={
+                            'servings': 1,
+                            'notes': ''
+                        }
+                    )
+                    if created:
+                        created_count += 1
             
-            current_date += timedelta(days=1)
+                current_date += timedelta(days=1)
         
         logger.info(f"Created {created_count} meal slots for plan {meal_plan.name}")
         
@@ -453,10 +456,10 @@ def sync_meal_plan(request, pk):
             
             if result['success']:
                 # Log the sync
-                ActivityLog.objects.create(
-                    user=request.user,
-                    action='outlook_sync',
-                    details=f"Synced meal plan '{meal_plan.name}' to Outlook"
+                log_activity(
+                    request.user,
+                    'outlook_sync',
+                    f"Synced meal plan '{meal_plan.name}' to Outlook"
                 )
                 
                 return JsonResponse({
@@ -590,10 +593,10 @@ def sync_all_meal_plans(request):
                     total_results['errors'].append(f"{meal_plan.name}: {str(e)}")
             
             # Log the sync
-            ActivityLog.objects.create(
-                user=request.user,
-                action='outlook_sync_all',
-                details=f"Synced {total_results['plans_synced']} meal plans to Outlook"
+            log_activity(
+                request.user,
+                'outlook_sync_all',
+                f"Synced {total_results['plans_synced']} meal plans to Outlook"
             )
             
             # Prepare response
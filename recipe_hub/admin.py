@@ -6,13 +6,14 @@ and user interactions.
 """
 
 from django.contrib import admin
-from django.db.models import Avg, Count
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import (
     RecipeCategory, Recipe, Ingredient, Instruction,
     RecipeRating, RecipeFavorite, RecipeComment
 )
-from .models import Recipe, RecipeCategory, Ingredient, Instruction, RecipeRating, RecipeFavorite, RecipeComment, IngredientCategory
+from .models import Recipe, RecipeCategory, Ingredient, Instruction, RecipeRating, RecipeFavorite, RecipeComment, IngredientCategory, CanonicalIngredient
+from .counters import refresh_recipe_counters
 
 @admin.register(RecipeCategory)
 class RecipeCategoryAdmin(admin.ModelAdmin):
@@ -68,7 +69,7 @@ class RecipeAdmin(admin.ModelAdmin):
     
     list_display = [
         'title', 'author_link', 'category_list', 'difficulty',
-        'total_time', 'avg_rating', 'rating_count', 'is_public',
+        'total_time', 'rating_display', 'rating_count', 'is_public',
         'is_featured', 'created_at'
     ]
     list_filter = [
@@ -126,26 +127,21 @@ class RecipeAdmin(admin.ModelAdmin):
         return f"{obj.total_time} min"
     total_time.short_description = 'Total Time'
     
-    def avg_rating(self, obj):
-        """Display average rating."""
-        avg = obj.ratings.aggregate(avg=Avg('rating'))['avg']
-        if avg:
+    def rating_display(self, obj):
+        """Display stored average rating."""
+        if obj.rating_count:
             return format_html(
-                '<span style="color: #f39c12;">★</span> {:.1f}',
-                avg
+                '<span style="color: #f39c12;">★</span> {}',
+                f"{obj.avg_rating:.1f}"
             )
         return '-'
-    avg_rating.short_description = 'Rating'
-    
-    def rating_count(self, obj):
-        """Display rating count."""
-        return obj.ratings.count()
-    rating_count.short_description = 'Reviews'
+    rating_display.short_description = 'Rating'
+    rating_display.admin_order_field = 'avg_rating'
     
     def get_queryset(self, request):
         """Optimize queryset with related data."""
         return super().get_queryset(request).prefetch_related(
-            'categories', 'ratings'
+            'categories'
         ).select_related('author')
     
     def make_featured(self, request, queryset):
@@ -315,13 +311,17 @@ class RecipeCommentAdmin(admin.ModelAdmin):
     
     def approve_comments(self, request, queryset):
         """Approve selected comments."""
+        recipe_ids = list(queryset.values_list('recipe_id', flat=True).distinct())
         updated = queryset.update(is_approved=True)
+        refresh_recipe_counters(recipe_ids)
         self.message_user(request, f'{updated} comments approved.')
     approve_comments.short_description = 'Approve selected comments'
     
     def disapprove_comments(self, request, queryset):
         """Disapprove selected comments."""
+        recipe_ids = list(queryset.values_list('recipe_id', flat=True).distinct())
         updated = queryset.update(is_approved=False)
+        refresh_recipe_counters(recipe_ids)
         self.message_user(request, f'{updated} comments disapproved.')
     disapprove_comments.short_description = 'Disapprove selected comments'
 
@@ -366,6 +366,28 @@ class IngredientCategoryAdmin(admin.ModelAdmin):
         return queryset
 
 
+@admin.register(CanonicalIngredient)
+class CanonicalIngredientAdmin(admin.ModelAdmin):
+    """Admin interface for canonical ingredients."""
+    
+    list_display = ['display_name', 'name', 'category', 'recipe_ingredient_count']
+    list_filter = ['category']
+    search_fields = ['name', 'display_name']
+    list_select_related = ['category']
+    readonly_fields = ['name', 'created_at']
+    
+    def recipe_ingredient_count(self, obj):
+        """Count recipe ingredients resolved to this ingredient."""
+        return obj.recipe_ingredients__count
+    recipe_ingredient_count.short_description = 'Uses'
+    recipe_ingredient_count.admin_order_field = 'recipe_ingredients__count'
+    
+    def get_queryset(self, request):
+        """Optimize queryset with usage counts."""
+        queryset = super().get_queryset(request)
+        return queryset.annotate(Count('recipe_ingredients'))
+
+
 # Admin site customization
 admin.site.site_header = 'KitchenCompass Admin'
 admin.site.site_title = 'KitchenCompass Admin'
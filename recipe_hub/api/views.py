@@ -6,11 +6,12 @@ Provides API endpoints for recipe-related operations.
 
 import logging
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Avg, Count
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.http import require_http_methods
-from recipe_hub.models import Recipe, RecipeCategory, RecipeFavorite
+from recipe_hub.models import Recipe, RecipeFavorite
+from recipe_hub.autocomplete import get_autocomplete_index
+from recipe_hub.stats import get_author_stats
 
 logger = logging.getLogger(__name__)
 
@@ -55,30 +56,15 @@ def recipe_stats(request):
     """
     Get statistics for user's recipes.
     
+    Includes totals, a per-recipe breakdown and monthly rating and
+    favorite trends, cached per user until their recipes are rated,
+    favorited, commented on or edited.
+    
     Returns:
         JSON response with recipe statistics
     """
     try:
-        user_recipes = Recipe.objects.filter(author=request.user)
-        
-        stats = {
-            'total_recipes': user_recipes.count(),
-            'public_recipes': user_recipes.filter(is_public=True).count(),
-            'private_recipes': user_recipes.filter(is_public=False).count(),
-            'total_ratings': sum(recipe.rating_count for recipe in user_recipes),
-            'total_favorites': sum(recipe.favorites.count() for recipe in user_recipes),
-            'average_rating': sum(
-                recipe.average_rating * recipe.rating_count 
-                for recipe in user_recipes if recipe.rating_count > 0
-            ) / max(sum(recipe.rating_count for recipe in user_recipes), 1),
-            'categories': list(
-                RecipeCategory.objects.filter(
-                    recipes__author=request.user
-                ).distinct().values('id', 'name', 'slug')
-            )
-        }
-        
-        return JsonResponse(stats)
+        return JsonResponse(get_author_stats(request.user.pk))
     except Exception as e:
         logger.error(f"Error getting recipe stats for user {request.user.username}: {str(e)}")
         return JsonResponse({'error': 'Unable to get statistics'}, status=500)
@@ -98,22 +84,8 @@ def recipe_search_suggestions(request):
         return JsonResponse({'suggestions': []})
     
     try:
-        # Search in recipe titles
-        recipes = Recipe.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query),
-            is_public=True
-        ).values('id', 'title', 'slug')[:10]
-        
-        # Search in categories
-        categories = RecipeCategory.objects.filter(
-            name__icontains=query,
-            is_active=True
-        ).values('id', 'name', 'slug')[:5]
-        
-        suggestions = {
-            'recipes': list(recipes),
-            'categories': list(categories)
-        }
+        # Answered from the in-memory index; no database query
+        suggestions = get_autocomplete_index().search(query, limit=10)
         
         return JsonResponse(suggestions)
     except Exception as e:
@@ -156,14 +128,9 @@ def popular_recipes(request):
         limit = min(int(request.GET.get('limit', 10)), 50)
         
         recipes = Recipe.objects.filter(
-            is_public=True
-        ).annotate(
-            avg_rating=Avg('ratings__rating'),
-            rating_count=Count('ratings'),
-            favorite_count=Count('favorites')
-        ).filter(
+            is_public=True,
             rating_count__gte=2  # At least 2 ratings
-        ).order_by('-avg_rating', '-favorite_count')[:limit]
+        ).select_related('author').order_by('-avg_rating', '-favorite_count')[:limit]
         
         recipe_data = []
         for recipe in recipes:
@@ -171,7 +138,7 @@ def popular_recipes(request):
                 'id': recipe.id,
                 'title': recipe.title,
                 'slug': recipe.slug,
-                'average_rating': recipe.avg_rating,
+                'average_rating': recipe.average_rating,
                 'rating_count': recipe.rating_count,
                 'favorite_count': recipe.favorite_count,
                 'author': recipe.author.username,
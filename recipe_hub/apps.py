@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RecipeHubConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'recipe_hub'
+
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import recipe_hub.signals  # noqa: F401
@@ -0,0 +1,508 @@
+"""
+In-memory autocomplete index for recipe search suggestions.
+
+Holds public recipe titles, active category names and the ingredient
+vocabulary as a sorted token list, so a typed prefix is answered with a
+binary search instead of a database query. The source data is shared
+between processes through the cache under a version key; each process
+keeps a compiled copy and only reloads it when the version changes.
+
+The full index is only built off-request: by the rebuild_autocomplete_index
+command, the periodic rebuild task, or a background thread when a process
+finds no index in the cache (requests get an empty index until it is
+published). Change signals never copy or recompile it; they write the
+changed recipes (or categories) to a small delta next to the base
+version, which each process compiles on its own and merges into results.
+"""
+
+import bisect
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+
+from asda_scraper.matching import normalize_name
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'recipe_autocomplete:version'
+PAYLOAD_KEY = 'recipe_autocomplete:payload:{version}'
+PAYLOAD_TIMEOUT = 60 * 60 * 24
+
+# Changes since the base version was built, and a stamp bumped on each change
+DELTA_KEY = 'recipe_autocomplete:delta:{version}'
+DELTA_STAMP_KEY = 'recipe_autocomplete:delta_stamp'
+DELTA_LOCK_KEY = 'recipe_autocomplete:delta_lock'
+DELTA_LOCK_TIMEOUT = 10
+
+# A delta holding more recipes than this triggers a background rebuild
+MAX_DELTA_RECIPES = 500
+
+BUILD_LOCK_KEY = 'recipe_autocomplete:building'
+BUILD_LOCK_TIMEOUT = 60 * 10
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+_index_lock = threading.Lock()
+_local: Dict[str, object] = {'version': None, 'stamp': None, 'base': None, 'index': None}
+
+
+def _tokens(text: str) -> List[str]:
+    """Lowercased words of ``text``."""
+    return _WORD_RE.findall((text or '').lower())
+
+
+class AutocompleteIndex:
+    """
+    Prefix index over recipe, category and ingredient names.
+
+    The source dictionaries are what gets cached; ``compile`` derives the
+    sorted token and code arrays searched at request time.
+    """
+
+    def __init__(
+        self,
+        recipes: Optional[Dict[int, Tuple[str, str, int]]] = None,
+        recipe_ingredients: Optional[Dict[int, Tuple[str, ...]]] = None,
+        categories: Optional[Dict[int, Tuple[str, str]]] = None
+    ) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            recipes: Recipe id -> (title, slug, popularity)
+            recipe_ingredients: Recipe id -> normalized ingredient names
+            categories: Category id -> (name, slug)
+        """
+        self.recipes = recipes or {}
+        self.recipe_ingredients = recipe_ingredients or {}
+        self.categories = categories or {}
+        self.compile()
+
+    def payload(self) -> dict:
+        """Source data for the cache."""
+        return {
+            'recipes': self.recipes,
+            'recipe_ingredients': self.recipe_ingredients,
+            'categories': self.categories,
+        }
+
+    def compile(self) -> None:
+        """
+        Build the sorted token arrays from the source data.
+
+        Every suggestion gets an integer code: recipes first (most popular
+        first), then categories, then ingredients (most used first). A
+        sorted array of matching codes is therefore already ranked, and
+        each kind is a contiguous range of it.
+        """
+        self.ingredient_counts = Counter(
+            name for names in self.recipe_ingredients.values() for name in names
+        )
+        self._recipe_order = sorted(
+            self.recipes, key=lambda pk: (-self.recipes[pk][2], self.recipes[pk][0].lower())
+        )
+        self._category_order = sorted(
+            self.categories, key=lambda pk: self.categories[pk][0].lower()
+        )
+        self._ingredient_order = sorted(
+            self.ingredient_counts, key=lambda name: (-self.ingredient_counts[name], name)
+        )
+        self._category_base = len(self._recipe_order)
+        self._ingredient_base = self._category_base + len(self._category_order)
+
+        pairs: List[Tuple[str, int]] = []
+        for code, pk in enumerate(self._recipe_order):
+            pairs.extend((token, code) for token in set(_tokens(self.recipes[pk][0])))
+        for offset, pk in enumerate(self._category_order):
+            code = self._category_base + offset
+            pairs.extend((token, code) for token in set(_tokens(self.categories[pk][0])))
+        for offset, name in enumerate(self._ingredient_order):
+            code = self._ingredient_base + offset
+            pairs.extend((token, code) for token in set(name.split()))
+
+        pairs.sort()
+        self._keys = [token for token, _ in pairs]
+        self._codes = np.fromiter((code for _, code in pairs), dtype=np.int64, count=len(pairs))
+
+    def _prefix_codes(self, prefix: str) -> np.ndarray:
+        """Sorted unique codes of entries with a token starting with ``prefix``."""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + '\uffff', start)
+        return np.unique(self._codes[start:end])
+
+    def _match(self, query: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Rank positions of the recipes, categories and ingredients matching ``query``.
+
+        Every word must prefix-match a word of the entry.
+        """
+        codes = None
+        for word in sorted(set(_tokens(query)), key=len, reverse=True):
+            found = self._prefix_codes(word)
+            codes = found if codes is None else np.intersect1d(codes, found, assume_unique=True)
+            if not len(codes):
+                break
+        if codes is None:
+            codes = np.empty(0, dtype=np.int64)
+
+        bounds = np.searchsorted(codes, [self._category_base, self._ingredient_base])
+        return (
+            codes[:bounds[0]],
+            codes[bounds[0]:bounds[1]] - self._category_base,
+            codes[bounds[1]:] - self._ingredient_base,
+        )
+
+    def search(self, query: str, limit: int = 10) -> Dict[str, list]:
+        """
+        Suggest recipes, categories and ingredients for typed text.
+
+        Args:
+            query: Partial user input
+            limit: Maximum recipes (categories and ingredients get half)
+
+        Returns:
+            dict: 'recipes', 'categories' and 'ingredients' lists
+        """
+        recipe_codes, category_codes, ingredient_codes = self._match(query)
+        minor = max(limit // 2, 1)
+        return _suggestions(
+            query,
+            [(pk, *self.recipes[pk]) for pk in (self._recipe_order[c] for c in recipe_codes[:limit])],
+            [(pk, *self.categories[pk]) for pk in (self._category_order[c] for c in category_codes[:minor])],
+            [
+                (name, self.ingredient_counts[name])
+                for name in (self._ingredient_order[c] for c in ingredient_codes[:minor])
+            ],
+        )
+
+
+class PatchedAutocompleteIndex:
+    """
+    A base index with a delta of changed recipes and categories applied.
+
+    Only the delta is compiled. Changed recipes are hidden from the base
+    results and answered from the delta instead, and ingredient counts are
+    corrected for the ingredients the changed recipes had and have now.
+    """
+
+    def __init__(self, base: AutocompleteIndex, delta: dict) -> None:
+        """
+        Initialize the index.
+
+        Args:
+            base: Index of the base version
+            delta: Delta as written by ``refresh_autocomplete_recipes``
+        """
+        self.base = base
+        self.categories_changed = delta['categories'] is not None
+        self.patch = AutocompleteIndex(
+            delta['recipes'], delta['recipe_ingredients'], delta['categories'] or {}
+        )
+        hidden = list(delta['touched'])
+        self._hidden = np.isin(
+            np.asarray(base._recipe_order, dtype=np.int64), np.asarray(hidden, dtype=np.int64)
+        )
+        self._removed = Counter(
+            name for pk in hidden for name in base.recipe_ingredients.get(pk, ())
+        )
+        self._adjusted = set(self._removed) | set(self.patch.ingredient_counts)
+
+    def ingredient_count(self, name: str) -> int:
+        """Recipes using an ingredient, with the delta applied."""
+        return (
+            self.base.ingredient_counts[name] - self._removed[name]
+            + self.patch.ingredient_counts[name]
+        )
+
+    def search(self, query: str, limit: int = 10) -> Dict[str, list]:
+        """Suggest entries like ``AutocompleteIndex.search``, merging in the delta."""
+        base, patch = self.base, self.patch
+        minor = max(limit // 2, 1)
+        base_recipes, base_categories, base_ingredients = base._match(query)
+        patch_recipes, patch_categories, patch_ingredients = patch._match(query)
+
+        base_recipes = base_recipes[~self._hidden[base_recipes]][:limit]
+        recipes = sorted(
+            [(pk, *base.recipes[pk]) for pk in (base._recipe_order[c] for c in base_recipes)]
+            + [(pk, *patch.recipes[pk]) for pk in (patch._recipe_order[c] for c in patch_recipes[:limit])],
+            key=lambda row: (-row[3], row[1].lower())
+        )[:limit]
+
+        source, codes = (patch, patch_categories) if self.categories_changed else (base, base_categories)
+        categories = [
+            (pk, *source.categories[pk]) for pk in (source._category_order[c] for c in codes[:minor])
+        ]
+
+        # Enough base candidates to fill the list even if every adjusted one drops out
+        candidates = {
+            base._ingredient_order[c] for c in base_ingredients[:minor + len(self._adjusted)]
+        }
+        candidates.update(patch._ingredient_order[c] for c in patch_ingredients)
+        counted = [(name, self.ingredient_count(name)) for name in candidates]
+        ingredients = sorted(
+            (item for item in counted if item[1] > 0), key=lambda item: (-item[1], item[0])
+        )[:minor]
+
+        return _suggestions(query, recipes, categories, ingredients)
+
+
+def _suggestions(query: str, recipes: list, categories: list, ingredients: list) -> Dict[str, list]:
+    """
+    Format ranked matches as the autocomplete response.
+
+    Args:
+        query: Partial user input
+        recipes: (id, title, slug, popularity) rows, most popular first
+        categories: (id, name, slug) rows
+        ingredients: (name, recipe count) pairs
+
+    Returns:
+        dict: 'recipes', 'categories' and 'ingredients' lists
+    """
+    # Titles starting with the typed text go first, keeping popularity order
+    lowered = query.strip().lower()
+    recipes = sorted(recipes, key=lambda row: not row[1].lower().startswith(lowered))
+    return {
+        'recipes': [{'id': pk, 'title': title, 'slug': slug} for pk, title, slug, _ in recipes],
+        'categories': [{'id': pk, 'name': name, 'slug': slug} for pk, name, slug in categories],
+        'ingredients': [{'name': name, 'recipe_count': count} for name, count in ingredients],
+    }
+
+
+def _load_recipes(recipe_ids: Optional[Iterable[int]] = None):
+    """Public recipe rows and their normalized ingredient names."""
+    from .models import Ingredient, Recipe
+
+    queryset = Recipe.objects.filter(is_public=True)
+    ingredients = Ingredient.objects.filter(recipe__is_public=True)
+    if recipe_ids is not None:
+        recipe_ids = list(recipe_ids)
+        queryset = queryset.filter(pk__in=recipe_ids)
+        ingredients = ingredients.filter(recipe_id__in=recipe_ids)
+
+    recipes = {
+        pk: (title, slug, favorite_count + rating_count)
+        for pk, title, slug, favorite_count, rating_count in queryset.values_list(
+            'pk', 'title', 'slug', 'favorite_count', 'rating_count'
+        ).iterator()
+    }
+    names: Dict[int, Set[str]] = {}
+    for recipe_id, name in ingredients.values_list('recipe_id', 'name').iterator():
+        normalized = normalize_name(name)
+        if normalized:
+            names.setdefault(recipe_id, set()).add(normalized)
+    return recipes, {pk: tuple(sorted(values)) for pk, values in names.items()}
+
+
+def _load_categories() -> Dict[int, Tuple[str, str]]:
+    """Active category names."""
+    from .models import RecipeCategory
+
+    return {
+        pk: (name, slug)
+        for pk, name, slug in RecipeCategory.objects.filter(
+            is_active=True
+        ).values_list('pk', 'name', 'slug')
+    }
+
+
+def build_autocomplete_index() -> AutocompleteIndex:
+    """Build the index from the database (three queries)."""
+    recipes, recipe_ingredients = _load_recipes()
+    return AutocompleteIndex(recipes, recipe_ingredients, _load_categories())
+
+
+def _publish(index: AutocompleteIndex) -> str:
+    """Store ``index`` as a new base version (with an empty delta) and make it current."""
+    version = uuid.uuid4().hex
+    cache.set(PAYLOAD_KEY.format(version=version), index.payload(), PAYLOAD_TIMEOUT)
+    cache.set(VERSION_KEY, version, None)
+    with _index_lock:
+        _local.update(version=version, stamp=cache.get(DELTA_STAMP_KEY), base=index, index=index)
+    return version
+
+
+def rebuild_autocomplete_index() -> AutocompleteIndex:
+    """
+    Build the index from the database and publish it as the new base version.
+
+    Recipes patched into the old delta while the database was being read
+    are patched again into the new one.
+
+    Returns:
+        AutocompleteIndex: The published index
+    """
+    started = time.time_ns()
+    old_version = cache.get(VERSION_KEY)
+    index = build_autocomplete_index()
+    _publish(index)
+
+    old_delta = cache.get(DELTA_KEY.format(version=old_version)) if old_version else None
+    if old_delta:
+        late = [pk for pk, stamp in old_delta['touched'].items() if stamp >= started]
+        if late:
+            refresh_autocomplete_recipes(late)
+        if old_delta['categories'] is not None and old_delta['categories_stamp'] >= started:
+            refresh_autocomplete_categories()
+
+    logger.info(
+        f"Rebuilt recipe autocomplete index: {len(index.recipes)} recipes, "
+        f"{len(index.categories)} categories"
+    )
+    return index
+
+
+def _build_in_background() -> None:
+    """Thread target: rebuild the index, then release the build lock."""
+    try:
+        rebuild_autocomplete_index()
+    except Exception as e:
+        logger.error(f"Error building recipe autocomplete index: {str(e)}", exc_info=True)
+    finally:
+        cache.delete(BUILD_LOCK_KEY)
+        connection.close()
+
+
+def start_background_rebuild() -> bool:
+    """
+    Rebuild the index in a daemon thread unless a build is already running.
+
+    Returns:
+        bool: True if a build was started
+    """
+    if not cache.add(BUILD_LOCK_KEY, True, BUILD_LOCK_TIMEOUT):
+        return False
+    logger.info("Building recipe autocomplete index in the background")
+    threading.Thread(
+        target=_build_in_background, name='autocomplete-build', daemon=True
+    ).start()
+    return True
+
+
+def get_autocomplete_index():
+    """
+    Return the current index, reloading it only when it changed.
+
+    Costs one cache read per call when the local copy is current. A
+    changed delta only recompiles the delta. When nothing has been
+    published yet a background build is started and the previous (or an
+    empty) index is returned meanwhile.
+
+    Returns:
+        AutocompleteIndex or PatchedAutocompleteIndex
+    """
+    found = cache.get_many([VERSION_KEY, DELTA_STAMP_KEY])
+    version, stamp = found.get(VERSION_KEY), found.get(DELTA_STAMP_KEY)
+    if version is not None and (version, stamp) == (_local['version'], _local['stamp']):
+        return _local['index']
+
+    with _index_lock:
+        if version is not None and (version, stamp) == (_local['version'], _local['stamp']):
+            return _local['index']
+
+        base = _local['base'] if version is not None and version == _local['version'] else None
+        if base is None:
+            payload = cache.get(PAYLOAD_KEY.format(version=version)) if version else None
+            if payload is None:
+                start_background_rebuild()
+                return _local['index'] or AutocompleteIndex()
+            base = AutocompleteIndex(**payload)
+
+        delta = cache.get(DELTA_KEY.format(version=version))
+        index = PatchedAutocompleteIndex(base, delta) if delta else base
+        _local.update(version=version, stamp=stamp, base=base, index=index)
+        return index
+
+
+@contextmanager
+def _delta_lock():
+    """Serialize delta writes across processes (best effort)."""
+    for _ in range(100):
+        if cache.add(DELTA_LOCK_KEY, True, DELTA_LOCK_TIMEOUT):
+            try:
+                yield
+            finally:
+                cache.delete(DELTA_LOCK_KEY)
+            return
+        time.sleep(0.05)
+    logger.warning("Timed out waiting for the autocomplete delta lock")
+    yield
+
+
+def _update_delta(apply) -> Optional[dict]:
+    """
+    Apply a change to the current version's delta and announce it.
+
+    Args:
+        apply: Callable receiving the delta dict and a change stamp
+
+    Returns:
+        dict: The written delta, or None when no index is published
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # The next build reads the change from the database
+        return None
+    key = DELTA_KEY.format(version=version)
+    with _delta_lock():
+        delta = cache.get(key) or {
+            'recipes': {}, 'recipe_ingredients': {}, 'touched': {},
+            'categories': None, 'categories_stamp': 0,
+        }
+        stamp = time.time_ns()
+        apply(delta, stamp)
+        cache.set(key, delta, PAYLOAD_TIMEOUT)
+        # Written after the delta so no process pairs the new stamp with an old delta
+        cache.set(DELTA_STAMP_KEY, stamp, None)
+    return delta
+
+
+def refresh_autocomplete_recipes(recipe_ids: Iterable[int]) -> int:
+    """
+    Record changed recipes in the delta of the current index version.
+
+    Args:
+        recipe_ids: Recipes created, edited, hidden or deleted
+
+    Returns:
+        int: Number of recipes refreshed
+    """
+    recipe_ids = set(recipe_ids)
+    if not recipe_ids:
+        return 0
+
+    recipes, recipe_ingredients = _load_recipes(recipe_ids)
+
+    def apply(delta, stamp):
+        for recipe_id in recipe_ids:
+            delta['recipes'].pop(recipe_id, None)
+            delta['recipe_ingredients'].pop(recipe_id, None)
+            delta['touched'][recipe_id] = stamp
+        delta['recipes'].update(recipes)
+        delta['recipe_ingredients'].update(recipe_ingredients)
+
+    delta = _update_delta(apply)
+    if delta is not None and len(delta['touched']) > MAX_DELTA_RECIPES:
+        start_background_rebuild()
+    logger.debug(f"Refreshed autocomplete entries for {len(recipe_ids)} recipes")
+    return len(recipe_ids)
+
+
+def refresh_autocomplete_categories() -> None:
+    """Record the current category names in the delta of the current index version."""
+    categories = _load_categories()
+
+    def apply(delta, stamp):
+        delta['categories'] = categories
+        delta['categories_stamp'] = stamp
+
+    _update_delta(apply)
@@ -0,0 +1,137 @@
+"""
+Canonical ingredient resolution.
+
+Resolves recipe ingredients to a shared ``CanonicalIngredient`` by
+normalized name and converts their quantity to the unit it aggregates
+in, so shopping lists and "recipes using X" lookups work on integer IDs
+and comparable amounts instead of raw name and unit strings.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from asda_scraper.matching import normalize_name
+
+from .categorizer import get_categorizer
+from .units import to_base_quantity
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_name(name: str) -> str:
+    """Normalized name ingredients are grouped under (may be empty)."""
+    return normalize_name(name)[:200]
+
+
+def resolve_canonical_ids(names: Iterable[str]) -> Dict[str, int]:
+    """
+    Map ingredient names to canonical ingredient IDs, creating missing ones.
+
+    Uses one query for the existing entries, plus one insert and one
+    re-read when new entries are needed.
+
+    Args:
+        names: Raw ingredient names
+
+    Returns:
+        dict: Raw name -> canonical ingredient ID (names that normalize to
+        nothing are left out)
+    """
+    from .models import CanonicalIngredient
+
+    by_key: Dict[str, List[str]] = {}
+    for name in names:
+        key = canonical_name(name)
+        if key:
+            by_key.setdefault(key, []).append(name)
+    if not by_key:
+        return {}
+
+    ids = dict(
+        CanonicalIngredient.objects.filter(name__in=list(by_key)).values_list('name', 'pk')
+    )
+    missing = [key for key in by_key if key not in ids]
+    if missing:
+        categorizer = get_categorizer()
+        CanonicalIngredient.objects.bulk_create(
+            [
+                CanonicalIngredient(
+                    name=key,
+                    display_name=by_key[key][0].strip()[:200],
+                    category_id=categorizer.match(by_key[key][0]),
+                )
+                for key in missing
+            ],
+            ignore_conflicts=True
+        )
+        ids.update(
+            CanonicalIngredient.objects.filter(name__in=missing).values_list('name', 'pk')
+        )
+        logger.debug(f"Created {len(missing)} canonical ingredients")
+
+    return {
+        name: ids[key]
+        for key, raw_names in by_key.items() if key in ids
+        for name in raw_names
+    }
+
+
+def canonicalize_ingredients(ingredients: Iterable) -> None:
+    """
+    Set canonical_id, base_quantity and base_unit on unsaved ingredients.
+
+    Args:
+        ingredients: Ingredient instances (modified in place, not saved)
+    """
+    ingredients = list(ingredients)
+    ids = resolve_canonical_ids(ingredient.name for ingredient in ingredients)
+    for ingredient in ingredients:
+        ingredient.canonical_id = ids.get(ingredient.name)
+        ingredient.base_quantity, ingredient.base_unit = to_base_quantity(
+            ingredient.quantity, ingredient.unit
+        )
+
+
+def aggregation_values(ingredient) -> Tuple[Tuple, str, Optional[Decimal], str]:
+    """
+    How an ingredient is summed in shopping lists.
+
+    Rows not yet resolved (saved before canonical resolution) are
+    converted on the fly.
+
+    Args:
+        ingredient: Ingredient, ideally with ``canonical`` loaded
+
+    Returns:
+        tuple: (grouping key, display name, base quantity, base unit)
+    """
+    if ingredient.canonical_id is not None:
+        base_quantity, base_unit = ingredient.base_quantity, ingredient.base_unit
+        key = (ingredient.canonical_id, base_unit)
+        return key, ingredient.canonical.display_name, base_quantity, base_unit
+
+    base_quantity, base_unit = to_base_quantity(ingredient.quantity, ingredient.unit)
+    key = (canonical_name(ingredient.name) or ingredient.name.strip().lower(), base_unit)
+    return key, ingredient.name, base_quantity, base_unit
+
+
+def recipes_using(name: str):
+    """
+    Recipes containing an ingredient, by canonical identity.
+
+    Served from the (canonical, recipe) index instead of a name scan.
+
+    Args:
+        name: Ingredient name in any form ('Onions', 'red onion', ...)
+
+    Returns:
+        QuerySet: Matching recipes
+    """
+    from .models import Ingredient, Recipe
+
+    return Recipe.objects.filter(
+        pk__in=Ingredient.objects.filter(
+            canonical__name=canonical_name(name)
+        ).values('recipe_id')
+    )
@@ -0,0 +1,161 @@
+"""
+Keyword-based ingredient categorizer.
+
+Every active IngredientCategory's keywords are compiled into one regular
+expression, so an ingredient name is categorized with a single scan
+instead of a query and a nested keyword loop per ingredient. Keywords
+match whole words (with simple plurals), the longest matching keyword
+wins and ties go to the category with the lowest display order.
+
+The compiled categorizer is kept per process and rebuilt when the
+shared version key changes, which happens whenever an ingredient
+category is saved or deleted.
+"""
+
+import logging
+import re
+import threading
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'ingredient_categorizer:version'
+
+_lock = threading.Lock()
+_local: Dict[str, object] = {'version': None, 'categorizer': None}
+
+
+def _keyword_pattern(keyword: str) -> str:
+    """Regex for one keyword: whole words, optional plural ending."""
+    words = [re.escape(word) for word in keyword.split()]
+    last = words[-1]
+    if keyword.endswith('y') and len(keyword) > 2:
+        last = f"(?:{last}|{re.escape(keyword.split()[-1][:-1])}ies)"
+    else:
+        last = f"{last}(?:e?s)?"
+    return r'\s+'.join(words[:-1] + [last])
+
+
+class IngredientCategorizer:
+    """
+    Compiled keyword matcher over ingredient categories.
+
+    Usage:
+        categorizer = get_categorizer()
+        category_id = categorizer.match('2 large tomatoes')
+    """
+
+    def __init__(self, categories: Iterable[Tuple[int, str, int, List[str]]]) -> None:
+        """
+        Compile the keyword expression.
+
+        Args:
+            categories: (pk, name, display_order, keywords) per category
+        """
+        self.names: Dict[int, str] = {}
+        self.orders: Dict[int, int] = {}
+        # keyword -> (category pk, display order); a keyword listed by
+        # several categories belongs to the first in display order
+        self.keywords: Dict[str, Tuple[int, int]] = {}
+        for pk, name, display_order, keywords in sorted(categories, key=lambda c: (c[2], c[1])):
+            self.names[pk] = name
+            self.orders[pk] = display_order
+            for keyword in keywords:
+                keyword = ' '.join(keyword.lower().split())
+                if keyword and keyword not in self.keywords:
+                    self.keywords[keyword] = (pk, display_order)
+
+        # Longest keywords first so 'ice cream' is tried before 'cream'
+        ordered = sorted(self.keywords, key=lambda k: (-len(k), k))
+        self._groups = ordered
+        self._pattern = None
+        if ordered:
+            self._pattern = re.compile(
+                r'(?<![^\W\d_])(?:' + '|'.join(
+                    f'({_keyword_pattern(keyword)})' for keyword in ordered
+                ) + r')(?![^\W\d_])'
+            )
+
+    def match(self, name: str) -> Optional[int]:
+        """
+        Category for an ingredient name.
+
+        Args:
+            name: Ingredient name
+
+        Returns:
+            int: Category primary key, or None if no keyword matches
+        """
+        if self._pattern is None or not name:
+            return None
+
+        best = None
+        for found in self._pattern.finditer(name.lower()):
+            keyword = self._groups[found.lastindex - 1]
+            pk, display_order = self.keywords[keyword]
+            rank = (-len(keyword), display_order)
+            if best is None or rank < best[0]:
+                best = (rank, pk)
+        return best[1] if best else None
+
+    def match_name(self, name: str) -> Optional[str]:
+        """Category name for an ingredient name, or None."""
+        pk = self.match(name)
+        return self.names.get(pk) if pk is not None else None
+
+
+def build_categorizer() -> IngredientCategorizer:
+    """Compile a categorizer from the active categories (one query)."""
+    from .models import IngredientCategory
+
+    return IngredientCategorizer(
+        (category.pk, category.name, category.display_order, category.get_keywords_list())
+        for category in IngredientCategory.objects.filter(is_active=True)
+    )
+
+
+def get_categorizer() -> IngredientCategorizer:
+    """
+    Return the compiled categorizer, recompiling only after a change.
+
+    Costs one cache read per call when the local copy is current.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not cache.add(VERSION_KEY, version, None):
+            version = cache.get(VERSION_KEY)
+    if version == _local['version']:
+        return _local['categorizer']
+
+    with _lock:
+        if version != _local['version']:
+            _local['categorizer'] = build_categorizer()
+            _local['version'] = version
+            logger.debug(f"Compiled ingredient categorizer version {version}")
+        return _local['categorizer']
+
+
+def invalidate_categorizer() -> None:
+    """Make every process recompile the categorizer on next use."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def get_other_category():
+    """The fallback 'Other' category, created on first use."""
+    from .models import IngredientCategory
+
+    other_category, created = IngredientCategory.objects.get_or_create(
+        slug='other',
+        defaults={
+            'name': 'Other',
+            'display_order': 999,
+            'is_active': True
+        }
+    )
+    if created:
+        logger.info("Created 'Other' category for uncategorized ingredients")
+    return other_category
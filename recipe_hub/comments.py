@@ -0,0 +1,118 @@
+"""
+Materialized-path comment threads.
+
+Every RecipeComment stores ``path``, its ancestors' primary keys and its
+own as fixed-width zero-padded segments (digits only, so ordering does
+not depend on the database collation), and ``depth``. Ordering by path
+yields each thread depth-first with siblings oldest first, and all
+comments under a range of top-level comments share one path range, so
+a page of threads loads with one ordered range query whatever its depth.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+
+from .pagination import KeysetPage, paginate_keyset
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_WIDTH = 10
+# 25 segments fit the 255-character path; replies to a comment at this
+# depth are attached to its parent instead
+MAX_DEPTH = 20
+# Deeper replies are indented no further
+MAX_INDENT = 6
+THREADS_PER_PAGE = 20
+
+THREAD_SORT_KEYS = (('path', False),)
+
+
+def path_segment(pk: int) -> str:
+    """Path segment for one comment."""
+    return f"{pk:0{SEGMENT_WIDTH}d}"
+
+
+def clamp_parent(comment) -> None:
+    """Attach replies beyond MAX_DEPTH to their parent's parent."""
+    while comment.parent_id is not None and comment.parent.depth >= MAX_DEPTH:
+        comment.parent = comment.parent.parent
+
+
+def update_thread_path(comment) -> None:
+    """
+    Store a saved comment's path and depth, moving its replies with it.
+
+    Args:
+        comment: Saved RecipeComment (``path`` holds the previous value)
+    """
+    model = type(comment)
+    parent = comment.parent if comment.parent_id is not None else None
+    old_path, old_depth = comment.path, comment.depth
+    new_path = (parent.path if parent else '') + path_segment(comment.pk)
+    new_depth = parent.depth + 1 if parent else 0
+    if new_path == old_path:
+        return
+
+    model.objects.filter(pk=comment.pk).update(path=new_path, depth=new_depth)
+    comment.path, comment.depth = new_path, new_depth
+
+    if old_path:
+        # Re-parented: rewrite the prefix of every descendant
+        moved = model.objects.filter(
+            recipe_id=comment.recipe_id, path__startswith=old_path
+        ).exclude(pk=comment.pk).update(
+            path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+            depth=F('depth') + (new_depth - old_depth),
+        )
+        logger.debug(f"Moved comment {comment.pk} with {moved} replies")
+
+
+def _next_root_path(path: str) -> str:
+    """Smallest path sorting after every comment in the thread rooted at ``path``."""
+    return path_segment(int(path[:SEGMENT_WIDTH]) + 1)
+
+
+def comment_threads(recipe, cursor: Optional[str] = None) -> Tuple[KeysetPage, List]:
+    """
+    One page of approved comment threads for a recipe.
+
+    Costs one query for the page of top-level comments and one ordered
+    range query for everything in their threads.
+
+    Args:
+        recipe: Recipe whose comments are shown
+        cursor: Cursor from a previous page, or None for the first page
+
+    Returns:
+        tuple: (page of top-level comments, approved comments of those
+        threads in display order, each with ``indent`` set)
+    """
+    from .models import RecipeComment
+
+    approved = RecipeComment.objects.filter(recipe=recipe, is_approved=True)
+    page = paginate_keyset(
+        approved.filter(depth=0).only('pk', 'path').order_by('path'),
+        THREAD_SORT_KEYS,
+        cursor,
+        THREADS_PER_PAGE
+    )
+    if not page.object_list:
+        return page, []
+
+    rows = approved.filter(
+        path__gte=page.object_list[0].path,
+        path__lt=_next_root_path(page.object_list[-1].path),
+    ).select_related('user').order_by('path')
+
+    # Hide replies whose parent is hidden (unapproved or outside the page)
+    visible_ids = set()
+    comments = []
+    for comment in rows:
+        if comment.depth == 0 or comment.parent_id in visible_ids:
+            visible_ids.add(comment.pk)
+            comment.indent = min(comment.depth, MAX_INDENT)
+            comments.append(comment)
+    return page, comments
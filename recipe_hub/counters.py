@@ -0,0 +1,135 @@
+"""
+Denormalized recipe engagement counters.
+
+Recipe rows store ``rating_count``, ``rating_total``, ``avg_rating``,
+``favorite_count`` and ``comment_count`` so lists can display and sort
+on them without aggregating related tables. Signal handlers keep them
+current with single-statement relative UPDATEs (safe under concurrent
+writers); ``refresh_recipe_counters`` recomputes them from scratch.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from django.db.models import (
+    Case, Count, F, FloatField, IntegerField, OuterRef, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Cast, Coalesce, Greatest
+from django.db.models.lookups import GreaterThan
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ['rating_count', 'rating_total', 'avg_rating', 'favorite_count', 'comment_count']
+
+
+def _recipe_model():
+    from .models import Recipe
+    return Recipe
+
+
+def adjust_rating_totals(recipe_id: int, count_delta: int, total_delta: int) -> None:
+    """
+    Apply a rating insert, delete or change to a recipe's stored totals.
+
+    The new average is derived from the updated count and total in the
+    same UPDATE, so concurrent ratings cannot leave it inconsistent.
+
+    Args:
+        recipe_id: Recipe primary key
+        count_delta: Change in number of ratings (-1, 0 or 1)
+        total_delta: Change in the sum of rating values
+    """
+    new_count = F('rating_count') + count_delta
+    new_total = F('rating_total') + total_delta
+    _recipe_model().objects.filter(pk=recipe_id).update(
+        rating_count=Greatest(new_count, 0),
+        rating_total=Greatest(new_total, 0),
+        avg_rating=Case(
+            When(
+                GreaterThan(new_count, 0),
+                then=Cast(new_total, FloatField()) / Cast(new_count, FloatField()),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def adjust_counter(recipe_id: int, field: str, delta: int) -> None:
+    """
+    Atomically add ``delta`` to a recipe counter, never going below zero.
+
+    Args:
+        recipe_id: Recipe primary key
+        field: 'favorite_count' or 'comment_count'
+        delta: Amount to add
+    """
+    _recipe_model().objects.filter(pk=recipe_id).update(
+        **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+def counter_expressions(rating_model, favorite_model, comment_model) -> Dict:
+    """
+    Build UPDATE expressions that recompute every counter from source rows.
+
+    Args:
+        rating_model: RecipeRating model class
+        favorite_model: RecipeFavorite model class
+        comment_model: RecipeComment model class
+
+    Returns:
+        dict: Field name -> expression, for ``QuerySet.update``
+    """
+    def aggregate(queryset, expression):
+        return Coalesce(
+            Subquery(
+                queryset.filter(recipe_id=OuterRef('pk'))
+                .values('recipe_id')
+                .annotate(value=expression)
+                .values('value')
+            ),
+            0,
+            output_field=IntegerField(),
+        )
+
+    rating_count = aggregate(rating_model.objects.all(), Count('pk'))
+    rating_total = aggregate(rating_model.objects.all(), Sum('rating'))
+    return {
+        'rating_count': rating_count,
+        'rating_total': rating_total,
+        'avg_rating': Case(
+            When(
+                GreaterThan(rating_count, 0),
+                then=Cast(rating_total, FloatField()) / Cast(rating_count, FloatField()),
+            ),
+            default=Value(0.0),
+            output_field=FloatField(),
+        ),
+        'favorite_count': aggregate(favorite_model.objects.all(), Count('pk')),
+        'comment_count': aggregate(
+            comment_model.objects.filter(is_approved=True), Count('pk')
+        ),
+    }
+
+
+def refresh_recipe_counters(recipe_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute stored counters from the rating, favorite and comment tables.
+
+    Args:
+        recipe_ids: Recipes to repair; all recipes when None
+
+    Returns:
+        int: Number of recipes updated
+    """
+    from .models import Recipe, RecipeComment, RecipeFavorite, RecipeRating
+
+    queryset = Recipe.objects.all()
+    if recipe_ids is not None:
+        queryset = queryset.filter(pk__in=list(recipe_ids))
+    updated = queryset.update(
+        **counter_expressions(RecipeRating, RecipeFavorite, RecipeComment)
+    )
+    logger.info(f"Refreshed engagement counters for {updated} recipes")
+    return updated
@@ -6,10 +6,9 @@ Handles parsing and validation of CSV files for recipe import functionality.
 
 import csv
 import logging
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional
 from django.core.exceptions import ValidationError
-from django.db import transaction
-from .models import Recipe, Ingredient, Instruction, RecipeCategory
+from .importing import RecipeBulkImporter, iter_csv_rows
 
 logger = logging.getLogger(__name__)
 
@@ -75,32 +74,36 @@ class RecipeCSVHandler:
         Returns:
             List of dictionaries containing recipe data
         """
-        recipes = []
+        return list(self.iter_recipes(csv_file))
+    
+    def iter_recipes(self, csv_file) -> Iterator[Dict]:
+        """
+        Stream parsed recipe dictionaries from a CSV file.
         
-        try:
-            # Decode file if needed
-            if hasattr(csv_file, 'read'):
-                content = csv_file.read()
-                if isinstance(content, bytes):
-                    content = content.decode('utf-8-sig')  # Handle BOM
-                csv_file = content.splitlines()
-            
-            reader = csv.DictReader(csv_file)
-            
-            # Validate headers
-            headers = reader.fieldnames or []
-            is_valid, missing = self.validate_headers(headers)
-            
-            if not is_valid:
-                raise ValidationError(
-                    f"Missing required headers: {', '.join(missing)}"
-                )
+        Rows that fail to parse are recorded in ``self.errors`` and skipped.
+        
+        Args:
+            csv_file: Binary file object containing CSV data
             
-            for row_num, row in enumerate(reader, start=2):
+        Yields:
+            Dictionaries of recipe data, including ``row_num``
+        """
+        headers_checked = False
+        try:
+            for row_num, row in iter_csv_rows(csv_file):
+                if not headers_checked:
+                    is_valid, missing = self.validate_headers(list(row.keys()))
+                    if not is_valid:
+                        raise ValidationError(
+                            f"Missing required headers: {', '.join(missing)}"
+                        )
+                    headers_checked = True
+                
                 try:
                     recipe_data = self._parse_recipe_row(row, row_num)
                     if recipe_data:
-                        recipes.append(recipe_data)
+                        recipe_data['row_num'] = row_num
+                        yield recipe_data
                 except Exception as e:
                     self.errors.append(
                         f"Row {row_num}: {str(e)}"
@@ -114,8 +117,6 @@ class RecipeCSVHandler:
             logger.error(
                 f"CSV parsing error for user {self.user.username}: {str(e)}"
             )
-            
-        return recipes
     
     def _parse_recipe_row(self, row: Dict, row_num: int) -> Optional[Dict]:
         """
@@ -237,94 +238,26 @@ class RecipeCSVHandler:
         
         return instructions
     
-    @transaction.atomic
-    def import_recipes(self, recipes_data: List[Dict]) -> Tuple[int, List[str]]:
+    def import_recipes(self, recipes_data: Iterable[Dict]) -> Tuple[int, List[str]]:
         """
         Import recipes from parsed data.
         
-        Args:
-            recipes_data: List of recipe dictionaries
-            
-        Returns:
-            Tuple of (imported_count, error_messages)
-        """
-        imported_count = 0
-        
-        for idx, recipe_data in enumerate(recipes_data):
-            try:
-                recipe = self._create_recipe(recipe_data)
-                imported_count += 1
-                
-                logger.info(
-                    f"Imported recipe '{recipe.title}' for user {self.user.username}"
-                )
-                
-            except Exception as e:
-                self.errors.append(
-                    f"Recipe '{recipe_data.get('title', 'Unknown')}': {str(e)}"
-                )
-                logger.error(
-                    f"Error importing recipe for user {self.user.username}: {str(e)}"
-                )
-        
-        self.imported_count = imported_count
-        return imported_count, self.errors
-    
-    def _create_recipe(self, recipe_data: Dict) -> Recipe:
-        """
-        Create a recipe from parsed data.
+        Recipes are written in chunks by the shared bulk importer and are
+        private by default.
         
         Args:
-            recipe_data: Dictionary of recipe data
+            recipes_data: Recipe dictionaries (a list or ``iter_recipes``)
             
         Returns:
-            Created Recipe instance
+            Tuple of (imported_count, error_messages)
         """
-        # Create base recipe
-        recipe = Recipe.objects.create(
-            author=self.user,
-            title=recipe_data['title'],
-            description=recipe_data['description'],
-            prep_time=recipe_data['prep_time'],
-            cook_time=recipe_data['cook_time'],
-            servings=recipe_data['servings'],
-            difficulty=recipe_data['difficulty'],
-            is_public=False  # Default to private for imported recipes
-        )
-        
-        # Add categories
-        for category_name in recipe_data['categories']:
-            try:
-                category = RecipeCategory.objects.get(
-                    name__iexact=category_name,
-                    is_active=True
-                )
-                recipe.categories.add(category)
-            except RecipeCategory.DoesNotExist:
-                self.warnings.append(
-                    f"Category '{category_name}' not found for recipe '{recipe.title}'"
-                )
-        
-        # Create ingredients
-        for ing_data in recipe_data['ingredients']:
-            Ingredient.objects.create(
-                recipe=recipe,
-                name=ing_data['name'],
-                quantity=ing_data['quantity'],
-                unit=ing_data['unit'],
-                notes=ing_data['notes'],
-                order=ing_data['order']
-            )
-        
-        # Create instructions
-        for idx, instruction_text in enumerate(recipe_data['instructions'], 1):
-            Instruction.objects.create(
-                recipe=recipe,
-                step_number=idx,
-                instruction=instruction_text
-            )
+        importer = RecipeBulkImporter(self.user, is_public=False)
+        result = importer.import_rows(recipes_data)
         
-        return recipe
+        self.errors.extend(result.error_messages())
+        self.warnings.extend(result.warnings)
+        self.imported_count = result.created
+        return result.created, self.errors
     
     def generate_sample_csv(self) -> str:
         """
@@ -0,0 +1,70 @@
+"""
+Dietary attribute bitmask.
+
+``Recipe.dietary_flags`` packs the boolean flags of ``dietary_info`` into
+one integer (kept in sync in ``Recipe.save``), so dietary filters use the
+(is_public, dietary_flags, difficulty) index instead of one JSON
+containment test per selected diet. A filter for "all of these diets" is
+rewritten as ``dietary_flags IN (every mask containing them)``; with five
+flags that is at most 32 values, which the B-tree index serves directly,
+unlike a bitwise AND.
+"""
+
+from typing import Iterable, List, Mapping, Optional
+
+# (dietary_info key, display label); bit i belongs to entry i, so only append
+DIETARY_FLAGS = (
+    ('vegetarian', 'Vegetarian'),
+    ('vegan', 'Vegan'),
+    ('gluten_free', 'Gluten-Free'),
+    ('dairy_free', 'Dairy-Free'),
+    ('nut_free', 'Nut-Free'),
+)
+
+DIETARY_BITS = {key: 1 << index for index, (key, _) in enumerate(DIETARY_FLAGS)}
+ALL_FLAGS = (1 << len(DIETARY_FLAGS)) - 1
+
+
+def dietary_mask(dietary_info: Optional[Mapping]) -> int:
+    """Bitmask of the flags set to JSON ``true`` in a ``dietary_info`` dict."""
+    mask = 0
+    for key, value in (dietary_info or {}).items():
+        # Strictly True, as in the 0012 backfill and similarity features
+        if value is True and key in DIETARY_BITS:
+            mask |= DIETARY_BITS[key]
+    return mask
+
+
+def mask_for(diets: Iterable[str]) -> int:
+    """Bitmask requiring every diet in ``diets`` (unknown names are ignored)."""
+    mask = 0
+    for diet in diets:
+        mask |= DIETARY_BITS.get(diet, 0)
+    return mask
+
+
+def dietary_labels(mask: int) -> List[str]:
+    """Display labels of the flags set in ``mask``, in a fixed order."""
+    return [label for key, label in DIETARY_FLAGS if mask & DIETARY_BITS[key]]
+
+
+def matching_masks(required: int) -> List[int]:
+    """Every flag combination that includes all bits of ``required``."""
+    return [mask for mask in range(ALL_FLAGS + 1) if mask & required == required]
+
+
+def filter_by_diets(queryset, diets: Iterable[str]):
+    """
+    Restrict a Recipe queryset to recipes meeting every diet in ``diets``.
+
+    Args:
+        queryset: Recipe queryset
+        diets: Dietary flag names, e.g. ['vegan', 'nut_free']
+
+    Returns:
+        QuerySet: Filtered queryset (unchanged when no known diet is given)
+    """
+    required = mask_for(diets)
+    if not required:
+        return queryset
+    return queryset.filter(dietary_flags__in=matching_masks(required))
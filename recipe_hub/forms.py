@@ -5,6 +5,8 @@ This module contains all forms for recipe creation, editing, and interaction.
 Includes formsets for managing ingredients and instructions.
 """
 
+import csv
+import io
 import logging
 from django import forms
 from django.forms import inlineformset_factory, BaseInlineFormSet
@@ -13,6 +15,7 @@ from .models import (
     Recipe, RecipeCategory, Ingredient, Instruction,
     RecipeRating, RecipeComment, IngredientCategory
 )
+from .importing import iter_csv_rows
 
 logger = logging.getLogger(__name__)
 
@@ -382,14 +385,32 @@ class RecipeSearchForm(forms.Form):
         })
     )
     
+    max_calories = forms.IntegerField(
+        required=False,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Max kcal per serving',
+            'min': 1
+        })
+    )
+    
+    high_protein = forms.BooleanField(
+        required=False,
+        label='High Protein',
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
     sort_by = forms.ChoiceField(
         required=False,
         choices=[
+            ('relevance', 'Best Match'),
             ('-created_at', 'Newest First'),
             ('created_at', 'Oldest First'),
             ('-rating', 'Highest Rated'),
             ('title', 'Alphabetical'),
             ('total_time', 'Quickest First'),
+            ('kcal_per_serving', 'Lowest Calories'),
+            ('-protein_per_serving', 'Most Protein'),
         ],
         initial='-created_at',
         widget=forms.Select(attrs={'class': 'form-select'})
@@ -404,6 +425,13 @@ class RecipeSearchForm(forms.Form):
             raise ValidationError("Time cannot exceed 24 hours.")
         return max_time
 
+    def clean_max_calories(self):
+        """Validate maximum calories filter."""
+        max_calories = self.cleaned_data.get('max_calories')
+        if max_calories is not None and max_calories < 1:
+            raise ValidationError("Calories must be at least 1.")
+        return max_calories
+
 
 
 
@@ -577,36 +605,59 @@ class RecipeCSVImportForm(forms.Form):
         Returns:
             list: Parsed CSV data with validation
         """
+        return list(self.iter_csv_data())
+    
+    def iter_csv_data(self, on_error=None):
+        """
+        Stream cleaned CSV rows without loading the file into memory.
+        
+        Args:
+            on_error: Optional callable(row_num, title, message) for rows
+                that fail validation (they are skipped either way) and for
+                a file that cannot be read past some row
+            
+        Yields:
+            dict: Cleaned row data including ``row_num``
+            
+        Raises:
+            csv.Error: If the file cannot be parsed and no ``on_error``
+                was given
+        """
         csv_file = self.cleaned_data.get('csv_file')
         if not csv_file:
-            return []
+            return
         
+        parsed = 0
+        row_num = 1
         try:
-            csv_file.seek(0)
-            file_content = csv_file.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(file_content))
-            
-            parsed_data = []
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (after header)
+            for row_num, row in iter_csv_rows(csv_file):
                 # Skip empty rows
-                if not any(row.values()):
+                if not any((value or '').strip() for value in row.values() if isinstance(value, str)):
                     continue
                 
                 # Clean and validate row data
                 try:
                     clean_row = self._clean_csv_row(row, row_num)
-                    if clean_row:
-                        parsed_data.append(clean_row)
                 except ValidationError as e:
                     logger.warning(f"Skipping row {row_num}: {str(e)}")
+                    if on_error is not None:
+                        on_error(row_num, (row.get('title') or '').strip(), ' '.join(e.messages))
                     continue
-            
-            logger.info(f"Parsed {len(parsed_data)} valid rows from CSV")
-            return parsed_data
-            
-        except Exception as e:
-            logger.error(f"Error parsing CSV data: {str(e)}")
-            return []
+                clean_row['row_num'] = row_num
+                parsed += 1
+                yield clean_row
+        except (csv.Error, UnicodeDecodeError) as e:
+            # Earlier rows may already be imported, so the failure must
+            # be reported rather than ending the import as if complete
+            logger.error(f"Error parsing CSV data after row {row_num}: {str(e)}")
+            if on_error is None:
+                raise
+            on_error(
+                row_num + 1, '',
+                f"The file could not be read from this row on, so the rest was not imported: {str(e)}"
+            )
+        
+        logger.info(f"Parsed {parsed} valid rows from CSV")
     
     def _clean_csv_row(self, row, row_num):
         """
@@ -0,0 +1,97 @@
+"""
+Per-recipe version counters for rendered-fragment caching.
+
+Recipe cards and the ingredient and instruction blocks of the detail
+page are cached with Django's ``{% cache %}`` tag, keyed on the recipe's
+fragment version. Saving a recipe, its ingredients, instructions,
+categories or ratings, renaming or deleting one of its categories,
+renaming its author, or storing new image variants, bumps the version,
+so stale fragments are never read again and simply expire. Per-user
+state (favorite, own rating) is rendered outside the cached fragments
+from the request's recipe overlay.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'recipe_fragments:version:{pk}'
+# How long a rendered fragment is kept; a version bump makes it unreachable sooner
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+REQUEST_ATTR = '_recipe_fragment_versions'
+
+
+def _new_version() -> int:
+    # Time-based, so a version recreated after eviction never matches
+    # a fragment cached under an earlier one
+    return time.time_ns()
+
+
+def get_fragment_versions(recipe_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Current fragment versions for a batch of recipes, in one cache read.
+
+    Args:
+        recipe_ids: Recipe primary keys
+
+    Returns:
+        dict: Recipe ID -> version
+    """
+    keys = {VERSION_KEY.format(pk=pk): pk for pk in set(recipe_ids) if pk}
+    if not keys:
+        return {}
+
+    found = cache.get_many(list(keys))
+    versions = {keys[key]: version for key, version in found.items()}
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update((keys[key], version) for key, version in missing.items())
+    return versions
+
+
+def bump_fragment_versions(recipe_ids: Iterable[int]) -> None:
+    """Invalidate every cached fragment of the given recipes."""
+    for pk in set(recipe_ids):
+        key = VERSION_KEY.format(pk=pk)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_version(), None)
+    logger.debug(f"Bumped fragment versions for recipes {sorted(recipe_ids)}")
+
+
+def load_fragment_versions(request, recipes: Iterable) -> Dict[int, int]:
+    """
+    Load fragment versions for recipes about to be rendered.
+
+    Versions are kept on the request, so cards rendered one by one find
+    them without another cache read.
+
+    Args:
+        request: Current HttpRequest (or None)
+        recipes: Recipe instances
+
+    Returns:
+        dict: Recipe ID -> version for everything loaded on this request
+    """
+    versions = getattr(request, REQUEST_ATTR, None) if request is not None else None
+    if versions is None:
+        versions = {}
+        if request is not None:
+            setattr(request, REQUEST_ATTR, versions)
+
+    missing = [recipe.pk for recipe in recipes if recipe is not None and recipe.pk not in versions]
+    if missing:
+        versions.update(get_fragment_versions(missing))
+    return versions
+
+
+def fragment_version(request, recipe) -> int:
+    """Fragment version of one recipe, from the request's batch when loaded."""
+    return load_fragment_versions(request, [recipe])[recipe.pk]
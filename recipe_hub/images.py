@@ -0,0 +1,303 @@
+"""
+Responsive image derivatives for recipe and step images.
+
+Uploaded images are resized to a fixed set of widths, each saved as WebP
+and as JPEG (PNG when the source has transparency), off the request path.
+The generated files are listed in a manifest stored on the model, so
+templates and JSON views choose the smallest fitting variant without
+touching storage. Until a manifest exists the original upload is served.
+Generation is queued when an image is saved, and a periodic task (and
+the generate_image_derivatives command) picks up any image still
+without a current manifest; rendering never generates or queues
+anything. An image that cannot be processed gets a manifest recording
+the error, so the backfill moves on; ``force`` retries it.
+"""
+
+import logging
+import os
+from io import BytesIO
+from typing import Dict, List, Optional
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+from PIL import Image, ImageOps
+
+from .fragments import bump_fragment_versions
+
+logger = logging.getLogger(__name__)
+
+# Widths generated for every image (never upscaled past the source)
+DERIVATIVE_WIDTHS = (160, 400, 800, 1200)
+DERIVATIVE_DIR = 'derivatives'
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Display widths (CSS pixels) used by templates
+CARD_WIDTH = 400
+THUMB_WIDTH = 160
+DETAIL_WIDTH = 800
+
+# Deduplicates generation requests queued on save
+QUEUED_KEY = 'image_derivatives:queued:{label}:{pk}'
+QUEUED_TIMEOUT = 60 * 10
+
+# Images processed per model by each run of the periodic backfill
+BACKFILL_BATCH_SIZE = 50
+
+IMAGE_LABELS = ('recipe', 'instruction')
+
+
+def _derivative_name(source_name: str, width: int, extension: str) -> str:
+    """Storage name of one derivative, next to the source's upload path."""
+    stem = os.path.splitext(source_name)[0]
+    return f"{DERIVATIVE_DIR}/{stem}-{width}w.{extension}"
+
+
+def manifest_is_current(manifest: Optional[Dict], field_file) -> bool:
+    """Whether ``manifest`` was generated from the file currently in ``field_file``."""
+    return bool(field_file) and bool(manifest) and manifest.get('source') == field_file.name
+
+
+def generate_derivatives(field_file) -> Dict:
+    """
+    Resize an image to every derivative width in WebP and JPEG/PNG.
+
+    Args:
+        field_file: ImageFieldFile with a stored image
+
+    Returns:
+        dict: Manifest with 'source', 'width', 'height' and 'variants'
+        (each with 'width', 'height', 'webp' and 'fallback' storage names)
+    """
+    with field_file.open('rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    fallback_format, fallback_ext = ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+    source_width, source_height = image.size
+
+    variants: List[Dict] = []
+    for width in sorted({min(width, source_width) for width in DERIVATIVE_WIDTHS}):
+        height = max(round(source_height * width / source_width), 1)
+        resized = image if width == source_width else image.resize((width, height), Image.LANCZOS)
+
+        names = {}
+        for key, image_format, extension, options in (
+            ('webp', 'WEBP', 'webp', {'quality': WEBP_QUALITY, 'method': 6}),
+            ('fallback', fallback_format, fallback_ext,
+             {'optimize': True} if has_alpha else
+             {'quality': JPEG_QUALITY, 'optimize': True, 'progressive': True}),
+        ):
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            name = _derivative_name(field_file.name, width, extension)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            names[key] = default_storage.save(name, ContentFile(buffer.getvalue()))
+
+        variants.append({'width': width, 'height': height, **names})
+
+    return {
+        'source': field_file.name,
+        'width': source_width,
+        'height': source_height,
+        'variants': variants,
+    }
+
+
+def delete_derivatives(manifest: Optional[Dict]) -> None:
+    """Remove the files listed in a manifest."""
+    for variant in (manifest or {}).get('variants', []):
+        for key in ('webp', 'fallback'):
+            name = variant.get(key)
+            if name:
+                try:
+                    default_storage.delete(name)
+                except Exception as e:
+                    logger.warning(f"Could not delete image derivative {name}: {str(e)}")
+
+
+def _model_for_label(label: str):
+    from .models import Instruction, Recipe
+
+    return {'recipe': Recipe, 'instruction': Instruction}[label]
+
+
+def process_image(label: str, pk: int, force: bool = False) -> bool:
+    """
+    Generate derivatives for one object's image and store the manifest.
+
+    Args:
+        label: 'recipe' or 'instruction'
+        pk: Object primary key
+        force: Regenerate even when the manifest is current
+
+    Returns:
+        bool: Whether a new manifest was written
+    """
+    model = _model_for_label(label)
+    fields = ['pk', 'image', 'image_manifest'] + (['recipe'] if label == 'instruction' else [])
+    obj = model.objects.filter(pk=pk).only(*fields).first()
+    cache.delete(QUEUED_KEY.format(label=label, pk=pk))
+    if obj is None:
+        return False
+
+    old_manifest = obj.image_manifest or {}
+    if not obj.image:
+        manifest = {}
+    elif not force and manifest_is_current(old_manifest, obj.image):
+        return False
+    else:
+        try:
+            manifest = generate_derivatives(obj.image)
+        except Exception as e:
+            _record_failure(model, obj, str(e))
+            raise
+
+    # Only write if the image was not replaced while we worked
+    unchanged = Q(image=obj.image.name) if obj.image else Q(image='') | Q(image__isnull=True)
+    updated = model.objects.filter(unchanged, pk=pk).update(image_manifest=manifest)
+    if not updated:
+        delete_derivatives(manifest)
+        return False
+
+    if old_manifest.get('source') != manifest.get('source'):
+        delete_derivatives(old_manifest)
+    # Cached fragments embed the variant URLs
+    bump_fragment_versions([obj.pk if label == 'recipe' else obj.recipe_id])
+    logger.debug(f"Stored image derivatives for {label} {pk}")
+    return True
+
+
+def _record_failure(model, obj, message: str) -> None:
+    """
+    Store a manifest with no variants recording why ``obj.image`` failed.
+
+    It counts as current, so the backfill skips the image (and pages
+    keep serving the original) until it is replaced or forced.
+    """
+    old_manifest = obj.image_manifest or {}
+    updated = model.objects.filter(pk=obj.pk, image=obj.image.name).update(
+        image_manifest={'source': obj.image.name, 'error': message}
+    )
+    if updated and old_manifest.get('source') != obj.image.name:
+        delete_derivatives(old_manifest)
+
+
+def pending_images(label: str, force: bool = False):
+    """
+    Objects with an image but no manifest generated from it, oldest first.
+
+    Images whose generation failed have a manifest recording the error
+    and are left out unless forced.
+
+    Args:
+        label: 'recipe' or 'instruction'
+        force: Include objects whose manifest is current or records a failure
+
+    Returns:
+        QuerySet: Objects to process (pk, image and manifest loaded)
+    """
+    queryset = _model_for_label(label).objects.exclude(image='').exclude(image__isnull=True)
+    if not force:
+        queryset = queryset.annotate(
+            manifest_source=KeyTextTransform('source', 'image_manifest')
+        ).filter(Q(manifest_source__isnull=True) | ~Q(manifest_source=F('image')))
+    return queryset.only('pk', 'image', 'image_manifest').order_by('pk')
+
+
+def generate_missing_derivatives(label: str, limit: Optional[int] = None,
+                                 force: bool = False) -> Dict:
+    """
+    Generate derivatives for images that have none (or only stale ones).
+
+    Args:
+        label: 'recipe' or 'instruction'
+        limit: Maximum images to process; all when None
+        force: Regenerate current manifests too
+
+    Returns:
+        dict: 'generated', 'skipped' and 'failed' counts and (pk, message) 'errors'
+    """
+    queryset = pending_images(label, force)
+    if limit is not None:
+        queryset = queryset[:limit]
+
+    stats = {'generated': 0, 'skipped': 0, 'failed': 0, 'errors': []}
+    for obj in queryset.iterator():
+        try:
+            if process_image(label, obj.pk, force=force):
+                stats['generated'] += 1
+            else:
+                stats['skipped'] += 1
+        except Exception as e:
+            stats['failed'] += 1
+            stats['errors'].append((obj.pk, str(e)))
+            logger.error(f"Error generating image derivatives for {label} {obj.pk}: {str(e)}")
+    return stats
+
+
+def queue_image_processing(obj) -> None:
+    """Queue derivative generation for ``obj`` once per pending change."""
+    from .tasks import generate_image_derivatives_task
+
+    label = obj._meta.model_name
+    if cache.add(QUEUED_KEY.format(label=label, pk=obj.pk), True, QUEUED_TIMEOUT):
+        generate_image_derivatives_task.delay(label, obj.pk)
+
+
+def select_variant(manifest: Optional[Dict], width: int) -> Optional[Dict]:
+    """Smallest variant at least ``width`` pixels wide (or the largest one)."""
+    variants = (manifest or {}).get('variants') or []
+    for variant in variants:
+        if variant['width'] >= width:
+            return variant
+    return variants[-1] if variants else None
+
+
+def image_variant_url(obj, width: int = CARD_WIDTH, webp: bool = True) -> Optional[str]:
+    """
+    URL of the best image for a display width, without storage calls.
+
+    Falls back to the original upload when the manifest is missing or
+    stale; the periodic backfill generates it.
+
+    Args:
+        obj: Recipe or Instruction
+        width: Display width in pixels
+        webp: Prefer the WebP variant
+
+    Returns:
+        str: Image URL, or None when the object has no image
+    """
+    image = getattr(obj, 'image', None)
+    if not image:
+        return None
+
+    manifest = getattr(obj, 'image_manifest', None)
+    if not manifest_is_current(manifest, image):
+        return image.url
+
+    variant = select_variant(manifest, width)
+    if variant is None:
+        return image.url
+    return default_storage.url(variant['webp' if webp else 'fallback'])
+
+
+def image_srcset(obj, key: str = 'webp') -> str:
+    """``srcset`` attribute value listing every variant of one format."""
+    manifest = getattr(obj, 'image_manifest', None)
+    if not manifest_is_current(manifest, getattr(obj, 'image', None)):
+        return ''
+    return ', '.join(
+        f"{default_storage.url(variant[key])} {variant['width']}w"
+        for variant in manifest.get('variants', [])
+    )
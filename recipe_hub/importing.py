@@ -0,0 +1,459 @@
+"""
+Bulk recipe import engine.
+
+Shared by the recipe hub CSV import, ``RecipeCSVHandler`` and the meal
+planner's admin CSV uploads. Callers turn their own CSV layout into
+normalized recipe dicts; the engine takes them in chunks, resolves
+categories, meal types, slugs and ingredient categories from maps loaded
+once, and writes each chunk with one ``bulk_create`` per table inside a
+transaction. A chunk that fails is retried row by row so every bad row
+gets its own error instead of sinking its neighbours.
+
+Normalized recipe dict keys:
+    row_num, title, description, prep_time, cook_time, servings,
+    difficulty, is_public (optional), dietary_info, categories (names),
+    meal_types (names), ingredients (dicts with name, quantity, unit,
+    notes), instructions (strings or dicts with instruction,
+    step_number, time_minutes)
+"""
+
+import codecs
+import csv
+import io
+import logging
+from decimal import Decimal, InvalidOperation
+from fractions import Fraction
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .canonical import canonicalize_ingredients
+from .categorizer import get_categorizer, get_other_category
+from .dietary import dietary_mask
+from .models import Ingredient, Instruction, Recipe, RecipeCategory
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500
+VALID_DIFFICULTIES = ('easy', 'medium', 'hard')
+CSV_ENCODINGS = ('utf-8-sig', 'cp1252')
+
+
+def parse_quantity(value) -> Optional[Decimal]:
+    """
+    Parse an ingredient quantity such as '2', '0.5', '1/2' or '1 1/2'.
+
+    Returns:
+        Decimal rounded to two places, or None if not a number
+    """
+    if value is None or isinstance(value, Decimal):
+        return value
+    text = str(value).strip().replace(',', '.')
+    if not text:
+        return None
+    try:
+        total = sum(Fraction(part) for part in text.split())
+        return (Decimal(total.numerator) / Decimal(total.denominator)).quantize(Decimal('0.01'))
+    except (ValueError, ZeroDivisionError, InvalidOperation):
+        return None
+
+
+def iter_csv_rows(csv_file, sample_size: int = 64 * 1024) -> Iterator[Tuple[int, Dict]]:
+    """
+    Stream rows of an uploaded CSV file without reading it into memory.
+
+    The encoding is detected from a leading sample (UTF-8 with optional
+    BOM, falling back to Windows-1252).
+
+    Args:
+        csv_file: Binary file object (uploaded or stored file)
+        sample_size: Bytes inspected to detect the encoding
+
+    Yields:
+        tuple: (row number, row dict); the header is row 1
+    """
+    csv_file.seek(0)
+    sample = csv_file.read(sample_size)
+    csv_file.seek(0)
+
+    encoding = CSV_ENCODINGS[-1]
+    for candidate in CSV_ENCODINGS:
+        try:
+            # Incremental decode tolerates a character cut by the sample
+            codecs.getincrementaldecoder(candidate)().decode(sample, final=False)
+            encoding = candidate
+            break
+        except UnicodeDecodeError:
+            continue
+
+    text = io.TextIOWrapper(csv_file, encoding=encoding, errors='replace', newline='')
+    try:
+        reader = csv.DictReader(text)
+        for row_num, row in enumerate(reader, start=2):
+            yield row_num, row
+    finally:
+        text.detach()
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to ``size`` items."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ImportResult:
+    """Running totals and row-level errors of an import."""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+        self.warnings: List[str] = []
+        self.recipe_ids: List[int] = []
+        self.last_row = 0
+
+    def add_error(self, row_num: Optional[int], title: str, message: str) -> None:
+        """Record a row that could not be imported."""
+        self.failed += 1
+        self.errors.append({'row': row_num, 'title': title, 'error': message})
+
+    def error_messages(self) -> List[str]:
+        """Errors formatted as 'Row N (title): message'."""
+        messages = []
+        for error in self.errors:
+            prefix = f"Row {error['row']}" if error['row'] else 'Row ?'
+            if error['title']:
+                prefix += f" ({error['title']})"
+            messages.append(f"{prefix}: {error['error']}")
+        return messages
+
+    def as_dict(self) -> Dict:
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'errors': self.errors,
+            'warnings': self.warnings,
+            'last_row': self.last_row,
+        }
+
+
+class RecipeBulkImporter:
+    """
+    Import normalized recipe dicts for one author in bulk.
+
+    Usage:
+        importer = RecipeBulkImporter(user, skip_duplicates=True)
+        result = importer.import_rows(rows)
+    """
+
+    def __init__(
+        self,
+        user,
+        is_public: Optional[bool] = None,
+        skip_duplicates: bool = False,
+        create_missing_categories: bool = False,
+        default_category: Optional[RecipeCategory] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        result: Optional[ImportResult] = None
+    ) -> None:
+        """
+        Initialize the importer and preload lookup maps.
+
+        Args:
+            user: Author of the imported recipes
+            is_public: Visibility for every recipe; rows decide when None
+            skip_duplicates: Skip titles the author already has
+            create_missing_categories: Create unknown categories instead
+                of warning about them
+            default_category: Category for rows that resolve to none
+            chunk_size: Rows written per transaction
+            result: Existing result to keep adding to (resumed imports)
+        """
+        self.user = user
+        self.is_public = is_public
+        self.skip_duplicates = skip_duplicates
+        self.create_missing_categories = create_missing_categories
+        self.default_category = default_category
+        self.chunk_size = chunk_size
+        self.result = result or ImportResult()
+        self._preload()
+
+    def _preload(self) -> None:
+        """Load every map the rows are resolved against, once."""
+        from meal_planner.models import MealType
+
+        self.categories = {
+            name.lower(): pk
+            for pk, name in RecipeCategory.objects.filter(is_active=True).values_list('pk', 'name')
+        }
+        self.meal_types = {
+            name.lower(): pk for pk, name in MealType.objects.values_list('pk', 'name')
+        }
+        self.slugs: Set[str] = set(Recipe.objects.values_list('slug', flat=True).iterator())
+        self.titles: Set[str] = set()
+        if self.skip_duplicates:
+            self.titles = {
+                title.lower()
+                for title in Recipe.objects.filter(author=self.user).values_list('title', flat=True)
+            }
+        self.categorizer = get_categorizer()
+        self._other_category_id = None
+        self._warned: Set[str] = set(self.result.warnings)
+        self.remaining = self._remaining_recipe_slots()
+
+    def _remaining_recipe_slots(self) -> Optional[int]:
+        """Recipes the author may still create (None = unlimited), as Recipe.save enforces."""
+        from auth_hub.models import UserProfile
+
+        if self.user.is_staff or self.user.is_superuser:
+            return None
+        try:
+            max_recipes = self.user.profile.subscription_tier.max_recipes
+        except UserProfile.DoesNotExist:
+            return 0
+        if max_recipes == -1:
+            return None
+        return max(max_recipes - Recipe.objects.filter(author=self.user).count(), 0)
+
+    def _warn(self, message: str) -> None:
+        """Record a warning once per import."""
+        if message not in self._warned:
+            self._warned.add(message)
+            self.result.warnings.append(message)
+
+    def _allocate_slug(self, title: str) -> str:
+        """Unique slug for ``title`` against the preloaded slug set."""
+        base_slug = slugify(title)[:190] or 'recipe'
+        slug = base_slug
+        counter = 1
+        while slug in self.slugs:
+            slug = f"{base_slug}-{counter}"
+            counter += 1
+        self.slugs.add(slug)
+        return slug
+
+    def _category_ids(self, names: Iterable[str]) -> List[int]:
+        """Resolve category names, creating or warning about unknown ones."""
+        ids = []
+        for name in names:
+            pk = self.categories.get(name.lower())
+            if pk is None and self.create_missing_categories:
+                category, _ = RecipeCategory.objects.get_or_create(
+                    name=name, defaults={'slug': slugify(name)}
+                )
+                pk = self.categories[name.lower()] = category.pk
+            if pk is None:
+                self._warn(f"Category '{name}' not found")
+            elif pk not in ids:
+                ids.append(pk)
+        if not ids and self.default_category is not None:
+            ids.append(self.default_category.pk)
+        return ids
+
+    def _meal_type_ids(self, names: Iterable[str]) -> List[int]:
+        """Resolve meal type names, warning about unknown ones."""
+        ids = []
+        for name in names:
+            pk = self.meal_types.get(name.lower())
+            if pk is None:
+                self._warn(f"Meal type '{name}' not found")
+            elif pk not in ids:
+                ids.append(pk)
+        return ids
+
+    def _ingredient_category_id(self, name: str) -> int:
+        """Category by the shared keyword categorizer, falling back to 'Other'."""
+        category_id = self.categorizer.match(name)
+        if category_id is not None:
+            return category_id
+        if self._other_category_id is None:
+            self._other_category_id = get_other_category().pk
+        return self._other_category_id
+
+    def import_rows(
+        self,
+        rows: Iterable[Dict],
+        on_chunk: Optional[Callable[[ImportResult], None]] = None
+    ) -> ImportResult:
+        """
+        Import rows chunk by chunk.
+
+        Args:
+            rows: Normalized recipe dicts (any iterable; consumed lazily)
+            on_chunk: Called with the result inside each chunk's transaction
+
+        Returns:
+            ImportResult: Totals, errors and created recipe IDs
+        """
+        from .signals import queue_bulk_created_recipes
+
+        for chunk in _chunked(rows, self.chunk_size):
+            # The callback commits with the chunk, so a checkpoint it
+            # writes never runs ahead of (or behind) the imported rows
+            with transaction.atomic():
+                recipe_ids, ingredient_ids = self._import_chunk(chunk)
+                self.result.last_row = max(
+                    [self.result.last_row] + [row.get('row_num') or 0 for row in chunk]
+                )
+                if on_chunk is not None:
+                    on_chunk(self.result)
+
+            # bulk_create skips save() and post_save, so the refreshes those
+            # would trigger are queued for the whole chunk, once it is written
+            if recipe_ids:
+                queue_bulk_created_recipes(recipe_ids, self.user.pk, ingredient_ids)
+
+        logger.info(
+            f"Bulk import for {self.user.username}: {self.result.created} created, "
+            f"{self.result.skipped} skipped, {self.result.failed} failed"
+        )
+        return self.result
+
+    def _prepare(self, row: Dict) -> Optional[Tuple[Recipe, Dict]]:
+        """Build an unsaved Recipe for a row, or record why it is skipped."""
+        title = (row.get('title') or '').strip()
+        if not title:
+            self.result.add_error(row.get('row_num'), '', "Recipe title is required")
+            return None
+        if self.skip_duplicates and title.lower() in self.titles:
+            self.result.skipped += 1
+            return None
+        if self.remaining is not None and self.remaining <= 0:
+            self.result.add_error(
+                row.get('row_num'), title, "Recipe limit reached for your subscription plan"
+            )
+            return None
+
+        difficulty = (row.get('difficulty') or 'medium').lower()
+        is_public = self.is_public if self.is_public is not None else bool(row.get('is_public', False))
+        recipe = Recipe(
+            author=self.user,
+            title=title[:200],
+            slug=self._allocate_slug(title),
+            description=row.get('description') or f"Delicious {title} recipe",
+            prep_time=int(row['prep_time']),
+            cook_time=int(row['cook_time']),
+            servings=int(row.get('servings') or 4),
+            difficulty=difficulty if difficulty in VALID_DIFFICULTIES else 'medium',
+            is_public=is_public,
+            dietary_info=row.get('dietary_info') or {},
+            dietary_flags=dietary_mask(row.get('dietary_info')),
+        )
+        if self.skip_duplicates:
+            self.titles.add(title.lower())
+        if self.remaining is not None:
+            self.remaining -= 1
+        return recipe, row
+
+    def _import_chunk(self, chunk: List[Dict]) -> Tuple[List[int], List[int]]:
+        """
+        Write one chunk, falling back to row-by-row on failure.
+
+        Returns:
+            tuple: IDs of the created recipes and ingredients
+        """
+        recipe_ids: List[int] = []
+        ingredient_ids: List[int] = []
+        prepared = []
+        for row in chunk:
+            try:
+                item = self._prepare(row)
+            except (KeyError, TypeError, ValueError) as e:
+                self.result.add_error(row.get('row_num'), row.get('title', ''), f"Invalid value: {str(e)}")
+                continue
+            if item is not None:
+                prepared.append(item)
+        if not prepared:
+            return recipe_ids, ingredient_ids
+
+        try:
+            with transaction.atomic():
+                created = self._write(prepared)
+            self._record_created(created[0])
+            recipe_ids.extend(created[0])
+            ingredient_ids.extend(created[1])
+        except Exception as e:
+            logger.warning(f"Bulk import chunk failed ({str(e)}), retrying row by row")
+            for item in prepared:
+                item[0].pk = None
+                item[0]._state.adding = True
+                try:
+                    with transaction.atomic():
+                        created = self._write([item])
+                    self._record_created(created[0])
+                    recipe_ids.extend(created[0])
+                    ingredient_ids.extend(created[1])
+                except Exception as row_error:
+                    self.result.add_error(item[1].get('row_num'), item[0].title, str(row_error))
+                    logger.error(f"Error importing row {item[1].get('row_num')}: {str(row_error)}")
+        return recipe_ids, ingredient_ids
+
+    def _record_created(self, recipe_ids: List[int]) -> None:
+        self.result.created += len(recipe_ids)
+        self.result.recipe_ids.extend(recipe_ids)
+
+    def _write(self, prepared: List[Tuple[Recipe, Dict]]) -> Tuple[List[int], List[int]]:
+        """
+        Insert recipes and all their related rows with one statement per table.
+
+        Returns:
+            tuple: IDs of the created recipes and ingredients
+        """
+        recipes = Recipe.objects.bulk_create([recipe for recipe, _ in prepared])
+
+        category_links, meal_type_links, ingredients, instructions = [], [], [], []
+        CategoryLink = Recipe.categories.through
+        MealTypeLink = Recipe.meal_types.through
+
+        for recipe, (_, row) in zip(recipes, prepared):
+            for category_id in self._category_ids(row.get('categories') or ()):
+                category_links.append(CategoryLink(recipe_id=recipe.pk, recipecategory_id=category_id))
+            for meal_type_id in self._meal_type_ids(row.get('meal_types') or ()):
+                meal_type_links.append(MealTypeLink(recipe_id=recipe.pk, mealtype_id=meal_type_id))
+
+            for order, data in enumerate(row.get('ingredients') or (), start=1):
+                name = (data.get('name') or '').strip()
+                if not name:
+                    continue
+                raw_quantity = data.get('quantity')
+                quantity = parse_quantity(raw_quantity)
+                notes = (data.get('notes') or '').strip()
+                if quantity is None and raw_quantity not in (None, ''):
+                    notes = ' '.join(filter(None, [str(raw_quantity).strip(), notes]))
+                ingredients.append(Ingredient(
+                    recipe_id=recipe.pk,
+                    name=name[:200],
+                    quantity=quantity,
+                    unit=(data.get('unit') or '')[:50],
+                    notes=notes[:200],
+                    order=data.get('order') or order,
+                    category_id=self._ingredient_category_id(name),
+                ))
+
+            for step, data in enumerate(row.get('instructions') or (), start=1):
+                if isinstance(data, str):
+                    data = {'instruction': data}
+                if not (data.get('instruction') or '').strip():
+                    continue
+                instructions.append(Instruction(
+                    recipe_id=recipe.pk,
+                    step_number=data.get('step_number') or step,
+                    instruction=data['instruction'].strip(),
+                    time_minutes=data.get('time_minutes'),
+                ))
+
+        CategoryLink.objects.bulk_create(category_links, ignore_conflicts=True)
+        MealTypeLink.objects.bulk_create(meal_type_links, ignore_conflicts=True)
+        canonicalize_ingredients(ingredients)
+        Ingredient.objects.bulk_create(ingredients, batch_size=2000)
+        Instruction.objects.bulk_create(instructions, batch_size=2000)
+
+        return [recipe.pk for recipe in recipes], [ingredient.pk for ingredient in ingredients]
@@ -0,0 +1,71 @@
+"""
+Django management command to resolve existing ingredients to canonical ingredients.
+
+Sets canonical, base_quantity and base_unit on recipe ingredients saved
+before canonical resolution existed (or after unit rules changed).
+
+Usage:
+    python manage.py backfill_canonical_ingredients
+    python manage.py backfill_canonical_ingredients --only-missing --batch-size 5000
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from recipe_hub.canonical import canonicalize_ingredients
+from recipe_hub.models import Ingredient
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to backfill canonical ingredient fields."""
+
+    help = 'Resolve recipe ingredients to canonical ingredients and base units'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--only-missing',
+            action='store_true',
+            help='Only process ingredients without a canonical ingredient'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Ingredients resolved and updated per batch'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        queryset = Ingredient.objects.only('pk', 'name', 'quantity', 'unit')
+        if options['only_missing']:
+            queryset = queryset.filter(canonical__isnull=True)
+        batch_size = options['batch_size']
+
+        total = queryset.count()
+        self.stdout.write(f"Resolving {total} ingredients...")
+
+        processed = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            with transaction.atomic():
+                canonicalize_ingredients(batch)
+                Ingredient.objects.bulk_update(
+                    batch, ['canonical', 'base_quantity', 'base_unit'], batch_size=batch_size
+                )
+
+            processed += len(batch)
+            self.stdout.write(f"Processed {processed}/{total} ingredients...")
+
+        logger.info(f"Backfilled canonical ingredients for {processed} ingredients")
+        self.stdout.write(self.style.SUCCESS(
+            f"Resolved {processed} ingredients to canonical ingredients"
+        ))
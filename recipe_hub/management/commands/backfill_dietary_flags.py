@@ -0,0 +1,70 @@
+"""
+Django management command to fill the dietary flag bitmask of existing recipes.
+
+Recomputes Recipe.dietary_flags from dietary_info. Migration 0012 fills
+the flags of recipes saved before the bitmask existed; run this after
+dietary_info was changed with a queryset update (which skips
+Recipe.save).
+
+Usage:
+    python manage.py backfill_dietary_flags
+    python manage.py backfill_dietary_flags --batch-size 5000
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.dietary import dietary_mask
+from recipe_hub.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to backfill recipe dietary flags."""
+
+    help = 'Recompute the dietary flag bitmask of every recipe from its dietary info'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Recipes read and updated per batch'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        batch_size = options['batch_size']
+        queryset = Recipe.objects.only('pk', 'dietary_info', 'dietary_flags')
+
+        total = queryset.count()
+        self.stdout.write(f"Checking {total} recipes...")
+
+        processed = 0
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            changed = []
+            for recipe in batch:
+                mask = dietary_mask(recipe.dietary_info)
+                if recipe.dietary_flags != mask:
+                    recipe.dietary_flags = mask
+                    changed.append(recipe)
+            if changed:
+                Recipe.objects.bulk_update(changed, ['dietary_flags'], batch_size=batch_size)
+
+            processed += len(batch)
+            updated += len(changed)
+            self.stdout.write(f"Processed {processed}/{total} recipes...")
+
+        logger.info(f"Backfilled dietary flags: {updated} of {processed} recipes updated")
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated dietary flags on {updated} of {processed} recipes"
+        ))
@@ -0,0 +1,56 @@
+"""
+Django management command to generate responsive image variants.
+
+Creates the resized and WebP versions of existing recipe and step images
+and stores their manifests.
+
+Usage:
+    python manage.py generate_image_derivatives
+    python manage.py generate_image_derivatives --model recipe --force
+    python manage.py generate_image_derivatives --limit 100
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.images import IMAGE_LABELS, generate_missing_derivatives
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to backfill image derivatives."""
+
+    help = 'Generate resized and WebP versions of recipe and step images'
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            '--model',
+            choices=sorted(IMAGE_LABELS),
+            help='Only process recipe or instruction images'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate variants even when they are up to date or failed before'
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Maximum images processed per model'
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        labels = [options['model']] if options['model'] else list(IMAGE_LABELS)
+
+        for label in labels:
+            stats = generate_missing_derivatives(label, options['limit'], options['force'])
+            for pk, message in stats['errors']:
+                self.stdout.write(self.style.ERROR(f"{label} {pk}: {message}"))
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{label.capitalize()} images: {stats['generated']} generated, "
+                f"{stats['skipped']} skipped, {stats['failed']} failed"
+            ))
@@ -0,0 +1,32 @@
+"""
+Django management command to rebuild the recipe autocomplete index.
+
+Run after deploying (or let the hourly beat task do it) so no web
+process has to build the index itself.
+
+Usage:
+    python manage.py rebuild_autocomplete_index
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.autocomplete import rebuild_autocomplete_index
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to rebuild and publish the autocomplete index."""
+
+    help = 'Rebuild the in-memory recipe autocomplete index and publish it through the cache'
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        self.stdout.write("Rebuilding autocomplete index...")
+        index = rebuild_autocomplete_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Published {len(index.recipes)} recipes, "
+            f"{len(index.categories)} categories, "
+            f"{len(index.ingredient_counts)} ingredients"
+        ))
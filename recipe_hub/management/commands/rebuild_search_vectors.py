@@ -0,0 +1,35 @@
+"""
+Django management command to rebuild recipe full-text search documents.
+
+Usage:
+    python manage.py rebuild_search_vectors [--recipe ID ...]
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.search import update_search_vectors
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to recompute stored recipe search vectors."""
+
+    help = 'Recompute the full-text search vector for recipes'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--recipe',
+            type=int,
+            nargs='+',
+            dest='recipe_ids',
+            help='Only rebuild these recipe IDs',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        self.stdout.write("Rebuilding recipe search vectors...")
+        updated = update_search_vectors(options['recipe_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Updated search vectors for {updated} recipes"))
@@ -0,0 +1,57 @@
+"""
+Django management command to rebuild the similar-recipes index.
+
+Usage:
+    python manage.py rebuild_similar_recipes [--recipe ID ... | --pending] [--top-k 8]
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.similarity import (
+    TOP_K, rebuild_similar_recipes, refresh_pending_similar_recipes, refresh_similar_recipes
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to recompute precomputed similar recipes."""
+
+    help = 'Recompute the top-k similar recipes stored for each recipe'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--recipe',
+            type=int,
+            nargs='+',
+            dest='recipe_ids',
+            help='Only refresh lists affected by these recipe IDs',
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Only refresh recipes queued since the last batch refresh',
+        )
+        parser.add_argument(
+            '--top-k',
+            type=int,
+            default=TOP_K,
+            help=f'Neighbours stored per recipe (default: {TOP_K})',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        if options['pending']:
+            self.stdout.write("Refreshing queued similar recipes...")
+            refreshed = refresh_pending_similar_recipes(options['top_k'])
+            self.stdout.write(self.style.SUCCESS(f"Rewrote {refreshed} neighbour lists"))
+        elif options['recipe_ids']:
+            self.stdout.write("Refreshing similar recipes...")
+            refreshed = refresh_similar_recipes(options['recipe_ids'], options['top_k'])
+            self.stdout.write(self.style.SUCCESS(f"Rewrote {refreshed} neighbour lists"))
+        else:
+            self.stdout.write("Rebuilding similar recipes...")
+            indexed = rebuild_similar_recipes(options['top_k'])
+            self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} recipes"))
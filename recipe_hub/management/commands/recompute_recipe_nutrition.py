@@ -0,0 +1,35 @@
+"""
+Django management command to rebuild per-serving recipe nutrition.
+
+Usage:
+    python manage.py recompute_recipe_nutrition [--recipe ID ...]
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.nutrition import recompute_recipe_nutrition
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to backfill denormalized recipe nutrition."""
+
+    help = 'Recompute per-serving nutrition for recipes from matched ASDA products'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--recipe',
+            type=int,
+            nargs='+',
+            dest='recipe_ids',
+            help='Only recompute these recipe IDs',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        self.stdout.write("Recomputing recipe nutrition...")
+        updated = recompute_recipe_nutrition(options['recipe_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Updated nutrition for {updated} recipes"))
@@ -0,0 +1,35 @@
+"""
+Django management command to repair denormalized recipe counters.
+
+Usage:
+    python manage.py repair_recipe_counters [--recipe ID ...]
+"""
+
+import logging
+from django.core.management.base import BaseCommand
+
+from recipe_hub.counters import refresh_recipe_counters
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Management command to recompute rating, favorite and comment counters."""
+
+    help = 'Recompute stored rating, favorite and comment counters for recipes'
+
+    def add_arguments(self, parser):
+        """Add command line arguments."""
+        parser.add_argument(
+            '--recipe',
+            type=int,
+            nargs='+',
+            dest='recipe_ids',
+            help='Only repair these recipe IDs',
+        )
+
+    def handle(self, *args, **options):
+        """Handle the command execution."""
+        self.stdout.write("Recomputing recipe counters...")
+        updated = refresh_recipe_counters(options['recipe_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Updated counters for {updated} recipes"))
@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal_planner', '0002_initial'),
+        ('recipe_hub', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='carbs_per_serving',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='fat_per_serving',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='kcal_per_serving',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='nutrition_coverage',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Percentage of ingredients with nutrition data'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='nutrition_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='protein_per_serving',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='salt_per_serving',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='sugars_per_serving',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=7, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['is_public', 'kcal_per_serving'], name='recipe_hub__is_publ_6b48da_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['is_public', '-protein_per_serving'], name='recipe_hub__is_publ_a151c3_idx'),
+        ),
+    ]
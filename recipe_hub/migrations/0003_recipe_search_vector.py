@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:39
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+def populate_search_vectors(apps, schema_editor):
+    """Build search documents for existing recipes."""
+    from recipe_hub.search import search_vector_expression
+
+    Recipe = apps.get_model('recipe_hub', 'Recipe')
+    Ingredient = apps.get_model('recipe_hub', 'Ingredient')
+    Recipe.objects.update(search_vector=search_vector_expression(Ingredient))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal_planner', '0002_initial'),
+        ('recipe_hub', '0002_recipe_nutrition'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='recipe_search_vector_gin'),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_counters(apps, schema_editor):
+    """Compute counters for existing recipes."""
+    from recipe_hub.counters import counter_expressions
+
+    Recipe = apps.get_model('recipe_hub', 'Recipe')
+    Recipe.objects.update(**counter_expressions(
+        apps.get_model('recipe_hub', 'RecipeRating'),
+        apps.get_model('recipe_hub', 'RecipeFavorite'),
+        apps.get_model('recipe_hub', 'RecipeComment'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal_planner', '0002_initial'),
+        ('recipe_hub', '0003_recipe_search_vector'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='avg_rating',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of approved comments, including replies'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='favorite_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Sum of all rating values; keeps avg_rating exact'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['is_public', '-avg_rating', '-rating_count'], name='recipe_hub__is_publ_0bcdb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['is_public', '-favorite_count'], name='recipe_hub__is_publ_7a0d09_idx'),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
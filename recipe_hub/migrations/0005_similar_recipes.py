@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 21:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_hub', '0004_recipe_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_links', to='recipe_hub.recipe')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipe_hub.recipe')),
+            ],
+            options={
+                'ordering': ['recipe', 'rank'],
+                'indexes': [models.Index(fields=['recipe', 'rank'], name='recipe_hub__recipe__2d82f7_idx')],
+                'unique_together': {('recipe', 'similar')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_hub', '0005_similar_recipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingredient',
+            name='base_quantity',
+            field=models.DecimalField(blank=True, decimal_places=3, max_digits=14, null=True),
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='base_unit',
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.CreateModel(
+            name='CanonicalIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Normalized ingredient name', max_length=200, unique=True)),
+                ('display_name', models.CharField(max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='canonical_ingredients', to='recipe_hub.ingredientcategory')),
+            ],
+            options={
+                'verbose_name': 'Canonical Ingredient',
+                'verbose_name_plural': 'Canonical Ingredients',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recipe_ingredients', to='recipe_hub.canonicalingredient'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['canonical', 'recipe'], name='ingredient_canonical_idx'),
+        ),
+    ]
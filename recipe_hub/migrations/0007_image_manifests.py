@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_hub', '0006_canonical_ingredients'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='instruction',
+            name='image_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated image sizes (see recipe_hub.images)'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_manifest',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated image sizes (see recipe_hub.images)'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    """Compute thread paths for existing comments, one nesting level at a time."""
+    from recipe_hub.comments import path_segment
+
+    RecipeComment = apps.get_model('recipe_hub', 'RecipeComment')
+    paths = {}
+    depth = 0
+    level = list(RecipeComment.objects.filter(parent__isnull=True).only('pk'))
+    while level:
+        for comment in level:
+            comment.path = paths.get(comment.parent_id, '') + path_segment(comment.pk)
+            comment.depth = depth
+            paths[comment.pk] = comment.path
+        RecipeComment.objects.bulk_update(level, ['path', 'depth'], batch_size=1000)
+        level = list(
+            RecipeComment.objects.filter(
+                parent_id__in=[comment.pk for comment in level]
+            ).only('pk', 'parent_id')
+        )
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_hub', '0007_image_manifests'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipecomment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='recipecomment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='recipecomment',
+            index=models.Index(fields=['recipe', 'path'], name='comment_recipe_path_idx'),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('meal_planner', '0003_csv_upload_checkpoint'),
+        ('recipe_hub', '0008_comment_thread_paths'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='dietary_flags',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['is_public', 'dietary_flags', 'difficulty'], name='recipe_public_dietary_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Null out nutrition computed from too few ingredients (see MIN_NUTRITION_COVERAGE)."""
+
+    dependencies = [
+        ('recipe_hub', '0009_recipe_dietary_flags'),
+    ]
+
+    # 80 is recipe_hub.nutrition.MIN_NUTRITION_COVERAGE at the time of
+    # writing; migrations must not import it, as it may change later
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                UPDATE recipe_hub_recipe
+                SET kcal_per_serving = NULL,
+                    protein_per_serving = NULL,
+                    fat_per_serving = NULL,
+                    carbs_per_serving = NULL,
+                    sugars_per_serving = NULL,
+                    salt_per_serving = NULL
+                WHERE nutrition_coverage < 80
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
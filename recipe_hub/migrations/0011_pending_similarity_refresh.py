@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:41
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipe_hub', '0010_clear_low_coverage_nutrition'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingSimilarityRefresh',
+            fields=[
+                ('recipe_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 22:50
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Fill Recipe.dietary_flags for recipes saved before the bitmask existed.
+
+    Bits follow recipe_hub.dietary.DIETARY_FLAGS, and like dietary_mask
+    only JSON true sets a flag.
+    """
+
+    dependencies = [
+        ('recipe_hub', '0011_pending_similarity_refresh'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                UPDATE recipe_hub_recipe
+                SET dietary_flags =
+                    (CASE WHEN dietary_info @> '{"vegetarian": true}' THEN 1 ELSE 0 END)
+                    | (CASE WHEN dietary_info @> '{"vegan": true}' THEN 2 ELSE 0 END)
+                    | (CASE WHEN dietary_info @> '{"gluten_free": true}' THEN 4 ELSE 0 END)
+                    | (CASE WHEN dietary_info @> '{"dairy_free": true}' THEN 8 ELSE 0 END)
+                    | (CASE WHEN dietary_info @> '{"nut_free": true}' THEN 16 ELSE 0 END)
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -6,15 +6,18 @@ ingredients, instructions, categories, and user interactions.
 """
 
 import logging
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.text import slugify
 from django.core.exceptions import ValidationError
 
+from .dietary import dietary_labels, dietary_mask
+
 logger = logging.getLogger(__name__)
 
 
@@ -73,6 +76,7 @@ class Recipe(models.Model):
         servings: Number of servings
         difficulty: Recipe difficulty level
         image: Main recipe image
+        image_manifest: Generated sizes of the main image
         is_public: Whether recipe is visible to other users
         is_featured: Admin-selected featured recipes
         dietary_info: JSON field for dietary restrictions
@@ -132,6 +136,12 @@ class Recipe(models.Model):
         null=True,
         help_text="Recipe image (optional)"
     )
+    image_manifest = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Generated image sizes (see recipe_hub.images)"
+    )
     
     # Visibility and features
     is_public = models.BooleanField(
@@ -149,6 +159,8 @@ class Recipe(models.Model):
         blank=True,
         help_text="Dietary restrictions and allergens"
     )
+    # Bitmask of the dietary_info flags (see recipe_hub.dietary), set on save
+    dietary_flags = models.PositiveSmallIntegerField(default=0, editable=False)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -161,19 +173,77 @@ class Recipe(models.Model):
         help_text="SEO meta description"
     )
     
+    # Per-serving nutrition rolled up from matched ASDA products
+    # (maintained by recipe_hub.nutrition, never edited directly)
+    kcal_per_serving = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    protein_per_serving = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True, blank=True, editable=False
+    )
+    fat_per_serving = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True, blank=True, editable=False
+    )
+    carbs_per_serving = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True, blank=True, editable=False
+    )
+    sugars_per_serving = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True, blank=True, editable=False
+    )
+    salt_per_serving = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True, blank=True, editable=False
+    )
+    nutrition_coverage = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Percentage of ingredients with nutrition data"
+    )
+    nutrition_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    # Engagement counters (maintained by recipe_hub.counters, never edited directly)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_total = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Sum of all rating values; keeps avg_rating exact"
+    )
+    avg_rating = models.FloatField(default=0, editable=False)
+    favorite_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Number of approved comments, including replies"
+    )
+    
+    # Full-text search document: title (A), description (B), ingredient
+    # names (C). Maintained by recipe_hub.search, never edited directly.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['author', '-created_at']),
             models.Index(fields=['is_public', '-created_at']),
+            models.Index(fields=['is_public', 'kcal_per_serving']),
+            models.Index(fields=['is_public', '-protein_per_serving']),
+            models.Index(fields=['is_public', '-avg_rating', '-rating_count']),
+            models.Index(fields=['is_public', '-favorite_count']),
+            models.Index(
+                fields=['is_public', 'dietary_flags', 'difficulty'],
+                name='recipe_public_dietary_idx'
+            ),
+            GinIndex(fields=['search_vector'], name='recipe_search_vector_gin'),
         ]
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        """Auto-generate slug and validate recipe limits."""
+        """Auto-generate slug, sync dietary flags and validate recipe limits."""
+        self.dietary_flags = dietary_mask(self.dietary_info)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'dietary_info' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'dietary_flags'}
+        
         if not self.slug:
             base_slug = slugify(self.title)
             slug = base_slug
@@ -229,14 +299,8 @@ class Recipe(models.Model):
 
     @property
     def average_rating(self):
-        """Calculate average rating from all ratings."""
-        avg = self.ratings.aggregate(avg_rating=Avg('rating'))['avg_rating']
-        return round(avg, 1) if avg else 0
-
-    @property
-    def rating_count(self):
-        """Get total number of ratings."""
-        return self.ratings.count()
+        """Average rating rounded for display (stored, no query)."""
+        return round(self.avg_rating, 1) if self.avg_rating else 0
 
     def is_favorited_by(self, user):
         """Check if recipe is favorited by given user."""
@@ -250,21 +314,7 @@ class Recipe(models.Model):
 
     def get_dietary_labels(self):
         """Get list of dietary labels for display."""
-        labels = []
-        dietary_info = self.dietary_info or {}
-        
-        if dietary_info.get('vegetarian'):
-            labels.append('Vegetarian')
-        if dietary_info.get('vegan'):
-            labels.append('Vegan')
-        if dietary_info.get('gluten_free'):
-            labels.append('Gluten-Free')
-        if dietary_info.get('dairy_free'):
-            labels.append('Dairy-Free')
-        if dietary_info.get('nut_free'):
-            labels.append('Nut-Free')
-        
-        return labels
+        return dietary_labels(self.dietary_flags)
 
     # ADD THIS NEW METHOD
     def get_meal_type_names(self):
@@ -339,6 +389,42 @@ class IngredientCategory(models.Model):
         super().save(*args, **kwargs)
 
 
+class CanonicalIngredient(models.Model):
+    """
+    Shared identity for ingredients that are the same thing.
+    
+    Recipe ingredients are resolved to one of these by normalized name, so
+    "Onions", "onion" and "chopped onion" aggregate and search together.
+    
+    Attributes:
+        name: Normalized name (lowercase, singular, no descriptors)
+        display_name: Readable name shown in shopping lists
+        category: Default shopping list category
+    """
+    name = models.CharField(
+        max_length=200,
+        unique=True,
+        help_text="Normalized ingredient name"
+    )
+    display_name = models.CharField(max_length=200)
+    category = models.ForeignKey(
+        IngredientCategory,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='canonical_ingredients'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Canonical Ingredient"
+        verbose_name_plural = "Canonical Ingredients"
+    
+    def __str__(self):
+        return self.display_name
+
+
 class Ingredient(models.Model):
     """
     Ingredient for a recipe with enhanced categorization.
@@ -351,6 +437,9 @@ class Ingredient(models.Model):
         order: Display order in the recipe
         category: Category for shopping list organization
         notes: Optional notes about the ingredient
+        canonical: Shared ingredient identity used for aggregation
+        base_quantity: Quantity in base_unit (g, ml, item or the unit itself)
+        base_unit: Normalized unit the quantity is aggregated in
     """
     recipe = models.ForeignKey(
         Recipe,
@@ -383,9 +472,26 @@ class Ingredient(models.Model):
         blank=True,
         help_text="Optional notes (e.g., 'finely chopped', 'room temperature')"
     )
+    canonical = models.ForeignKey(
+        CanonicalIngredient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='recipe_ingredients'
+    )
+    base_quantity = models.DecimalField(
+        max_digits=14,
+        decimal_places=3,
+        null=True,
+        blank=True
+    )
+    base_unit = models.CharField(max_length=50, blank=True)
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['canonical', 'recipe'], name='ingredient_canonical_idx'),
+        ]
     
     def __str__(self):
         if self.quantity and self.unit:
@@ -395,44 +501,32 @@ class Ingredient(models.Model):
         return self.name
     
     def save(self, *args, **kwargs):
-        """Auto-categorize ingredient if category not set."""
+        """Auto-categorize ingredient if category not set and resolve its canonical form."""
+        from .canonical import canonicalize_ingredients
+        
         if not self.category_id:
             self.auto_categorize()
+        canonicalize_ingredients([self])
         super().save(*args, **kwargs)
     
     def auto_categorize(self):
         """
         Automatically assign category based on ingredient name and category keywords.
         
-        This method uses keyword matching to automatically categorize ingredients
-        based on predefined keywords in each category.
+        Uses the compiled keyword categorizer, so no category query is made
+        per ingredient; unmatched ingredients go to the 'Other' category.
         """
+        from .categorizer import get_categorizer, get_other_category
+        
         try:
-            ingredient_lower = self.name.lower()
-            
-            # Try to find a matching category based on keywords
-            categories = IngredientCategory.objects.filter(is_active=True)
-            
-            for category in categories:
-                keywords = category.get_keywords_list()
-                if any(keyword in ingredient_lower for keyword in keywords):
-                    self.category = category
-                    logger.info(f"Auto-categorized '{self.name}' as '{category.name}'")
-                    return
-            
-            # If no match found, try to find or create 'Other' category
-            other_category, created = IngredientCategory.objects.get_or_create(
-                slug='other',
-                defaults={
-                    'name': 'Other',
-                    'display_order': 999,
-                    'is_active': True
-                }
-            )
-            self.category = other_category
+            category_id = get_categorizer().match(self.name)
+            if category_id is not None:
+                self.category_id = category_id
+                logger.debug(f"Auto-categorized '{self.name}' as category {category_id}")
+                return
             
-            if created:
-                logger.info("Created 'Other' category for uncategorized ingredients")
+            # If no match found, use the 'Other' category
+            self.category = get_other_category()
                 
         except Exception as e:
             logger.error(f"Error auto-categorizing ingredient '{self.name}': {str(e)}")
@@ -456,6 +550,7 @@ class Instruction(models.Model):
         instruction: The instruction text
         time_minutes: Optional time for this step
         image: Optional image for this step
+        image_manifest: Generated sizes of the step image
     """
     recipe = models.ForeignKey(
         Recipe,
@@ -475,6 +570,12 @@ class Instruction(models.Model):
         null=True,
         help_text="Optional image for this step"
     )
+    image_manifest = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Generated image sizes (see recipe_hub.images)"
+    )
     
     class Meta:
         ordering = ['step_number']
@@ -527,6 +628,13 @@ class RecipeRating(models.Model):
     def __str__(self):
         return f"{self.user.username} rated {self.recipe.title}: {self.rating}/5"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded values so counter signals can see what changed."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
         """Log rating activity."""
         is_new = not self.pk
@@ -609,19 +717,41 @@ class RecipeComment(models.Model):
     )
     comment = models.TextField()
     is_approved = models.BooleanField(default=True)
+    # Ancestor and own keys as fixed-width segments, see recipe_hub.comments
+    path = models.CharField(max_length=255, blank=True, default='', editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['recipe', 'path'], name='comment_recipe_path_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.recipe.title}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded values so counter signals can see what changed."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
-        """Log comment activity."""
+        """Maintain the thread path and log comment activity."""
+        from .comments import clamp_parent, update_thread_path
+
         is_new = not self.pk
-        super().save(*args, **kwargs)
+        loaded = getattr(self, '_loaded_values', {})
+        parent_changed = 'parent_id' in loaded and loaded['parent_id'] != self.parent_id
+        clamp_parent(self)
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new or parent_changed or not self.path:
+                update_thread_path(self)
         
         if is_new:
             logger.info(
@@ -630,4 +760,58 @@ class RecipeComment(models.Model):
             )
 
 
+class SimilarRecipe(models.Model):
+    """
+    Precomputed nearest neighbour of a recipe.
+
+    Rows are written in batch by ``recipe_hub.similarity``; each recipe
+    keeps its top-k most similar public recipes ordered by ``rank``.
+
+    Attributes:
+        recipe: Recipe the neighbour belongs to
+        similar: Neighbouring recipe
+        score: Cosine similarity (0-1)
+        rank: Position in the recipe's neighbour list (0 = most similar)
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='similar_links'
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['recipe', 'rank']
+        unique_together = ['recipe', 'similar']
+        indexes = [
+            models.Index(fields=['recipe', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipe_id} ~ {self.similar_id} ({self.score:.2f})"
+
+
+class PendingSimilarityRefresh(models.Model):
+    """
+    Recipe whose similar-recipe lists are out of date.
+
+    Signal handlers record changed recipes here and a periodic task
+    refreshes them in one batch, so saves never build the similarity
+    index. ``recipe_id`` is not a foreign key, so a recipe deleted
+    before the batch runs is simply skipped.
+
+    Attributes:
+        recipe_id: Changed recipe
+        queued_at: When the recipe last changed
+    """
+    recipe_id = models.IntegerField(primary_key=True)
+    queued_at = models.DateTimeField(default=timezone.now)
 
+    def __str__(self):
+        return f"{self.recipe_id} (queued {self.queued_at})"
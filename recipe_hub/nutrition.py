@@ -0,0 +1,142 @@
+"""
+Recipe nutrition roll-up.
+
+Derives per-serving nutrition for recipes from their ingredients'
+quantities and the per-100g nutrition of each ingredient's matched ASDA
+product. Results are stored on the Recipe row so list pages can filter
+and sort on them without touching ingredients at render time. Recipes
+below ``MIN_NUTRITION_COVERAGE`` keep NULL values, so the filters and
+sorts never rank them on partial totals.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.utils import timezone
+
+from .models import Ingredient, Recipe
+from .units import to_base_amount
+
+logger = logging.getLogger(__name__)
+
+# Recipe field -> NutritionInfo field (values per 100g/100ml)
+NUTRIENT_FIELDS = {
+    'kcal_per_serving': 'energy_kcal',
+    'protein_per_serving': 'protein',
+    'fat_per_serving': 'fat',
+    'carbs_per_serving': 'carbohydrates',
+    'sugars_per_serving': 'sugars',
+    'salt_per_serving': 'salt',
+}
+
+# Nutrition facts are printed per 100g or 100ml; ml is taken as ~1g
+GRAM_DIMENSIONS = ('mass', 'volume')
+
+# Grams of protein per serving for a recipe to count as high protein
+HIGH_PROTEIN_PER_SERVING = 20
+
+# Percentage of ingredients that need nutrition data before per-serving
+# values are stored. Below it the totals undercount, so they stay NULL and
+# the recipe drops out of calorie/protein filters and sorts.
+MIN_NUTRITION_COVERAGE = 80
+
+UPDATE_FIELDS = list(NUTRIENT_FIELDS) + ['nutrition_coverage', 'nutrition_updated_at']
+
+BATCH_SIZE = 500
+
+
+def _chunked(items: List[int], size: int) -> Iterable[List[int]]:
+    """Yield successive slices of ``items``."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _ingredient_grams(quantity, unit) -> Optional[Decimal]:
+    """Return an ingredient's weight in grams, or None if it cannot be derived."""
+    converted = to_base_amount(quantity, unit)
+    if not converted or converted[0] not in GRAM_DIMENSIONS:
+        return None
+    return converted[1]
+
+
+def _compute_batch(recipe_ids: List[int]) -> List[Recipe]:
+    """Compute nutrition for one batch of recipes with a single query."""
+    nutrient_paths = [
+        f'product_match__product__nutrition__{field}'
+        for field in NUTRIENT_FIELDS.values()
+    ]
+    rows = Ingredient.objects.filter(recipe_id__in=recipe_ids).values_list(
+        'recipe_id', 'recipe__servings', 'quantity', 'unit', *nutrient_paths
+    )
+
+    totals: Dict[int, Dict[str, Decimal]] = defaultdict(
+        lambda: {field: Decimal('0') for field in NUTRIENT_FIELDS}
+    )
+    counts = defaultdict(lambda: [0, 0])  # recipe_id -> [ingredients, covered]
+    servings = {}
+
+    for recipe_id, recipe_servings, quantity, unit, *values in rows:
+        servings[recipe_id] = recipe_servings or 1
+        counts[recipe_id][0] += 1
+        grams = _ingredient_grams(quantity, unit)
+        if grams is None or all(value is None for value in values):
+            continue
+        counts[recipe_id][1] += 1
+        recipe_totals = totals[recipe_id]
+        for field, value in zip(NUTRIENT_FIELDS, values):
+            if value is not None:
+                recipe_totals[field] += Decimal(str(value)) * grams / 100
+
+    now = timezone.now()
+    recipes = []
+    for recipe_id in recipe_ids:
+        recipe = Recipe(pk=recipe_id, nutrition_updated_at=now)
+        total_count, covered = counts.get(recipe_id, (0, 0))
+        recipe.nutrition_coverage = round(100 * covered / total_count) if total_count else 0
+
+        if covered and recipe.nutrition_coverage >= MIN_NUTRITION_COVERAGE:
+            per_serving = Decimal(servings[recipe_id])
+            for field, total in totals[recipe_id].items():
+                value = total / per_serving
+                if field == 'kcal_per_serving':
+                    value = int(value.to_integral_value())
+                else:
+                    value = value.quantize(Decimal('0.01'))
+                setattr(recipe, field, value)
+        else:
+            for field in NUTRIENT_FIELDS:
+                setattr(recipe, field, None)
+        recipes.append(recipe)
+    return recipes
+
+
+def recompute_recipe_nutrition(recipe_ids: Iterable[int] = None) -> int:
+    """
+    Recompute and store per-serving nutrition for recipes.
+
+    Args:
+        recipe_ids: Recipes to refresh; all recipes when None
+
+    Returns:
+        int: Number of recipes updated
+    """
+    if recipe_ids is None:
+        recipe_ids = Recipe.objects.values_list('pk', flat=True)
+    ids = sorted(set(recipe_ids))
+
+    updated = 0
+    for batch in _chunked(ids, BATCH_SIZE):
+        # Ignore recipes deleted before the task ran
+        existing = list(
+            Recipe.objects.filter(pk__in=batch).values_list('pk', flat=True)
+        )
+        if not existing:
+            continue
+        recipes = _compute_batch(existing)
+        Recipe.objects.bulk_update(recipes, UPDATE_FIELDS)
+        updated += len(recipes)
+
+    logger.info(f"Recomputed nutrition for {updated} recipes")
+    return updated
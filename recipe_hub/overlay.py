@@ -0,0 +1,144 @@
+"""
+Per-user overlay for recipe lists.
+
+Recipe rows are shared between users; whether the current user has
+favorited or rated a recipe, or may edit it, is not. The overlay loads
+that per-user state for a whole batch of recipes in one query and is
+cached on the request, so cards and filters can read it without a query
+per recipe.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Set
+
+from django.db.models import Exists, OuterRef, Subquery
+
+from .fragments import load_fragment_versions
+from .models import Recipe, RecipeFavorite, RecipeRating
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ATTR = '_recipe_user_overlay'
+
+
+class RecipeUserOverlay:
+    """
+    Favorite, rating and ownership state of one user for a set of recipes.
+
+    Recipes passed to ``load`` are tagged with the overlay so template
+    filters that only receive the recipe can still find it.
+    """
+
+    def __init__(self, user, recipes: Iterable[Recipe] = ()) -> None:
+        """
+        Initialize the overlay.
+
+        Args:
+            user: Current user (may be anonymous)
+            recipes: Recipes to load immediately
+        """
+        self.user = user
+        self.user_id = user.pk if user is not None and user.is_authenticated else None
+        self.favorite_ids: Set[int] = set()
+        self.ratings: Dict[int, int] = {}
+        self._loaded: Set[int] = set()
+        self.load(recipes)
+
+    def load(self, recipes: Iterable[Recipe]) -> 'RecipeUserOverlay':
+        """
+        Load user state for any recipes not already covered, in one query.
+
+        Args:
+            recipes: Recipe instances (querysets are evaluated and cached)
+
+        Returns:
+            RecipeUserOverlay: self, for chaining
+        """
+        recipes = [recipe for recipe in recipes if recipe is not None]
+        for recipe in recipes:
+            recipe._user_overlay = self
+
+        missing = {recipe.pk for recipe in recipes} - self._loaded
+        if not missing:
+            return self
+        self._loaded.update(missing)
+
+        if self.user_id is None:
+            return self
+
+        try:
+            rows = Recipe.objects.filter(pk__in=missing).annotate(
+                is_favorited=Exists(
+                    RecipeFavorite.objects.filter(recipe=OuterRef('pk'), user_id=self.user_id)
+                ),
+                user_rating=Subquery(
+                    RecipeRating.objects.filter(
+                        recipe=OuterRef('pk'), user_id=self.user_id
+                    ).values('rating')[:1]
+                ),
+            ).order_by().values_list('pk', 'is_favorited', 'user_rating')
+
+            for pk, is_favorited, user_rating in rows:
+                if is_favorited:
+                    self.favorite_ids.add(pk)
+                if user_rating is not None:
+                    self.ratings[pk] = user_rating
+        except Exception as e:
+            logger.error(f"Error loading recipe overlay for user {self.user_id}: {str(e)}")
+        return self
+
+    def covers(self, recipe: Recipe) -> bool:
+        """Whether state for ``recipe`` has been loaded."""
+        return recipe.pk in self._loaded
+
+    def is_favorited(self, recipe: Recipe) -> bool:
+        """Whether the user has favorited ``recipe``."""
+        self.load([recipe])
+        return recipe.pk in self.favorite_ids
+
+    def user_rating(self, recipe: Recipe) -> Optional[int]:
+        """The user's rating for ``recipe``, or None."""
+        self.load([recipe])
+        return self.ratings.get(recipe.pk)
+
+    def can_edit(self, recipe: Recipe) -> bool:
+        """Whether the user may edit ``recipe`` (no query needed)."""
+        if self.user_id is None:
+            return False
+        return recipe.author_id == self.user_id or self.user.is_staff
+
+
+def get_recipe_overlay(request, recipes: Iterable[Recipe] = ()) -> RecipeUserOverlay:
+    """
+    Return the request's overlay, creating it and loading ``recipes``.
+
+    Args:
+        request: Current HttpRequest
+        recipes: Recipes about to be rendered
+
+    Returns:
+        RecipeUserOverlay: Overlay shared by everything rendering this request
+    """
+    overlay = getattr(request, REQUEST_ATTR, None)
+    if overlay is None:
+        overlay = RecipeUserOverlay(getattr(request, 'user', None))
+        setattr(request, REQUEST_ATTR, overlay)
+    return overlay.load(recipes)
+
+
+class RecipeOverlayMixin:
+    """
+    ListView mixin that loads the user overlay for the page's recipes.
+
+    Also loads the page's fragment versions (see recipe_hub.fragments) so
+    cached cards need no cache read each. Adds ``recipe_overlay`` to the
+    template context.
+    """
+
+    def get_context_data(self, **kwargs):
+        """Load per-user state for the current page in one query."""
+        context = super().get_context_data(**kwargs)
+        recipes = list(context.get('object_list') or ())
+        context['recipe_overlay'] = get_recipe_overlay(self.request, recipes)
+        load_fragment_versions(self.request, recipes)
+        return context
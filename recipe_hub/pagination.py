@@ -0,0 +1,261 @@
+"""
+Keyset (cursor) pagination for recipe lists.
+
+Pages are addressed by an opaque cursor holding the sort-key values of
+the last (or first) row shown, and fetched with a WHERE clause on those
+keys instead of OFFSET, so page 500 costs the same as page 1. Every sort
+ends in ``id`` so keys are unique and no row is skipped or repeated.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q, QuerySet
+
+logger = logging.getLogger(__name__)
+
+# (field, descending) pairs, most significant first
+SortKeys = Sequence[Tuple[str, bool]]
+
+DEFAULT_SORT_KEYS: SortKeys = (('created_at', True), ('id', True))
+
+# RecipeSearchForm.sort_by value -> keys; 'relevance' is absent (offset mode)
+RECIPE_SORT_KEYS = {
+    '-created_at': DEFAULT_SORT_KEYS,
+    'created_at': (('created_at', False), ('id', False)),
+    '-rating': (('avg_rating', True), ('rating_count', True), ('id', True)),
+    'title': (('title', False), ('id', False)),
+    'total_time': (('total_minutes', False), ('id', False)),
+    'kcal_per_serving': (('kcal_per_serving', False), ('id', True)),
+    '-protein_per_serving': (('protein_per_serving', True), ('id', True)),
+}
+
+COUNT_CACHE_TIMEOUT = 300
+COUNT_CACHE_PREFIX = 'recipe_list_count'
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded."""
+    pass
+
+
+def order_by_keys(sort_keys: Optional[SortKeys]) -> List:
+    """Translate sort keys into ``order_by`` arguments."""
+    return [
+        F(field).desc() if descending else F(field).asc()
+        for field, descending in sort_keys or DEFAULT_SORT_KEYS
+    ]
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder for cursor values.
+
+    DjangoJSONEncoder truncates datetimes to milliseconds, which would
+    skip or repeat rows whose timestamps differ only in microseconds.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(payload: dict) -> str:
+    """Encode a cursor payload as URL-safe base64 JSON."""
+    raw = json.dumps(payload, cls=CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a cursor produced by ``encode_cursor``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(payload, dict):
+        raise InvalidCursor("Cursor payload must be an object")
+    return payload
+
+
+def _after(sort_keys: SortKeys, values: Sequence, backwards: bool = False) -> Q:
+    """
+    Build the lexicographic "comes after these values" condition.
+
+    For keys (a desc, id desc) and values (x, y) this is
+    ``a < x OR (a = x AND id < y)``; ``backwards`` flips every comparison.
+    """
+    condition = Q()
+    equal_so_far = Q()
+    for (field, descending), value in zip(sort_keys, values):
+        lookup = 'lt' if descending != backwards else 'gt'
+        condition |= equal_so_far & Q(**{f'{field}__{lookup}': value})
+        equal_so_far &= Q(**{field: value})
+    return condition
+
+
+class KeysetPage:
+    """One page of results plus cursors for its neighbours."""
+
+    def __init__(
+        self,
+        object_list: list,
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+        page_size: int
+    ) -> None:
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.page_size = page_size
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+def paginate_keyset(
+    queryset: QuerySet,
+    sort_keys: Optional[SortKeys],
+    cursor: Optional[str],
+    page_size: int
+) -> KeysetPage:
+    """
+    Fetch one page of ``queryset`` after (or before) ``cursor``.
+
+    ``queryset`` must already be ordered by ``order_by_keys(sort_keys)``.
+    When ``sort_keys`` is None (e.g. relevance-ranked search, whose float
+    scores make poor keys) the cursor carries an offset instead.
+
+    Args:
+        queryset: Ordered queryset
+        sort_keys: Keys the queryset is ordered by, or None for offset mode
+        cursor: Cursor from a previous page, or None for the first page
+        page_size: Rows per page
+
+    Returns:
+        KeysetPage: Rows and neighbour cursors
+    """
+    try:
+        payload = decode_cursor(cursor) if cursor else {}
+    except InvalidCursor as e:
+        logger.warning(f"Ignoring invalid pagination cursor: {str(e)}")
+        payload = {}
+
+    if sort_keys is None:
+        return _paginate_offset(queryset, payload, page_size)
+
+    fields = [field for field, _ in sort_keys]
+    values = payload.get('v')
+    backwards = payload.get('d') == 'prev'
+
+    if values is not None and len(values) == len(fields):
+        queryset = queryset.filter(_after(sort_keys, values, backwards))
+    else:
+        values = None
+        backwards = False
+
+    if backwards:
+        queryset = queryset.reverse()
+
+    rows = list(queryset[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row):
+        return [getattr(row, field) for field in fields]
+
+    next_cursor = previous_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = encode_cursor({'v': key_of(rows[-1]), 'd': 'next'})
+        if values is not None and (has_more or not backwards):
+            previous_cursor = encode_cursor({'v': key_of(rows[0]), 'd': 'prev'})
+
+    return KeysetPage(rows, next_cursor, previous_cursor, page_size)
+
+
+def _paginate_offset(queryset: QuerySet, payload: dict, page_size: int) -> KeysetPage:
+    """Offset-based fallback for orderings without usable keys."""
+    try:
+        offset = max(int(payload.get('o', 0)), 0)
+    except (TypeError, ValueError):
+        offset = 0
+
+    rows = list(queryset[offset:offset + page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = encode_cursor({'o': offset + page_size}) if has_more else None
+    previous_cursor = (
+        encode_cursor({'o': max(offset - page_size, 0)}) if offset else None
+    )
+    return KeysetPage(rows, next_cursor, previous_cursor, page_size)
+
+
+def cached_count(queryset: QuerySet, key_parts: Sequence) -> int:
+    """
+    Count a filtered queryset once and reuse the result while paging.
+
+    Args:
+        queryset: Filtered queryset (ordering is ignored)
+        key_parts: Values identifying the filter (not the cursor)
+
+    Returns:
+        int: Row count
+    """
+    digest = hashlib.md5(
+        json.dumps(list(key_parts), cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')
+    ).hexdigest()
+    key = f"{COUNT_CACHE_PREFIX}:{digest}"
+    count = cache.get(key)
+    if count is None:
+        count = queryset.order_by().count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin replacing OFFSET pagination with cursors.
+
+    Views order their queryset with ``order_by_keys`` and expose the keys
+    through ``get_sort_keys``. Templates get ``page_obj`` (a KeysetPage)
+    and ``is_paginated`` as before.
+    """
+
+    cursor_kwarg = 'cursor'
+
+    def get_sort_keys(self) -> Optional[SortKeys]:
+        """Keys the queryset is ordered by; None for offset mode."""
+        return DEFAULT_SORT_KEYS
+
+    def paginate_queryset(self, queryset, page_size):
+        """Return (paginator, page, object_list, is_paginated) like ListView."""
+        page = paginate_keyset(
+            queryset,
+            self.get_sort_keys(),
+            self.request.GET.get(self.cursor_kwarg),
+            page_size,
+        )
+        return None, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,110 @@
+"""
+Recipe full-text search.
+
+Recipes carry a stored ``search_vector`` built from the title (weight A),
+description (weight B) and concatenated ingredient names (weight C),
+backed by a GIN index. This module maintains that column and builds
+ranked queries against it.
+"""
+
+import logging
+import re
+from typing import Iterable, Optional
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import F, OuterRef, QuerySet, Subquery
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'english'
+
+_WORD_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def search_vector_expression(ingredient_model=None):
+    """
+    Build the expression that computes a recipe's search document.
+
+    Args:
+        ingredient_model: Ingredient model class (migrations pass the
+            historical model; defaults to the current one)
+
+    Returns:
+        SearchVector: Weighted vector expression for ``Recipe`` rows
+    """
+    if ingredient_model is None:
+        from .models import Ingredient as ingredient_model
+
+    ingredient_names = ingredient_model.objects.filter(
+        recipe_id=OuterRef('pk')
+    ).values('recipe_id').annotate(
+        names=StringAgg('name', delimiter=' ')
+    ).values('names')
+
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(Subquery(ingredient_names), weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(recipe_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute stored search vectors in a single UPDATE.
+
+    Args:
+        recipe_ids: Recipes to refresh; all recipes when None
+
+    Returns:
+        int: Number of rows updated
+    """
+    from .models import Recipe
+
+    queryset = Recipe.objects.all()
+    if recipe_ids is not None:
+        queryset = queryset.filter(pk__in=list(recipe_ids))
+    updated = queryset.update(search_vector=search_vector_expression())
+    logger.debug(f"Updated search vectors for {updated} recipes")
+    return updated
+
+
+def build_search_query(text: str) -> SearchQuery:
+    """Parse user input with web-search syntax ("quoted phrases", -exclusions, or)."""
+    return SearchQuery(text, search_type='websearch', config=SEARCH_CONFIG)
+
+
+def build_prefix_query(text: str) -> Optional[SearchQuery]:
+    """
+    Build a query that matches every word as a prefix, for type-ahead.
+
+    Args:
+        text: Partial user input, e.g. 'chick tik'
+
+    Returns:
+        SearchQuery: Raw ``chick:* & tik:*`` query, or None if no words
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    return SearchQuery(
+        ' & '.join(f'{word}:*' for word in words),
+        search_type='raw',
+        config=SEARCH_CONFIG,
+    )
+
+
+def search_recipes(queryset: QuerySet, query: SearchQuery) -> QuerySet:
+    """
+    Filter a recipe queryset by a search query and annotate ``rank``.
+
+    Args:
+        queryset: Recipe queryset
+        query: Parsed SearchQuery
+
+    Returns:
+        QuerySet: Matching recipes annotated with ``rank``
+    """
+    return queryset.filter(search_vector=query).annotate(
+        rank=SearchRank(F('search_vector'), query)
+    )
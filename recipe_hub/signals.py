@@ -0,0 +1,500 @@
+"""
+Signal handlers for recipe hub.
+
+Queues nutrition recomputation when a recipe's ingredients, their
+product matches or the matched products' nutrition data change, and
+refreshes the full-text search document when a recipe's text or
+ingredients change. Recipes whose categories, meal types, ingredients,
+dietary flags or visibility change are queued for the periodic
+similar-recipes refresh, and changed recipes and categories are written
+to the autocomplete index's delta. The compiled ingredient categorizer
+is invalidated when an ingredient category changes, and a recipe's
+cached template fragments when anything they display changes (including
+its author's username and deleted categories). Resized image variants
+are generated in the background when a recipe or step image is uploaded
+or replaced.
+Rating, favorite and comment counters on Recipe are adjusted in the same
+transaction as the row that changed them, and the author's cached
+statistics are dropped once it commits.
+"""
+
+import logging
+import threading
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from asda_scraper.matching import matches_updated
+from asda_scraper.models import NutritionInfo
+from asda_scraper.tasks import match_ingredients_task
+from .autocomplete import refresh_autocomplete_categories, refresh_autocomplete_recipes
+from .categorizer import invalidate_categorizer
+from .fragments import bump_fragment_versions
+from .images import delete_derivatives, manifest_is_current, queue_image_processing
+from .counters import adjust_counter, adjust_rating_totals, refresh_recipe_counters
+from .models import (
+    Ingredient, IngredientCategory, Instruction, Recipe, RecipeCategory, RecipeComment,
+    RecipeFavorite, RecipeRating, SimilarRecipe
+)
+from .search import update_search_vectors
+from .stats import invalidate_author_stats
+from .similarity import mark_similarity_stale
+from .tasks import recompute_recipe_nutrition_task
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+# Deferred per-recipe refreshes: name -> handler receiving sorted recipe IDs
+_HANDLERS = {
+    'nutrition': recompute_recipe_nutrition_task.delay,
+    'search': update_search_vectors,
+    'similarity': mark_similarity_stale,
+    'autocomplete': refresh_autocomplete_recipes,
+    'fragments': bump_fragment_versions,
+}
+
+
+def _flush(name):
+    """Run one refresh for every recipe queued under ``name`` on this thread."""
+    queued = getattr(_pending, 'queues', {})
+    recipe_ids = sorted(queued.pop(name, ()))
+    if not recipe_ids:
+        return
+    try:
+        _HANDLERS[name](recipe_ids)
+    except Exception as e:
+        logger.error(f"Error running {name} refresh for {len(recipe_ids)} recipes: {str(e)}")
+
+
+def _queue_refresh(name, recipe_ids):
+    """
+    Schedule a refresh for recipes once the transaction commits.
+
+    Recipes touched repeatedly in one transaction (e.g. a recipe saved with
+    all its ingredients) are handled in a single call by the first commit
+    hook to run; the remaining hooks find the queue empty.
+    """
+    recipe_ids = {pk for pk in recipe_ids if pk}
+    if not recipe_ids:
+        return
+    if not hasattr(_pending, 'queues'):
+        _pending.queues = {}
+    _pending.queues.setdefault(name, set()).update(recipe_ids)
+    transaction.on_commit(partial(_flush, name))
+
+
+def queue_nutrition_recompute(recipe_ids):
+    """Schedule a nutrition recompute for recipes once the transaction commits."""
+    _queue_refresh('nutrition', recipe_ids)
+
+
+def queue_search_update(recipe_ids):
+    """Schedule a search vector refresh for recipes once the transaction commits."""
+    _queue_refresh('search', recipe_ids)
+
+
+def queue_similarity_refresh(recipe_ids):
+    """Queue recipes for the periodic similar-recipes refresh once the transaction commits."""
+    _queue_refresh('similarity', recipe_ids)
+
+
+def queue_autocomplete_refresh(recipe_ids):
+    """Schedule an autocomplete index patch for recipes once the transaction commits."""
+    _queue_refresh('autocomplete', recipe_ids)
+
+
+def queue_fragment_invalidation(recipe_ids):
+    """Bump recipes' cached-fragment versions after commit."""
+    _queue_refresh('fragments', recipe_ids)
+
+
+def queue_bulk_created_recipes(recipe_ids, author_id, ingredient_ids=()):
+    """
+    Queue every refresh a bulk-created batch of recipes needs.
+
+    ``bulk_create`` sends no post_save or m2m_changed signals, so bulk
+    importers call this, after the batch is written, instead.
+    """
+    for name in _HANDLERS:
+        _queue_refresh(name, recipe_ids)
+    transaction.on_commit(partial(invalidate_author_stats, author_id))
+    if ingredient_ids:
+        transaction.on_commit(partial(match_ingredients_task.delay, list(ingredient_ids)))
+
+
+@receiver(post_save, sender=Recipe)
+def update_search_vector_on_recipe_change(sender, instance, created, raw=False,
+                                          update_fields=None, **kwargs):
+    """Refresh the search document when a recipe's title or description may have changed."""
+    if raw:
+        return
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    try:
+        queue_search_update([instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing search update for recipe {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def refresh_autocomplete_on_recipe_change(sender, instance, raw=False,
+                                          update_fields=None, **kwargs):
+    """Patch the autocomplete index when a recipe's title, slug or visibility may have changed."""
+    if raw:
+        return
+    if update_fields is not None and not {'title', 'slug', 'is_public'} & set(update_fields):
+        return
+    try:
+        queue_autocomplete_refresh([instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing autocomplete refresh for recipe {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_save, sender=Instruction)
+@receiver(post_delete, sender=Instruction)
+@receiver(post_save, sender=RecipeRating)
+@receiver(post_delete, sender=RecipeRating)
+def invalidate_fragments_on_change(sender, instance, raw=False, **kwargs):
+    """Drop a recipe's cached card and detail fragments when anything they show changes."""
+    # RecipeFavorite and RecipeComment are deliberately not connected: the
+    # cached fragments show neither counter, and favorite state is per-user
+    # and rendered outside them
+    if raw:
+        return
+    recipe_id = instance.pk if sender is Recipe else instance.recipe_id
+    try:
+        queue_fragment_invalidation([recipe_id])
+    except Exception as e:
+        logger.error(f"Error queueing fragment invalidation for recipe {recipe_id}: {str(e)}")
+
+
+@receiver(m2m_changed, sender=Recipe.categories.through)
+def invalidate_fragments_on_categories_change(sender, instance, action, reverse, pk_set,
+                                              **kwargs):
+    """Drop cached cards whose category badges changed."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    try:
+        queue_fragment_invalidation((pk_set or ()) if reverse else [instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing fragment invalidation after {action}: {str(e)}")
+
+
+@receiver(pre_save, sender=RecipeCategory)
+def invalidate_fragments_on_category_rename(sender, instance, raw=False, **kwargs):
+    """Drop cached cards showing a category whose name or slug is changing."""
+    if raw or instance.pk is None:
+        return
+    try:
+        old = RecipeCategory.objects.filter(pk=instance.pk).values('name', 'slug').first()
+        if old and (old['name'] != instance.name or old['slug'] != instance.slug):
+            queue_fragment_invalidation(instance.recipes.values_list('pk', flat=True))
+    except Exception as e:
+        logger.error(f"Error queueing fragment invalidation for category {instance.pk}: {str(e)}")
+
+
+@receiver(pre_delete, sender=RecipeCategory)
+def invalidate_fragments_on_category_delete(sender, instance, **kwargs):
+    """Drop cached cards linking to a category being deleted."""
+    # The cascade removes the through rows without an m2m_changed signal
+    try:
+        queue_fragment_invalidation(instance.recipes.values_list('pk', flat=True))
+    except Exception as e:
+        logger.error(f"Error queueing fragment invalidation for category {instance.pk}: {str(e)}")
+
+
+@receiver(pre_save, sender=User)
+def invalidate_fragments_on_username_change(sender, instance, raw=False,
+                                            update_fields=None, **kwargs):
+    """Drop cached cards showing an author whose username is changing."""
+    if raw or instance.pk is None:
+        return
+    # Logins save only last_login
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    try:
+        old = User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+        if old is not None and old != instance.username:
+            queue_fragment_invalidation(
+                Recipe.objects.filter(author=instance).values_list('pk', flat=True)
+            )
+    except Exception as e:
+        logger.error(f"Error queueing fragment invalidation for user {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=RecipeCategory)
+@receiver(post_delete, sender=RecipeCategory)
+def refresh_autocomplete_on_category_change(sender, instance, raw=False, **kwargs):
+    """Reload category suggestions once the transaction commits."""
+    if raw:
+        return
+    transaction.on_commit(_refresh_autocomplete_categories)
+
+
+def _refresh_autocomplete_categories():
+    try:
+        refresh_autocomplete_categories()
+    except Exception as e:
+        logger.error(f"Error refreshing autocomplete categories: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Instruction)
+def queue_image_derivatives_on_save(sender, instance, raw=False, **kwargs):
+    """Generate image variants once a new or replaced image is committed."""
+    if raw:
+        return
+    if instance.image:
+        stale = not manifest_is_current(instance.image_manifest, instance.image)
+    else:
+        stale = bool(instance.image_manifest)
+    if stale:
+        transaction.on_commit(partial(queue_image_processing, instance))
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Instruction)
+def delete_image_derivatives_on_delete(sender, instance, **kwargs):
+    """Remove generated image variants with their object."""
+    if instance.image_manifest:
+        transaction.on_commit(partial(delete_derivatives, instance.image_manifest))
+
+
+@receiver(post_save, sender=IngredientCategory)
+@receiver(post_delete, sender=IngredientCategory)
+def invalidate_categorizer_on_category_change(sender, instance, raw=False, **kwargs):
+    """Recompile ingredient category keywords once the transaction commits."""
+    if raw:
+        return
+    transaction.on_commit(invalidate_categorizer)
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_similarity_on_recipe_change(sender, instance, created, raw=False,
+                                        update_fields=None, **kwargs):
+    """Refresh neighbours when a recipe is added or its dietary flags or visibility change."""
+    if raw:
+        return
+    if update_fields is not None and not {'dietary_info', 'is_public'} & set(update_fields):
+        return
+    try:
+        queue_similarity_refresh([instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing similarity refresh for recipe {instance.pk}: {str(e)}")
+
+
+@receiver(m2m_changed, sender=Recipe.categories.through)
+@receiver(m2m_changed, sender=Recipe.meal_types.through)
+def refresh_similarity_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Refresh neighbours when a recipe's categories or meal types change."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    try:
+        queue_similarity_refresh((pk_set or ()) if reverse else [instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing similarity refresh after {action}: {str(e)}")
+
+
+@receiver(pre_delete, sender=Recipe)
+def refresh_similarity_on_recipe_delete(sender, instance, **kwargs):
+    """Refill the neighbour lists that will lose a deleted recipe."""
+    try:
+        queue_similarity_refresh(
+            SimilarRecipe.objects.filter(similar=instance).values_list('recipe_id', flat=True)
+        )
+    except Exception as e:
+        logger.error(f"Error queueing similarity refresh for deleted recipe {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+def recompute_nutrition_on_servings_change(sender, instance, created, raw=False,
+                                           update_fields=None, **kwargs):
+    """Recompute per-serving values when a recipe's servings may have changed."""
+    if raw or created:
+        return
+    if update_fields is not None and 'servings' not in update_fields:
+        return
+    try:
+        queue_nutrition_recompute([instance.pk])
+    except Exception as e:
+        logger.error(f"Error queueing nutrition recompute for recipe {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def refresh_recipe_on_ingredient_change(sender, instance, raw=False, **kwargs):
+    """Refresh a recipe's nutrition, search document, neighbours and suggestions when an ingredient changes."""
+    if raw:
+        return
+    try:
+        queue_nutrition_recompute([instance.recipe_id])
+        queue_search_update([instance.recipe_id])
+        queue_similarity_refresh([instance.recipe_id])
+        queue_autocomplete_refresh([instance.recipe_id])
+    except Exception as e:
+        logger.error(f"Error queueing refresh for ingredient {instance.pk}: {str(e)}")
+
+
+@receiver(matches_updated)
+def recompute_nutrition_on_match_change(sender, ingredient_ids=None, **kwargs):
+    """Recompute nutrition for recipes whose ingredient matches changed."""
+    if not ingredient_ids:
+        return
+    try:
+        queue_nutrition_recompute(
+            Ingredient.objects.filter(
+                pk__in=ingredient_ids
+            ).values_list('recipe_id', flat=True).distinct()
+        )
+    except Exception as e:
+        logger.error(f"Error queueing nutrition recompute after matching: {str(e)}")
+
+
+@receiver(post_save, sender=NutritionInfo)
+@receiver(post_delete, sender=NutritionInfo)
+def recompute_nutrition_on_product_change(sender, instance, raw=False, **kwargs):
+    """Recompute nutrition for recipes using a product whose nutrition changed."""
+    if raw:
+        return
+    try:
+        queue_nutrition_recompute(
+            Ingredient.objects.filter(
+                product_match__product_id=instance.product_id
+            ).values_list('recipe_id', flat=True).distinct()
+        )
+    except Exception as e:
+        logger.error(f"Error queueing nutrition recompute for product {instance.product_id}: {str(e)}")
+
+
+def _previous_value(instance, field):
+    """Return the value ``field`` had when the instance was loaded, if known."""
+    loaded = getattr(instance, '_loaded_values', None)
+    if loaded is None or field not in loaded:
+        return None
+    return loaded[field]
+
+
+def _remember_values(instance, *fields):
+    """Record saved values so a second save of the same instance diffs correctly."""
+    if not hasattr(instance, '_loaded_values'):
+        instance._loaded_values = {}
+    for field in fields:
+        instance._loaded_values[field] = getattr(instance, field)
+
+
+@receiver(post_save, sender=RecipeRating)
+def update_counters_on_rating_save(sender, instance, created, raw=False, **kwargs):
+    """Fold a new or changed rating into the recipe's stored totals."""
+    if raw:
+        return
+    try:
+        if created:
+            adjust_rating_totals(instance.recipe_id, 1, instance.rating)
+        else:
+            previous = _previous_value(instance, 'rating')
+            if previous is None:
+                refresh_recipe_counters([instance.recipe_id])
+            elif previous != instance.rating:
+                adjust_rating_totals(instance.recipe_id, 0, instance.rating - previous)
+        _remember_values(instance, 'rating')
+    except Exception as e:
+        logger.error(f"Error updating rating counters for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_delete, sender=RecipeRating)
+def update_counters_on_rating_delete(sender, instance, **kwargs):
+    """Remove a deleted rating from the recipe's stored totals."""
+    try:
+        adjust_rating_totals(instance.recipe_id, -1, -instance.rating)
+    except Exception as e:
+        logger.error(f"Error updating rating counters for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_save, sender=RecipeFavorite)
+def update_counters_on_favorite_save(sender, instance, created, raw=False, **kwargs):
+    """Count a new favorite."""
+    if raw or not created:
+        return
+    try:
+        adjust_counter(instance.recipe_id, 'favorite_count', 1)
+    except Exception as e:
+        logger.error(f"Error updating favorite count for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_delete, sender=RecipeFavorite)
+def update_counters_on_favorite_delete(sender, instance, **kwargs):
+    """Uncount a removed favorite."""
+    try:
+        adjust_counter(instance.recipe_id, 'favorite_count', -1)
+    except Exception as e:
+        logger.error(f"Error updating favorite count for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_save, sender=RecipeComment)
+def update_counters_on_comment_save(sender, instance, created, raw=False, **kwargs):
+    """Count approved comments, including approval changes."""
+    if raw:
+        return
+    try:
+        if created:
+            if instance.is_approved:
+                adjust_counter(instance.recipe_id, 'comment_count', 1)
+        else:
+            previous = _previous_value(instance, 'is_approved')
+            if previous is None:
+                refresh_recipe_counters([instance.recipe_id])
+            elif previous != instance.is_approved:
+                adjust_counter(
+                    instance.recipe_id, 'comment_count', 1 if instance.is_approved else -1
+                )
+        _remember_values(instance, 'is_approved')
+    except Exception as e:
+        logger.error(f"Error updating comment count for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_delete, sender=RecipeComment)
+def update_counters_on_comment_delete(sender, instance, **kwargs):
+    """Uncount a deleted approved comment."""
+    if not instance.is_approved:
+        return
+    try:
+        adjust_counter(instance.recipe_id, 'comment_count', -1)
+    except Exception as e:
+        logger.error(f"Error updating comment count for recipe {instance.recipe_id}: {str(e)}")
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_stats_on_recipe_change(sender, instance, raw=False, **kwargs):
+    """Drop the author's cached statistics when one of their recipes changes."""
+    if raw:
+        return
+    transaction.on_commit(partial(invalidate_author_stats, instance.author_id))
+
+
+@receiver(post_save, sender=RecipeRating)
+@receiver(post_delete, sender=RecipeRating)
+@receiver(post_save, sender=RecipeFavorite)
+@receiver(post_delete, sender=RecipeFavorite)
+@receiver(post_save, sender=RecipeComment)
+@receiver(post_delete, sender=RecipeComment)
+def invalidate_stats_on_engagement_change(sender, instance, raw=False, **kwargs):
+    """Drop the recipe author's cached statistics after a rating, favorite or comment write."""
+    if raw:
+        return
+    try:
+        transaction.on_commit(partial(invalidate_author_stats, instance.recipe.author_id))
+    except Recipe.DoesNotExist:
+        pass
+    except Exception as e:
+        logger.error(f"Error invalidating stats for recipe {instance.recipe_id}: {str(e)}")
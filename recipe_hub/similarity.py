@@ -0,0 +1,353 @@
+"""
+Precomputed similar-recipe index.
+
+Each recipe is described by a sparse feature vector of its categories,
+meal types, normalized ingredient names and dietary flags, weighted by
+inverse document frequency and L2-normalized. Cosine similarity against
+every other recipe is computed in batch with NumPy from an inverted
+index, and the top-k public neighbours are stored in ``SimilarRecipe``
+so the detail page reads them with one indexed lookup.
+
+Single recipes are refreshed incrementally: the changed recipe's scores
+also tell us which other recipes would now rank it (or no longer rank
+it) in their top-k, and only those lists are rewritten. Building the
+index reads the whole catalogue, so saves only record the changed
+recipes in ``PendingSimilarityRefresh`` and a periodic task refreshes
+everything queued in one batch.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from asda_scraper.matching import normalize_name
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 8
+MIN_SCORE = 0.05
+
+# Relative weight of each feature group before IDF weighting
+FEATURE_WEIGHTS = {
+    'category': 1.0,
+    'meal_type': 0.5,
+    'ingredient': 1.0,
+    'dietary': 0.5,
+}
+
+# Ingredients used by more than this share of recipes (salt, oil, ...)
+# say nothing about similarity and would dominate the candidate sets
+MAX_INGREDIENT_DF = 0.4
+
+# Incremental refreshes touching more than this share of recipes rebuild
+FULL_REBUILD_RATIO = 0.2
+
+
+class SimilarityIndex:
+    """
+    L2-normalized recipe feature vectors in row and column (postings) form.
+
+    Attributes:
+        recipe_ids: Recipe primary keys, one per row
+        public: Boolean mask of rows that may be recommended
+    """
+
+    def __init__(
+        self,
+        recipe_ids: List[int],
+        public: List[bool],
+        pairs: Dict[Tuple[int, str], float]
+    ) -> None:
+        """
+        Build the index.
+
+        Args:
+            recipe_ids: Recipe primary keys
+            public: Visibility per recipe
+            pairs: (row, feature key) -> group weight
+        """
+        self.recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.public = np.asarray(public, dtype=bool)
+        self.row_of = {pk: row for row, pk in enumerate(recipe_ids)}
+        n_recipes = len(recipe_ids)
+
+        features: Dict[str, int] = {}
+        rows, cols, weights = [], [], []
+        for (row, key), weight in pairs.items():
+            rows.append(row)
+            cols.append(features.setdefault(key, len(features)))
+            weights.append(weight)
+
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        data = np.asarray(weights, dtype=np.float64)
+        n_features = len(features)
+
+        # Drop near-universal ingredients, then weight by IDF
+        df = np.bincount(cols, minlength=n_features)
+        keep = np.ones(len(cols), dtype=bool)
+        if n_recipes >= 20:
+            common = np.array(
+                [key.startswith('i:') for key in features], dtype=bool
+            ) & (df > MAX_INGREDIENT_DF * n_recipes)
+            keep = ~common[cols]
+        rows, cols, data = rows[keep], cols[keep], data[keep]
+        idf = np.log((1 + n_recipes) / (1 + df)) + 1.0
+        data = data * idf[cols]
+
+        norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=n_recipes))
+        norms[norms == 0] = 1.0
+        data = data / norms[rows]
+
+        # Row-major view: the features of each recipe
+        order = np.argsort(rows, kind='stable')
+        self._row_cols = cols[order]
+        self._row_data = data[order]
+        self._row_ptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=n_recipes))))
+
+        # Column-major view: the recipes having each feature
+        order = np.argsort(cols, kind='stable')
+        self._col_rows = rows[order]
+        self._col_data = data[order]
+        self._col_ptr = np.concatenate(([0], np.cumsum(np.bincount(cols, minlength=n_features))))
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def scores(self, row: int) -> np.ndarray:
+        """
+        Cosine similarity of one recipe to every recipe.
+
+        Args:
+            row: Row of the recipe
+
+        Returns:
+            np.ndarray: Score per row (the recipe itself scores 0)
+        """
+        start, end = self._row_ptr[row], self._row_ptr[row + 1]
+        cols = self._row_cols[start:end]
+        if not len(cols):
+            return np.zeros(len(self), dtype=np.float64)
+
+        starts, ends = self._col_ptr[cols], self._col_ptr[cols + 1]
+        postings = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+        weights = np.repeat(self._row_data[start:end], ends - starts) * self._col_data[postings]
+
+        scores = np.bincount(self._col_rows[postings], weights=weights, minlength=len(self))
+        scores[row] = 0.0
+        return scores
+
+    def neighbours(self, row: int, k: int = TOP_K,
+                   scores: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k public recipes most similar to a recipe.
+
+        Args:
+            row: Row of the recipe
+            k: Number of neighbours
+            scores: Precomputed ``scores(row)``
+
+        Returns:
+            list: (recipe id, score) pairs, best first
+        """
+        if scores is None:
+            scores = self.scores(row)
+        candidates = np.flatnonzero(self.public & (scores >= MIN_SCORE))
+        if len(candidates) > k:
+            best = np.argpartition(-scores[candidates], k - 1)[:k]
+            candidates = candidates[best]
+        candidates = candidates[np.lexsort((self.recipe_ids[candidates], -scores[candidates]))]
+        return [(int(self.recipe_ids[c]), float(scores[c])) for c in candidates]
+
+
+def build_similarity_index() -> SimilarityIndex:
+    """
+    Load recipe features from the database and build the index.
+
+    Uses one query per feature source, regardless of the number of recipes.
+
+    Returns:
+        SimilarityIndex: Index over every recipe
+    """
+    from .models import Ingredient, Recipe
+
+    recipe_ids, public = [], []
+    pairs: Dict[Tuple[int, str], float] = {}
+
+    for pk, is_public, dietary_info in Recipe.objects.order_by('pk').values_list(
+        'pk', 'is_public', 'dietary_info'
+    ):
+        row = len(recipe_ids)
+        recipe_ids.append(pk)
+        public.append(is_public)
+        for flag, value in (dietary_info or {}).items():
+            if value is True:
+                pairs[(row, f'd:{flag}')] = FEATURE_WEIGHTS['dietary']
+
+    row_of = {pk: row for row, pk in enumerate(recipe_ids)}
+
+    sources = [
+        (Recipe.categories.through.objects.values_list('recipe_id', 'recipecategory_id'),
+         'c', FEATURE_WEIGHTS['category']),
+        (Recipe.meal_types.through.objects.values_list('recipe_id', 'mealtype_id'),
+         'm', FEATURE_WEIGHTS['meal_type']),
+    ]
+    for rows, prefix, weight in sources:
+        for recipe_id, value in rows.iterator():
+            if recipe_id in row_of:
+                pairs[(row_of[recipe_id], f'{prefix}:{value}')] = weight
+
+    for recipe_id, name in Ingredient.objects.values_list('recipe_id', 'name').iterator():
+        normalized = normalize_name(name)
+        if normalized and recipe_id in row_of:
+            pairs[(row_of[recipe_id], f'i:{normalized}')] = FEATURE_WEIGHTS['ingredient']
+
+    return SimilarityIndex(recipe_ids, public, pairs)
+
+
+def _write_neighbours(neighbours: Dict[int, List[Tuple[int, float]]],
+                      replace_all: bool = False) -> int:
+    """Replace stored neighbour lists for the given recipes (or all recipes)."""
+    from .models import SimilarRecipe
+
+    links = [
+        SimilarRecipe(recipe_id=recipe_id, similar_id=similar_id, score=score, rank=rank)
+        for recipe_id, items in neighbours.items()
+        for rank, (similar_id, score) in enumerate(items)
+    ]
+    stale = SimilarRecipe.objects.all()
+    if not replace_all:
+        stale = stale.filter(recipe_id__in=list(neighbours))
+    with transaction.atomic():
+        stale.delete()
+        SimilarRecipe.objects.bulk_create(links, batch_size=1000)
+    return len(links)
+
+
+def rebuild_similar_recipes(k: int = TOP_K) -> int:
+    """
+    Recompute the neighbour list of every recipe.
+
+    Args:
+        k: Neighbours per recipe
+
+    Returns:
+        int: Number of recipes indexed
+    """
+    index = build_similarity_index()
+    neighbours = {
+        int(index.recipe_ids[row]): index.neighbours(row, k)
+        for row in range(len(index))
+    }
+    written = _write_neighbours(neighbours, replace_all=True)
+    logger.info(f"Rebuilt similar recipes: {len(index)} recipes, {written} links")
+    return len(index)
+
+
+def refresh_similar_recipes(recipe_ids: Iterable[int], k: int = TOP_K) -> int:
+    """
+    Incrementally refresh neighbour lists after some recipes changed.
+
+    Rewrites the changed recipes' own lists plus the lists of recipes that
+    currently link to them or would now rank them in their top-k.
+
+    Args:
+        recipe_ids: Recipes whose features, visibility or existence changed
+        k: Neighbours per recipe
+
+    Returns:
+        int: Number of neighbour lists rewritten
+    """
+    from .models import SimilarRecipe
+
+    changed: Set[int] = set(recipe_ids)
+    if not changed:
+        return 0
+
+    index = build_similarity_index()
+    if len(changed) > FULL_REBUILD_RATIO * max(len(index), 1):
+        return rebuild_similar_recipes(k)
+
+    # Lowest stored score per recipe; lists shorter than k accept anything
+    threshold = np.zeros(len(index), dtype=np.float64)
+    for recipe_id, lowest, count in SimilarRecipe.objects.values('recipe_id').annotate(
+        lowest=Min('score'), count=Count('pk')
+    ).values_list('recipe_id', 'lowest', 'count'):
+        row = index.row_of.get(recipe_id)
+        if row is not None and count >= k:
+            threshold[row] = lowest
+
+    affected: Set[int] = set(
+        SimilarRecipe.objects.filter(similar_id__in=changed).values_list('recipe_id', flat=True)
+    )
+    neighbours: Dict[int, List[Tuple[int, float]]] = {}
+    for recipe_id in changed:
+        row = index.row_of.get(recipe_id)
+        if row is None:
+            continue
+        scores = index.scores(row)
+        neighbours[recipe_id] = index.neighbours(row, k, scores)
+        if index.public[row]:
+            gains = np.flatnonzero((scores >= MIN_SCORE) & (scores > threshold))
+            affected.update(int(pk) for pk in index.recipe_ids[gains])
+
+    for recipe_id in affected - set(neighbours):
+        row = index.row_of.get(recipe_id)
+        if row is not None:
+            neighbours[recipe_id] = index.neighbours(row, k)
+
+    _write_neighbours(neighbours)
+    logger.info(
+        f"Refreshed similar recipes for {len(changed)} changed recipes "
+        f"({len(neighbours)} lists rewritten)"
+    )
+    return len(neighbours)
+
+
+def mark_similarity_stale(recipe_ids: Iterable[int]) -> None:
+    """
+    Queue recipes for the next batch refresh.
+
+    Re-queuing a recipe moves its ``queued_at`` forward, so a batch that
+    read the older timestamp leaves it queued.
+
+    Args:
+        recipe_ids: Recipes whose features, visibility or existence changed
+    """
+    from .models import PendingSimilarityRefresh
+
+    now = timezone.now()
+    PendingSimilarityRefresh.objects.bulk_create(
+        [PendingSimilarityRefresh(recipe_id=pk, queued_at=now) for pk in set(recipe_ids)],
+        update_conflicts=True,
+        unique_fields=['recipe_id'],
+        update_fields=['queued_at'],
+    )
+
+
+def refresh_pending_similar_recipes(k: int = TOP_K) -> int:
+    """
+    Refresh the neighbour lists of every queued recipe in one batch.
+
+    Args:
+        k: Neighbours per recipe
+
+    Returns:
+        int: Number of neighbour lists rewritten
+    """
+    from .models import PendingSimilarityRefresh
+
+    pending = PendingSimilarityRefresh.objects.aggregate(latest=Max('queued_at'))['latest']
+    if pending is None:
+        return 0
+    queued = PendingSimilarityRefresh.objects.filter(queued_at__lte=pending)
+    recipe_ids = list(queued.values_list('recipe_id', flat=True))
+
+    refreshed = refresh_similar_recipes(recipe_ids, k)
+    # Recipes changed again while this batch ran have a later queued_at
+    queued.filter(recipe_id__in=recipe_ids).delete()
+    return refreshed
@@ -0,0 +1,125 @@
+"""
+Author recipe statistics.
+
+Totals come from one grouped aggregate over the author's recipes, using
+the stored engagement counters, plus monthly rating and favorite trends.
+Results are cached per author and dropped when a rating, favorite,
+comment or recipe of that author changes.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Avg, Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY = 'recipe_stats:author:{author_id}'
+STATS_CACHE_TIMEOUT = 60 * 15
+TREND_MONTHS = 12
+
+
+def _cache_key(author_id: int) -> str:
+    return STATS_CACHE_KEY.format(author_id=author_id)
+
+
+def compute_author_stats(author_id: int) -> Dict:
+    """
+    Compute statistics for an author's recipes.
+
+    Runs a constant number of queries regardless of recipe count: one
+    aggregate, one per-recipe breakdown, two trend queries and one for
+    categories.
+
+    Args:
+        author_id: Author user ID
+
+    Returns:
+        dict: Totals, per-recipe breakdown, monthly trends and categories
+    """
+    from .models import Recipe, RecipeCategory, RecipeFavorite, RecipeRating
+
+    recipes = Recipe.objects.filter(author_id=author_id)
+    totals = recipes.aggregate(
+        total_recipes=Count('pk'),
+        public_recipes=Count('pk', filter=Q(is_public=True)),
+        total_ratings=Sum('rating_count', default=0),
+        rating_sum=Sum('rating_total', default=0),
+        total_favorites=Sum('favorite_count', default=0),
+        total_comments=Sum('comment_count', default=0),
+    )
+    rating_sum = totals.pop('rating_sum')
+    totals['private_recipes'] = totals['total_recipes'] - totals['public_recipes']
+    totals['average_rating'] = (
+        round(rating_sum / totals['total_ratings'], 2) if totals['total_ratings'] else 0
+    )
+
+    breakdown = [
+        {**row, 'avg_rating': round(row['avg_rating'], 2)}
+        for row in recipes.order_by('-favorite_count', '-rating_count', 'title').values(
+            'id', 'title', 'slug', 'is_public', 'rating_count', 'avg_rating',
+            'favorite_count', 'comment_count'
+        )
+    ]
+
+    since = (timezone.now() - timedelta(days=31 * TREND_MONTHS)).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    trends: Dict[str, Dict] = {}
+    for row in RecipeRating.objects.filter(
+        recipe__author_id=author_id, created_at__gte=since
+    ).annotate(month=TruncMonth('created_at')).values('month').annotate(
+        count=Count('pk'), average=Avg('rating')
+    ).order_by('month'):
+        trends.setdefault(row['month'].strftime('%Y-%m'), {}).update(
+            ratings=row['count'], average_rating=round(row['average'], 2)
+        )
+    for row in RecipeFavorite.objects.filter(
+        recipe__author_id=author_id, created_at__gte=since
+    ).annotate(month=TruncMonth('created_at')).values('month').annotate(
+        count=Count('pk')
+    ).order_by('month'):
+        trends.setdefault(row['month'].strftime('%Y-%m'), {}).update(favorites=row['count'])
+
+    return {
+        **totals,
+        'recipes': breakdown,
+        'trends': [
+            {'month': month, 'ratings': 0, 'average_rating': None, 'favorites': 0, **values}
+            for month, values in sorted(trends.items())
+        ],
+        'categories': list(
+            RecipeCategory.objects.filter(
+                recipes__author_id=author_id
+            ).distinct().values('id', 'name', 'slug')
+        ),
+        'generated_at': timezone.now().isoformat(),
+    }
+
+
+def get_author_stats(author_id: int) -> Dict:
+    """
+    Return cached statistics for an author, computing them on a miss.
+
+    Args:
+        author_id: Author user ID
+
+    Returns:
+        dict: See ``compute_author_stats``
+    """
+    key = _cache_key(author_id)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_author_stats(author_id)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
+
+
+def invalidate_author_stats(author_id: Optional[int]) -> None:
+    """Drop cached statistics for an author."""
+    if author_id:
+        cache.delete(_cache_key(author_id))
@@ -0,0 +1,138 @@
+"""
+Celery tasks for recipe hub.
+
+Keeps denormalized recipe data current off the request path.
+"""
+
+import logging
+from typing import List, Optional
+
+from celery import shared_task
+
+from .autocomplete import rebuild_autocomplete_index
+from .images import BACKFILL_BATCH_SIZE, IMAGE_LABELS, generate_missing_derivatives, process_image
+from .nutrition import recompute_recipe_nutrition
+from .similarity import (
+    rebuild_similar_recipes, refresh_pending_similar_recipes, refresh_similar_recipes
+)
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def recompute_recipe_nutrition_task(recipe_ids: Optional[List[int]] = None) -> dict:
+    """
+    Recompute per-serving nutrition for recipes.
+
+    Args:
+        recipe_ids: Recipes to refresh; all recipes if omitted
+
+    Returns:
+        Dictionary with the number of recipes updated
+    """
+    try:
+        return {'updated': recompute_recipe_nutrition(recipe_ids)}
+    except Exception as e:
+        logger.error(f"Error in recompute_recipe_nutrition_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def refresh_similar_recipes_task(recipe_ids: Optional[List[int]] = None) -> dict:
+    """
+    Refresh precomputed similar-recipe lists.
+
+    Args:
+        recipe_ids: Recipes that changed; rebuilds every list if omitted
+
+    Returns:
+        Dictionary with the number of neighbour lists written
+    """
+    try:
+        if recipe_ids is None:
+            return {'rebuilt': rebuild_similar_recipes()}
+        return {'refreshed': refresh_similar_recipes(recipe_ids)}
+    except Exception as e:
+        logger.error(f"Error in refresh_similar_recipes_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def refresh_pending_similar_recipes_task() -> dict:
+    """
+    Refresh the similar-recipe lists of recipes changed since the last run.
+
+    Scheduled every 5 minutes by CELERY_BEAT_SCHEDULE.
+
+    Returns:
+        Dictionary with the number of neighbour lists written
+    """
+    try:
+        return {'refreshed': refresh_pending_similar_recipes()}
+    except Exception as e:
+        logger.error(f"Error in refresh_pending_similar_recipes_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def rebuild_autocomplete_index_task() -> dict:
+    """
+    Rebuild the recipe autocomplete index and reset its delta.
+
+    Scheduled hourly by CELERY_BEAT_SCHEDULE.
+
+    Returns:
+        Dictionary with the number of recipes indexed
+    """
+    try:
+        return {'recipes': len(rebuild_autocomplete_index().recipes)}
+    except Exception as e:
+        logger.error(f"Error in rebuild_autocomplete_index_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def generate_image_derivatives_task(label: str, pk: int, force: bool = False) -> dict:
+    """
+    Generate resized and WebP versions of a recipe or step image.
+
+    Args:
+        label: 'recipe' or 'instruction'
+        pk: Object primary key
+        force: Regenerate even when the stored manifest is current
+
+    Returns:
+        Dictionary telling whether a new manifest was written
+    """
+    try:
+        return {'generated': process_image(label, pk, force=force)}
+    except Exception as e:
+        logger.error(f"Error in generate_image_derivatives_task for {label} {pk}: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
+
+
+@shared_task
+def generate_missing_image_derivatives_task(limit: int = BACKFILL_BATCH_SIZE) -> dict:
+    """
+    Generate variants for images saved without them.
+
+    Scheduled every 5 minutes by CELERY_BEAT_SCHEDULE. Picks up images
+    whose save-time task was lost and anything uploaded before derivatives
+    existed, a batch at a time.
+
+    Args:
+        limit: Maximum images processed per model
+
+    Returns:
+        Dictionary with counts per model
+    """
+    try:
+        results = {}
+        for label in IMAGE_LABELS:
+            stats = generate_missing_derivatives(label, limit)
+            stats.pop('errors')
+            results[label] = stats
+        return results
+    except Exception as e:
+        logger.error(f"Error in generate_missing_image_derivatives_task: {str(e)}", exc_info=True)
+        return {'status': 'error', 'reason': str(e)}
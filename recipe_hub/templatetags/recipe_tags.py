@@ -6,8 +6,15 @@ Provides utility tags for recipe display and interaction.
 
 import logging
 from django import template
-from django.db.models import Avg, Count, Q
+from django.core.files.storage import default_storage
+from django.db.models import Count, Q
+from django.utils.html import format_html
+from recipe_hub.images import (
+    CARD_WIDTH, image_srcset, image_variant_url, manifest_is_current, select_variant
+)
+from recipe_hub.fragments import FRAGMENT_TIMEOUT, fragment_version
 from recipe_hub.models import Recipe, RecipeCategory, RecipeFavorite
+from recipe_hub.overlay import RecipeUserOverlay, get_recipe_overlay
 
 logger = logging.getLogger(__name__)
 register = template.Library()
@@ -24,6 +31,10 @@ def is_favorited_by(recipe, user):
         return False
     
     try:
+        # Use the batch-loaded overlay when the view provided one
+        overlay = getattr(recipe, '_user_overlay', None)
+        if overlay is not None and overlay.user_id == user.pk and overlay.covers(recipe):
+            return overlay.is_favorited(recipe)
         return RecipeFavorite.objects.filter(recipe=recipe, user=user).exists()
     except Exception as e:
         logger.error(f"Error checking favorite status: {str(e)}")
@@ -128,25 +139,38 @@ def recipe_limit_percentage(user):
         return 0
 
 
-@register.inclusion_tag('recipe_hub/includes/recipe_card.html')
-def recipe_card(recipe, user=None):
+@register.inclusion_tag('recipe_hub/includes/recipe_card.html', takes_context=True)
+def recipe_card(context, recipe, user=None):
     """
     Render a recipe card component.
     
+    The shared part of the card is cached per recipe fragment version;
+    favorite/rating state comes from the request's recipe overlay, which
+    list views load for the whole page in one query.
+    
     Usage: {% recipe_card recipe user=request.user %}
     """
-    context = {
+    card_context = {
         'recipe': recipe,
         'user': user,
-        'is_favorited': False
+        'is_favorited': False,
+        'user_rating': None,
+        'fragment_version': fragment_version(context.get('request'), recipe),
+        'fragment_timeout': FRAGMENT_TIMEOUT,
     }
     
     if user and user.is_authenticated:
-        context['is_favorited'] = RecipeFavorite.objects.filter(
-            recipe=recipe, user=user
-        ).exists()
+        overlay = context.get('recipe_overlay')
+        if overlay is None or overlay.user_id != user.pk:
+            request = context.get('request')
+            overlay = (
+                get_recipe_overlay(request) if request is not None
+                else RecipeUserOverlay(user)
+            )
+        card_context['is_favorited'] = overlay.is_favorited(recipe)
+        card_context['user_rating'] = overlay.user_rating(recipe)
     
-    return context
+    return card_context
 
 
 @register.inclusion_tag('recipe_hub/includes/category_badge.html')
@@ -215,13 +239,9 @@ def top_rated_recipes(limit=5):
     """
     try:
         return Recipe.objects.filter(
-            is_public=True
-        ).annotate(
-            avg_rating=Avg('ratings__rating'),
-            rating_count=Count('ratings')
-        ).filter(
+            is_public=True,
             rating_count__gte=2  # At least 2 ratings
-        ).order_by('-avg_rating')[:limit]
+        ).order_by('-avg_rating', '-rating_count')[:limit]
     except Exception as e:
         logger.error(f"Error getting top rated recipes: {str(e)}")
         return Recipe.objects.none()
@@ -262,4 +282,50 @@ def query_string(context, **kwargs):
         else:
             params[key] = value
     
-    return params.urlencode()
\ No newline at end of file
+    return params.urlencode()
+
+
+@register.simple_tag
+def image_url(obj, width=CARD_WIDTH):
+    """
+    URL of the smallest generated image variant fitting a display width.
+    
+    Usage: {% image_url recipe 160 %}
+    """
+    return image_variant_url(obj, int(width)) or ''
+
+
+@register.simple_tag
+def responsive_image(obj, width=CARD_WIDTH, css_class='', alt='', style='', sizes=None,
+                     loading='lazy'):
+    """
+    Render a recipe or step image as a <picture> with WebP and fallback variants.
+    
+    Serves the original upload until the variants have been generated.
+    
+    Usage: {% responsive_image recipe 400 css_class="card-img-top" alt=recipe.title %}
+    """
+    image = getattr(obj, 'image', None)
+    if not image:
+        return ''
+    
+    width = int(width)
+    manifest = getattr(obj, 'image_manifest', None)
+    if not manifest_is_current(manifest, image):
+        return format_html(
+            '<img src="{}" class="{}" alt="{}" style="{}" loading="{}" decoding="async">',
+            image_variant_url(obj, width), css_class, alt, style, loading
+        )
+    
+    variant = select_variant(manifest, width)
+    sizes = sizes or f"{width}px"
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" class="{}" alt="{}" '
+        'style="{}" loading="{}" decoding="async">'
+        '</picture>',
+        image_srcset(obj, 'webp'), sizes,
+        default_storage.url(variant['fallback']), image_srcset(obj, 'fallback'), sizes,
+        variant['width'], variant['height'], css_class, alt, style, loading
+    )
@@ -1,3 +1,554 @@
-from django.test import TestCase
+"""
+Tests for recipe_hub services.
+"""
 
-# Create your tests here.
+import csv
+import datetime
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .autocomplete import (
+    AutocompleteIndex, PatchedAutocompleteIndex, get_autocomplete_index,
+    rebuild_autocomplete_index, refresh_autocomplete_recipes
+)
+from .categorizer import IngredientCategorizer
+from .comments import MAX_DEPTH, comment_threads, path_segment
+from .dietary import DIETARY_BITS, dietary_labels, dietary_mask, filter_by_diets, matching_masks
+from . import signals
+from .forms import RecipeCSVImportForm
+from .fragments import get_fragment_versions
+from .images import generate_missing_derivatives, pending_images
+from .importing import RecipeBulkImporter, parse_quantity
+from .models import (
+    Ingredient, PendingSimilarityRefresh, Recipe, RecipeCategory, RecipeComment, SimilarRecipe
+)
+from .pagination import (
+    DEFAULT_SORT_KEYS, decode_cursor, encode_cursor, order_by_keys, paginate_keyset
+)
+from .similarity import (
+    SimilarityIndex, mark_similarity_stale, refresh_pending_similar_recipes
+)
+
+
+def make_user(username='cook'):
+    """Staff user, so recipe limits do not apply."""
+    return User.objects.create_user(username=username, password='x', is_staff=True)
+
+
+def make_recipe(author, title, **kwargs):
+    """Create a public recipe with the required fields filled in."""
+    defaults = {
+        'description': title,
+        'prep_time': 10,
+        'cook_time': 20,
+        'is_public': True,
+    }
+    defaults.update(kwargs)
+    return Recipe.objects.create(author=author, title=title, **defaults)
+
+
+class CursorEncodingTests(SimpleTestCase):
+    """Cursor payloads survive a round trip unchanged."""
+
+    def test_datetime_keeps_microseconds(self):
+        value = datetime.datetime(2026, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc)
+        payload = decode_cursor(encode_cursor({'v': [value, 7], 'd': 'next'}))
+        self.assertEqual(datetime.datetime.fromisoformat(payload['v'][0]), value)
+        self.assertEqual(payload['v'][1], 7)
+
+    def test_garbage_is_ignored(self):
+        with self.assertRaises(ValueError):
+            decode_cursor('not a cursor!')
+
+
+class KeysetPaginationTests(TestCase):
+    """Paging by (created_at, id) never skips or repeats rows."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = make_user()
+        base = timezone.now().replace(microsecond=500000)
+        for i in range(5):
+            recipe = make_recipe(author, f'Recipe {i}')
+            # Same millisecond, distinct microseconds
+            Recipe.objects.filter(pk=recipe.pk).update(
+                created_at=base + datetime.timedelta(microseconds=i * 100)
+            )
+
+    def _queryset(self):
+        return Recipe.objects.order_by(*order_by_keys(DEFAULT_SORT_KEYS))
+
+    def test_pages_across_rows_sharing_a_millisecond(self):
+        expected = list(self._queryset().values_list('pk', flat=True))
+        seen, cursor = [], None
+        while True:
+            page = paginate_keyset(self._queryset(), DEFAULT_SORT_KEYS, cursor, 2)
+            seen.extend(recipe.pk for recipe in page)
+            if not page.has_next():
+                break
+            cursor = page.next_cursor
+        self.assertEqual(seen, expected)
+
+    def test_previous_cursor_returns_the_earlier_page(self):
+        first = paginate_keyset(self._queryset(), DEFAULT_SORT_KEYS, None, 2)
+        second = paginate_keyset(self._queryset(), DEFAULT_SORT_KEYS, first.next_cursor, 2)
+        back = paginate_keyset(self._queryset(), DEFAULT_SORT_KEYS, second.previous_cursor, 2)
+        self.assertEqual([r.pk for r in back], [r.pk for r in first])
+
+
+class SimilarityIndexTests(SimpleTestCase):
+    """Neighbours are ranked by shared features and limited to public recipes."""
+
+    def setUp(self):
+        pairs = {
+            (0, 'c:1'): 1.0, (0, 'i:tomato'): 1.0, (0, 'i:basil'): 1.0,
+            (1, 'c:1'): 1.0, (1, 'i:tomato'): 1.0, (1, 'i:basil'): 1.0,
+            (2, 'c:1'): 1.0, (2, 'i:tomato'): 1.0,
+            (3, 'c:2'): 1.0, (3, 'i:beef'): 1.0,
+            (4, 'c:1'): 1.0, (4, 'i:tomato'): 1.0, (4, 'i:basil'): 1.0,
+        }
+        self.index = SimilarityIndex([10, 11, 12, 13, 14], [True, True, True, True, False], pairs)
+
+    def test_most_similar_first(self):
+        neighbours = self.index.neighbours(0, k=3)
+        self.assertEqual([pk for pk, _ in neighbours], [11, 12])
+        self.assertGreater(neighbours[0][1], neighbours[1][1])
+
+    def test_private_and_unrelated_recipes_are_excluded(self):
+        ids = [pk for pk, _ in self.index.neighbours(0, k=10)]
+        self.assertNotIn(14, ids)
+        self.assertNotIn(13, ids)
+        self.assertNotIn(10, ids)
+
+
+class PendingSimilarityRefreshTests(TestCase):
+    """Changed recipes are refreshed in one batch, not on save."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = make_user()
+        category = RecipeCategory.objects.create(name='Pasta', slug='pasta')
+        cls.recipes = [make_recipe(author, f'Pasta {i}') for i in range(3)]
+        for recipe in cls.recipes:
+            recipe.categories.add(category)
+
+    def test_batch_refresh_writes_lists_and_empties_queue(self):
+        mark_similarity_stale([recipe.pk for recipe in self.recipes])
+        refreshed = refresh_pending_similar_recipes()
+        self.assertEqual(refreshed, 3)
+        self.assertFalse(PendingSimilarityRefresh.objects.exists())
+        self.assertEqual(
+            SimilarRecipe.objects.filter(recipe=self.recipes[0]).count(), 2
+        )
+
+    def test_requeue_moves_timestamp_forward(self):
+        recipe_id = self.recipes[0].pk
+        mark_similarity_stale([recipe_id])
+        first = PendingSimilarityRefresh.objects.get(pk=recipe_id).queued_at
+        mark_similarity_stale([recipe_id])
+        self.assertGreater(PendingSimilarityRefresh.objects.get(pk=recipe_id).queued_at, first)
+
+    def test_empty_queue_does_nothing(self):
+        self.assertEqual(refresh_pending_similar_recipes(), 0)
+
+
+class AutocompleteIndexTests(SimpleTestCase):
+    """Prefix search over a base index, with and without a delta."""
+
+    def setUp(self):
+        self.base = AutocompleteIndex(
+            {
+                1: ('Tomato Soup', 'tomato-soup', 5),
+                2: ('Tomato Pasta', 'tomato-pasta', 9),
+                3: ('Beef Stew', 'beef-stew', 1),
+            },
+            {1: ('basil', 'tomato'), 2: ('pasta', 'tomato'), 3: ('beef',)},
+            {10: ('Soups', 'soups')},
+        )
+
+    def test_recipes_ranked_by_popularity(self):
+        result = self.base.search('tom')
+        self.assertEqual([r['id'] for r in result['recipes']], [2, 1])
+        self.assertEqual(result['ingredients'], [{'name': 'tomato', 'recipe_count': 2}])
+
+    def test_every_word_must_match(self):
+        self.assertEqual([r['id'] for r in self.base.search('tom sou')['recipes']], [1])
+        self.assertEqual(self.base.search('sou')['categories'][0]['slug'], 'soups')
+
+    def test_delta_replaces_hides_and_adds_recipes(self):
+        index = PatchedAutocompleteIndex(self.base, {
+            'recipes': {2: ('Tomato Penne', 'tomato-penne', 9), 4: ('Tomato Salad', 'tomato-salad', 3)},
+            'recipe_ingredients': {2: ('penne', 'tomato'), 4: ('lettuce', 'tomato')},
+            'touched': {1: 1, 2: 1, 4: 1},
+            'categories': None,
+            'categories_stamp': 0,
+        })
+        result = index.search('tom')
+        self.assertEqual([r['title'] for r in result['recipes']], ['Tomato Penne', 'Tomato Salad'])
+        self.assertEqual(result['ingredients'], [{'name': 'tomato', 'recipe_count': 2}])
+        self.assertEqual(index.search('pas')['ingredients'], [])
+        self.assertEqual(index.search('bas')['ingredients'], [])
+        self.assertEqual(index.search('sou')['categories'][0]['slug'], 'soups')
+
+    def test_delta_categories_replace_base_categories(self):
+        index = PatchedAutocompleteIndex(self.base, {
+            'recipes': {}, 'recipe_ingredients': {}, 'touched': {},
+            'categories': {11: ('Stews', 'stews')}, 'categories_stamp': 1,
+        })
+        self.assertEqual(index.search('sou')['categories'], [])
+        self.assertEqual(index.search('ste')['categories'][0]['slug'], 'stews')
+
+
+class AutocompleteRefreshTests(TestCase):
+    """Recipe changes reach the published index through the delta."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = make_user()
+        self.recipe = make_recipe(self.author, 'Lentil Curry')
+        rebuild_autocomplete_index()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_refresh_patches_changed_recipe(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(title='Lentil Dahl')
+        refresh_autocomplete_recipes([self.recipe.pk])
+        index = get_autocomplete_index()
+        self.assertIsInstance(index, PatchedAutocompleteIndex)
+        self.assertEqual([r['title'] for r in index.search('lentil')['recipes']], ['Lentil Dahl'])
+
+    def test_hidden_recipe_is_removed(self):
+        Recipe.objects.filter(pk=self.recipe.pk).update(is_public=False)
+        refresh_autocomplete_recipes([self.recipe.pk])
+        self.assertEqual(get_autocomplete_index().search('lentil')['recipes'], [])
+
+    def test_rebuild_resets_the_delta(self):
+        refresh_autocomplete_recipes([self.recipe.pk])
+        self.assertIsInstance(rebuild_autocomplete_index(), AutocompleteIndex)
+        self.assertIsInstance(get_autocomplete_index(), AutocompleteIndex)
+
+
+class ParseQuantityTests(SimpleTestCase):
+    """Ingredient quantities in the forms recipes use."""
+
+    def test_fractions_and_decimals(self):
+        self.assertEqual(parse_quantity('1 1/2'), Decimal('1.50'))
+        self.assertEqual(parse_quantity('0,5'), Decimal('0.50'))
+        self.assertEqual(parse_quantity('2'), Decimal('2.00'))
+
+    def test_text_is_not_a_quantity(self):
+        self.assertIsNone(parse_quantity('a pinch'))
+        self.assertIsNone(parse_quantity(''))
+
+
+class CSVImportStreamTests(SimpleTestCase):
+    """Rows streamed from an uploaded CSV file."""
+
+    HEADER = 'title,description,prep_time,cook_time,servings\n'
+
+    def _form(self, body):
+        form = RecipeCSVImportForm()
+        form.cleaned_data = {'csv_file': io.BytesIO((self.HEADER + body).encode('utf-8'))}
+        return form
+
+    def _limit_fields(self, size):
+        previous = csv.field_size_limit(size)
+        self.addCleanup(csv.field_size_limit, previous)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        errors = []
+        rows = list(self._form('Soup,Hot,5,10,2\nStew,,5,10,2\n').iter_csv_data(
+            on_error=lambda *error: errors.append(error)
+        ))
+        self.assertEqual([row['row_num'] for row in rows], [2])
+        self.assertEqual([error[:2] for error in errors], [(3, 'Stew')])
+
+    def test_unreadable_row_is_reported_not_swallowed(self):
+        self._limit_fields(50)
+        errors = []
+        form = self._form('Soup,Hot,5,10,2\nStew,' + 'x' * 60 + ',5,10,2\nPie,Warm,5,10,2\n')
+        rows = list(form.iter_csv_data(on_error=lambda *error: errors.append(error)))
+        self.assertEqual([row['title'] for row in rows], ['Soup'])
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0][0], 3)
+
+    def test_unreadable_row_raises_without_error_callback(self):
+        self._limit_fields(50)
+        form = self._form('Soup,Hot,5,10,2\nStew,' + 'x' * 60 + ',5,10,2\n')
+        with self.assertRaises(csv.Error):
+            form.get_csv_data()
+
+
+class RecipeBulkImporterTests(TestCase):
+    """Chunked import and the refreshes it queues."""
+
+    def setUp(self):
+        self.user = make_user()
+
+    def _row(self, row_num, title, **kwargs):
+        row = {
+            'row_num': row_num,
+            'title': title,
+            'prep_time': 5,
+            'cook_time': 10,
+            'ingredients': [{'name': 'Onion', 'quantity': '1', 'unit': ''}],
+            'instructions': ['Cook it'],
+        }
+        row.update(kwargs)
+        return row
+
+    def test_imports_rows_with_unique_slugs(self):
+        result = RecipeBulkImporter(self.user).import_rows(
+            [self._row(2, 'Soup'), self._row(3, 'Soup')]
+        )
+        self.assertEqual(result.created, 2)
+        slugs = set(Recipe.objects.values_list('slug', flat=True))
+        self.assertEqual(slugs, {'soup', 'soup-1'})
+        self.assertEqual(Ingredient.objects.count(), 2)
+
+    def test_bad_row_does_not_sink_its_chunk(self):
+        result = RecipeBulkImporter(self.user).import_rows(
+            [self._row(2, 'Soup'), self._row(3, 'Stew', prep_time='soon'), self._row(4, '')]
+        )
+        self.assertEqual(result.created, 1)
+        self.assertEqual(result.failed, 2)
+        self.assertEqual([error['row'] for error in result.errors], [3, 4])
+
+    def test_skip_duplicates(self):
+        make_recipe(self.user, 'Soup')
+        result = RecipeBulkImporter(self.user, skip_duplicates=True).import_rows(
+            [self._row(2, 'soup')]
+        )
+        self.assertEqual((result.created, result.skipped), (0, 1))
+
+    @mock.patch.object(signals, 'match_ingredients_task')
+    def test_matching_queued_for_created_ingredients(self, task):
+        with self.captureOnCommitCallbacks(execute=True):
+            RecipeBulkImporter(self.user).import_rows([self._row(2, 'Soup')])
+        task.delay.assert_called_once_with(
+            list(Ingredient.objects.values_list('pk', flat=True))
+        )
+
+    @mock.patch.object(signals, 'match_ingredients_task')
+    def test_rolled_back_chunk_queues_nothing(self, task):
+        def fail(result):
+            raise RuntimeError("checkpoint failed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                RecipeBulkImporter(self.user).import_rows([self._row(2, 'Soup')], on_chunk=fail)
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(any(getattr(signals._pending, 'queues', {}).values()))
+        task.delay.assert_not_called()
+
+
+class ImageBackfillTests(TestCase):
+    """The periodic derivative backfill moves past images that fail."""
+
+    def setUp(self):
+        self.recipe = make_recipe(make_user(), 'Soup')
+        Recipe.objects.filter(pk=self.recipe.pk).update(image='recipes/missing.jpg')
+
+    def test_failed_image_is_recorded_and_skipped(self):
+        stats = generate_missing_derivatives('recipe')
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['errors'][0][0], self.recipe.pk)
+
+        manifest = Recipe.objects.get(pk=self.recipe.pk).image_manifest
+        self.assertEqual(manifest['source'], 'recipes/missing.jpg')
+        self.assertIn('error', manifest)
+        self.assertFalse(pending_images('recipe').exists())
+        self.assertEqual(generate_missing_derivatives('recipe')['failed'], 0)
+
+    def test_force_retries_failed_images(self):
+        generate_missing_derivatives('recipe')
+        self.assertEqual(list(pending_images('recipe', force=True)), [self.recipe])
+
+    def test_replaced_image_is_pending_again(self):
+        generate_missing_derivatives('recipe')
+        Recipe.objects.filter(pk=self.recipe.pk).update(image='recipes/other.jpg')
+        self.assertEqual(list(pending_images('recipe')), [self.recipe])
+
+
+class IngredientCategorizerTests(SimpleTestCase):
+    """Keyword matching of ingredient names to categories."""
+
+    def setUp(self):
+        self.categorizer = IngredientCategorizer([
+            (1, 'Dairy', 2, ['milk', 'cream', 'cheese']),
+            (2, 'Frozen', 5, ['ice cream', 'peas']),
+            (3, 'Produce', 1, ['tomato', 'berry', 'peas']),
+        ])
+
+    def test_longest_keyword_wins(self):
+        self.assertEqual(self.categorizer.match('Vanilla ice cream'), 2)
+        self.assertEqual(self.categorizer.match('Double cream'), 1)
+
+    def test_plurals_match(self):
+        self.assertEqual(self.categorizer.match('2 large tomatoes'), 3)
+        self.assertEqual(self.categorizer.match('Mixed berries'), 3)
+
+    def test_whole_words_only(self):
+        self.assertIsNone(self.categorizer.match('Buttermilky'))
+        self.assertIsNone(self.categorizer.match('Creamery sauce'))
+
+    def test_shared_keyword_goes_to_first_category_in_display_order(self):
+        self.assertEqual(self.categorizer.match_name('Frozen peas'), 'Produce')
+
+    def test_no_match(self):
+        self.assertIsNone(self.categorizer.match('Saffron'))
+        self.assertIsNone(IngredientCategorizer([]).match('Milk'))
+
+
+class CommentThreadTests(TestCase):
+    """Materialized paths, thread ordering and the approved-comment counter."""
+
+    def setUp(self):
+        self.user = make_user()
+        self.recipe = make_recipe(self.user, 'Risotto')
+
+    def _comment(self, text, parent=None, **kwargs):
+        return RecipeComment.objects.create(
+            recipe=self.recipe, user=self.user, comment=text, parent=parent, **kwargs
+        )
+
+    def test_paths_follow_ancestors(self):
+        root = self._comment('root')
+        reply = self._comment('reply', parent=root)
+        self.assertEqual(root.path, path_segment(root.pk))
+        self.assertEqual(reply.path, root.path + path_segment(reply.pk))
+        self.assertEqual((root.depth, reply.depth), (0, 1))
+
+    def test_threads_are_depth_first(self):
+        first = self._comment('first')
+        second = self._comment('second')
+        reply = self._comment('reply to first', parent=first)
+        page, comments = comment_threads(self.recipe)
+        self.assertEqual([c.pk for c in page], [first.pk, second.pk])
+        self.assertEqual([c.pk for c in comments], [first.pk, reply.pk, second.pk])
+        self.assertEqual([c.indent for c in comments], [0, 1, 0])
+
+    def test_replies_to_hidden_comments_are_hidden(self):
+        root = self._comment('root')
+        hidden = self._comment('hidden', parent=root, is_approved=False)
+        self._comment('under hidden', parent=hidden)
+        _, comments = comment_threads(self.recipe)
+        self.assertEqual([c.pk for c in comments], [root.pk])
+
+    def test_reparenting_moves_replies(self):
+        first = self._comment('first')
+        second = self._comment('second')
+        reply = self._comment('reply', parent=first)
+        nested = self._comment('nested', parent=reply)
+
+        reply = RecipeComment.objects.get(pk=reply.pk)
+        reply.parent = second
+        reply.save()
+
+        nested.refresh_from_db()
+        self.assertEqual(
+            nested.path, second.path + path_segment(reply.pk) + path_segment(nested.pk)
+        )
+        self.assertEqual(nested.depth, 2)
+
+    def test_deep_replies_attach_to_parent(self):
+        parent = self._comment('level 0')
+        for level in range(1, MAX_DEPTH + 2):
+            parent = self._comment(f'level {level}', parent=parent)
+        self.assertEqual(parent.depth, MAX_DEPTH)
+
+    def test_comment_count_tracks_approved_comments(self):
+        root = self._comment('root')
+        self._comment('pending', parent=root, is_approved=False)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 1)
+        root.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.comment_count, 0)
+
+
+class FragmentInvalidationTests(TestCase):
+    """Cached recipe cards are dropped when what they show changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user()
+        self.recipe = make_recipe(self.user, 'Soup')
+
+    def _version(self):
+        return get_fragment_versions([self.recipe.pk])[self.recipe.pk]
+
+    def test_author_rename_bumps_version(self):
+        before = self._version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=['last_login'])
+        self.assertEqual(self._version(), before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.username = 'chef'
+            self.user.save()
+        self.assertNotEqual(self._version(), before)
+
+    def test_category_delete_bumps_version(self):
+        category = RecipeCategory.objects.create(name='Soups', slug='soups')
+        self.recipe.categories.add(category)
+        before = self._version()
+        with self.captureOnCommitCallbacks(execute=True):
+            category.delete()
+        self.assertNotEqual(self._version(), before)
+
+
+class DietaryFlagTests(SimpleTestCase):
+    """Packing dietary_info into the bitmask and filtering on it."""
+
+    def test_mask_packs_true_flags(self):
+        mask = dietary_mask({'vegan': True, 'nut_free': True, 'vegetarian': False, 'keto': True})
+        self.assertEqual(mask, DIETARY_BITS['vegan'] | DIETARY_BITS['nut_free'])
+        self.assertEqual(dietary_mask(None), 0)
+
+    def test_only_true_sets_a_flag(self):
+        self.assertEqual(dietary_mask({'vegan': 'false', 'vegetarian': 1, 'nut_free': 'yes'}), 0)
+
+    def test_labels_in_fixed_order(self):
+        mask = DIETARY_BITS['nut_free'] | DIETARY_BITS['vegetarian']
+        self.assertEqual(dietary_labels(mask), ['Vegetarian', 'Nut-Free'])
+
+    def test_matching_masks_contain_every_required_bit(self):
+        required = DIETARY_BITS['vegan'] | DIETARY_BITS['gluten_free']
+        masks = matching_masks(required)
+        self.assertEqual(len(masks), 8)
+        self.assertTrue(all(mask & required == required for mask in masks))
+
+
+class DietaryFilterTests(TestCase):
+    """filter_by_diets against saved recipes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = make_user()
+        cls.vegan = make_recipe(author, 'Chickpea Curry', dietary_info={'vegan': True, 'vegetarian': True})
+        cls.veggie = make_recipe(author, 'Cheese Pie', dietary_info={'vegetarian': True})
+        cls.meat = make_recipe(author, 'Beef Stew')
+
+    def _titles(self, diets):
+        return set(filter_by_diets(Recipe.objects.all(), diets).values_list('title', flat=True))
+
+    def test_save_syncs_flags(self):
+        self.assertEqual(
+            self.vegan.dietary_flags, DIETARY_BITS['vegan'] | DIETARY_BITS['vegetarian']
+        )
+
+    def test_every_diet_is_required(self):
+        self.assertEqual(self._titles(['vegetarian']), {'Chickpea Curry', 'Cheese Pie'})
+        self.assertEqual(self._titles(['vegetarian', 'vegan']), {'Chickpea Curry'})
+
+    def test_unknown_diets_do_not_filter(self):
+        self.assertEqual(len(self._titles(['keto'])), 3)
@@ -0,0 +1,146 @@
+"""
+Ingredient unit conversion.
+
+Maps the free-text units entered on recipe ingredients to a dimension
+(mass, volume or count) and an amount in that dimension's base unit
+(grams, millilitres or items). Units outside those dimensions (cloves,
+pinches, tins, ...) are normalized to a singular lowercase name so equal
+units still aggregate together.
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Tuple
+
+# Unit -> (dimension, amount in base unit)
+INGREDIENT_UNITS = {
+    'g': ('mass', 1), 'gram': ('mass', 1), 'grams': ('mass', 1),
+    'kg': ('mass', 1000), 'kilogram': ('mass', 1000), 'kilograms': ('mass', 1000),
+    'mg': ('mass', 0.001), 'milligram': ('mass', 0.001), 'milligrams': ('mass', 0.001),
+    'oz': ('mass', 28.35), 'ounce': ('mass', 28.35), 'ounces': ('mass', 28.35),
+    'lb': ('mass', 453.6), 'lbs': ('mass', 453.6), 'pound': ('mass', 453.6),
+    'pounds': ('mass', 453.6),
+    'ml': ('volume', 1), 'millilitre': ('volume', 1), 'milliliter': ('volume', 1),
+    'millilitres': ('volume', 1), 'milliliters': ('volume', 1),
+    'cl': ('volume', 10), 'dl': ('volume', 100),
+    'l': ('volume', 1000), 'litre': ('volume', 1000), 'liter': ('volume', 1000),
+    'litres': ('volume', 1000), 'liters': ('volume', 1000), 'ltr': ('volume', 1000),
+    'tsp': ('volume', 5), 'teaspoon': ('volume', 5), 'teaspoons': ('volume', 5),
+    'tbsp': ('volume', 15), 'tablespoon': ('volume', 15), 'tablespoons': ('volume', 15),
+    'cup': ('volume', 240), 'cups': ('volume', 240),
+    'fl oz': ('volume', 28.41), 'pint': ('volume', 568), 'pints': ('volume', 568),
+    '': ('count', 1), 'each': ('count', 1), 'whole': ('count', 1),
+    'piece': ('count', 1), 'pieces': ('count', 1), 'item': ('count', 1),
+    'items': ('count', 1),
+}
+
+# Base unit stored for each dimension
+BASE_UNITS = {'mass': 'g', 'volume': 'ml', 'count': 'item'}
+
+# Larger display unit used once an aggregated amount reaches its size
+DISPLAY_UNITS = {'g': ('kg', 1000), 'ml': ('l', 1000)}
+
+BASE_QUANTITY_EXPONENT = Decimal('0.001')
+
+
+def normalize_unit(unit: Optional[str]) -> str:
+    """
+    Normalize unit text for lookups and grouping.
+
+    Lowercases, drops trailing dots and extra spaces and singularizes
+    plain plurals ('Cloves' -> 'clove', 'pinches' -> 'pinch').
+
+    Args:
+        unit: Raw unit text
+
+    Returns:
+        str: Normalized unit (empty for no unit)
+    """
+    unit = ' '.join((unit or '').lower().replace('.', ' ').split())
+    if unit in INGREDIENT_UNITS or len(unit) <= 3:
+        return unit
+    if unit.endswith(('ches', 'shes', 'xes')):
+        return unit[:-2]
+    if unit.endswith('s') and not unit.endswith('ss'):
+        return unit[:-1]
+    return unit
+
+
+def lookup_unit(unit: Optional[str]) -> Optional[Tuple[str, float]]:
+    """
+    Look up a unit as entered on an ingredient.
+
+    Args:
+        unit: Raw unit text (e.g. 'Tbsp.', 'kg', '')
+
+    Returns:
+        tuple: (dimension, base amount) or None if the unit is unknown
+    """
+    return INGREDIENT_UNITS.get(normalize_unit(unit))
+
+
+def to_base_amount(quantity, unit: Optional[str]) -> Optional[Tuple[str, Decimal]]:
+    """
+    Convert a quantity to its dimension's base unit.
+
+    Args:
+        quantity: Amount in ``unit``
+        unit: Raw unit text
+
+    Returns:
+        tuple: (dimension, amount in base unit) or None if not convertible
+    """
+    if quantity is None:
+        return None
+    known = lookup_unit(unit)
+    if not known:
+        return None
+    dimension, factor = known
+    return dimension, Decimal(str(quantity)) * Decimal(str(factor))
+
+
+def to_base_quantity(quantity, unit: Optional[str]) -> Tuple[Optional[Decimal], str]:
+    """
+    Convert an ingredient amount to the unit it is aggregated in.
+
+    Known units convert to their dimension's base unit (g, ml or item);
+    anything else keeps its quantity under the normalized unit name.
+
+    Args:
+        quantity: Amount in ``unit`` (may be None)
+        unit: Raw unit text
+
+    Returns:
+        tuple: (quantity in the aggregation unit or None, aggregation unit)
+    """
+    known = lookup_unit(unit)
+    base_unit = BASE_UNITS[known[0]] if known else normalize_unit(unit)
+    if quantity is None:
+        return None, base_unit
+    amount = Decimal(str(quantity))
+    if known:
+        amount *= Decimal(str(known[1]))
+    return amount.quantize(BASE_QUANTITY_EXPONENT, rounding=ROUND_HALF_UP), base_unit
+
+
+def format_quantity(quantity, base_unit: str) -> Tuple[Decimal, str]:
+    """
+    Express an aggregated base quantity in a readable unit.
+
+    Args:
+        quantity: Amount in ``base_unit``
+        base_unit: Aggregation unit from ``to_base_quantity``
+
+    Returns:
+        tuple: (rounded quantity, display unit; 'item' is shown as '')
+    """
+    amount = Decimal(str(quantity or 0))
+    unit = base_unit
+    larger = DISPLAY_UNITS.get(base_unit)
+    if larger and amount >= larger[1]:
+        unit, amount = larger[0], amount / larger[1]
+    if unit == 'item':
+        unit = ''
+    amount = amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP).normalize()
+    if amount == amount.to_integral():
+        amount = amount.quantize(Decimal('1'))
+    return amount, unit
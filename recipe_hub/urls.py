@@ -15,6 +15,7 @@ urlpatterns = [
     path('my-recipes/', views.UserRecipeListView.as_view(), name='user_recipes'),
     path('favorites/', views.FavoriteRecipesView.as_view(), name='favorite_recipes'),
     path('category/<slug:slug>/', views.CategoryRecipesView.as_view(), name='category_recipes'),
+    path('feed/', views.recipe_feed, name='recipe_feed'),
     
     # Recipe CRUD
     path('create/', views.RecipeCreateView.as_view(), name='recipe_create'),
@@ -11,7 +11,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q, Avg, Count, Prefetch, F
+from django.db.models import Prefetch, F
 from django.http import JsonResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse, reverse_lazy
@@ -22,24 +22,115 @@ from django.views.generic import (
     ListView, DetailView, CreateView, UpdateView, DeleteView
 )
 
-from auth_hub.models import ActivityLog
+from auth_hub.activity import log_activity
 from .models import (
     Recipe, RecipeCategory, RecipeRating, RecipeFavorite, RecipeComment,
-    Ingredient, Instruction
+    Ingredient, Instruction, SimilarRecipe
 )
 from .forms import (
     RecipeForm, RecipeSearchForm, RecipeRatingForm, RecipeCommentForm,
     IngredientFormSet, InstructionFormSet, RecipeImportForm, RecipeCSVImportForm
 )
+from .comments import comment_threads
+from .counters import COUNTER_FIELDS
+from .dietary import filter_by_diets
+from .fragments import FRAGMENT_TIMEOUT, fragment_version
+from .images import CARD_WIDTH, image_variant_url
+from .importing import RecipeBulkImporter
+from .nutrition import HIGH_PROTEIN_PER_SERVING
+from .overlay import RecipeOverlayMixin, get_recipe_overlay
+from .pagination import (
+    DEFAULT_SORT_KEYS, RECIPE_SORT_KEYS, KeysetPaginationMixin, cached_count,
+    order_by_keys, paginate_keyset
+)
+from .search import build_search_query, search_recipes
+from .stats import get_author_stats
 
 logger = logging.getLogger(__name__)
 
 
-class RecipeListView(ListView):
+def filter_public_recipes(params):
+    """
+    Build the filtered, ordered public recipe queryset for search params.
+    
+    Shared by the recipe list page and the JSON feed.
+    
+    Args:
+        params: QueryDict of search form values
+        
+    Returns:
+        tuple: (queryset, search form, keyset sort keys or None for
+        relevance ordering)
+    """
+    queryset = Recipe.objects.filter(is_public=True).select_related(
+        'author', 'author__profile'
+    ).prefetch_related('categories')
+    
+    search_form = RecipeSearchForm(params)
+    
+    if not search_form.is_valid():
+        return queryset.order_by(*order_by_keys(DEFAULT_SORT_KEYS)), search_form, DEFAULT_SORT_KEYS
+    
+    # Text search (GIN-indexed search vector, annotated with rank)
+    query = search_form.cleaned_data.get('query')
+    if query:
+        queryset = search_recipes(queryset, build_search_query(query))
+    
+    # Category filter
+    category = search_form.cleaned_data.get('category')
+    if category:
+        queryset = queryset.filter(categories=category)
+    
+    # Difficulty filter
+    difficulty = search_form.cleaned_data.get('difficulty')
+    if difficulty:
+        queryset = queryset.filter(difficulty=difficulty)
+    
+    # Time filter ('total_time' is a model property, so annotate another name)
+    sort_by = search_form.cleaned_data.get('sort_by')
+    max_time = search_form.cleaned_data.get('max_time')
+    if max_time or sort_by == 'total_time':
+        queryset = queryset.annotate(total_minutes=F('prep_time') + F('cook_time'))
+    if max_time:
+        queryset = queryset.filter(total_minutes__lte=max_time)
+    
+    # Dietary filters (one indexed predicate on the flag bitmask)
+    dietary = search_form.cleaned_data.get('dietary', [])
+    if dietary:
+        queryset = filter_by_diets(queryset, dietary)
+    
+    # Nutrition filters (denormalized per-serving values, NULL unless
+    # MIN_NUTRITION_COVERAGE of the ingredients have nutrition data)
+    max_calories = search_form.cleaned_data.get('max_calories')
+    if max_calories:
+        queryset = queryset.filter(kcal_per_serving__lte=max_calories)
+    
+    if search_form.cleaned_data.get('high_protein'):
+        queryset = queryset.filter(
+            protein_per_serving__gte=HIGH_PROTEIN_PER_SERVING
+        )
+    
+    # Sorting: every ordering except relevance is keyset-paginated
+    if not sort_by:
+        sort_by = 'relevance' if query else '-created_at'
+    if sort_by == 'relevance':
+        if query:
+            return queryset.order_by('-rank', '-id'), search_form, None
+        sort_by = '-created_at'
+    if sort_by in ('kcal_per_serving', '-protein_per_serving'):
+        # Recipes without nutrition data cannot be ranked
+        queryset = queryset.filter(**{f"{sort_by.lstrip('-')}__isnull": False})
+    
+    sort_keys = RECIPE_SORT_KEYS.get(sort_by, DEFAULT_SORT_KEYS)
+    return queryset.order_by(*order_by_keys(sort_keys)), search_form, sort_keys
+
+
+class RecipeListView(KeysetPaginationMixin, RecipeOverlayMixin, ListView):
     """
     Display list of recipes with search and filtering.
     
     Supports filtering by category, difficulty, time, and dietary restrictions.
+    Pages are addressed by cursor rather than page number.
     """
     model = Recipe
     template_name = 'recipe_hub/recipe_list.html'
@@ -48,82 +139,23 @@ class RecipeListView(ListView):
     
     def get_queryset(self):
         """Apply filters and search to recipe queryset."""
-        queryset = Recipe.objects.filter(is_public=True).select_related(
-            'author', 'author__profile'
-        ).prefetch_related('categories', 'ratings')
-        
-        # Get search form
-        self.search_form = RecipeSearchForm(self.request.GET)
-        
-        if self.search_form.is_valid():
-            # Text search
-            query = self.search_form.cleaned_data.get('query')
-            if query:
-                queryset = queryset.filter(
-                    Q(title__icontains=query) |
-                    Q(description__icontains=query) |
-                    Q(ingredients__name__icontains=query)
-                ).distinct()
-            
-            # Category filter
-            category = self.search_form.cleaned_data.get('category')
-            if category:
-                queryset = queryset.filter(categories=category)
-            
-            # Difficulty filter
-            difficulty = self.search_form.cleaned_data.get('difficulty')
-            if difficulty:
-                queryset = queryset.filter(difficulty=difficulty)
-            
-            # Time filter
-            max_time = self.search_form.cleaned_data.get('max_time')
-            if max_time:
-                queryset = queryset.annotate(
-                    total_time=F('prep_time') + F('cook_time')
-                ).filter(total_time__lte=max_time)
-            
-            # Dietary filters
-            dietary = self.search_form.cleaned_data.get('dietary', [])
-            if dietary:
-                dietary = [d for d in dietary if d]
-                
-                diet_mapping = {
-                    'vegetarian': 'vegetarian',
-                    'vegan': 'vegan',
-                    'gluten_free': 'gluten_free',
-                    'dairy_free': 'dairy_free',
-                    'nut_free': 'nut_free'
-                }
-                
-                for diet in dietary:
-                    if diet in diet_mapping:
-                        queryset = queryset.filter(
-                            dietary_info__contains={diet_mapping[diet]: True}
-                        )
-            
-            # Sorting
-            sort_by = self.search_form.cleaned_data.get('sort_by') or '-created_at'
-            if sort_by == '-rating':
-                queryset = queryset.annotate(
-                    avg_rating=Avg('ratings__rating')
-                ).order_by('-avg_rating', '-created_at')
-            elif sort_by == 'total_time':
-                queryset = queryset.annotate(
-                    total_time=F('prep_time') + F('cook_time')
-                ).order_by('total_time')
-            else:
-                queryset = queryset.order_by(sort_by)
-        else:
-            queryset = queryset.order_by('-created_at')
-        
+        queryset, self.search_form, self.sort_keys = filter_public_recipes(
+            self.request.GET
+        )
         return queryset
     
+    def get_sort_keys(self):
+        """Keys chosen by the sort_by parameter."""
+        return self.sort_keys
+    
     def get_context_data(self, **kwargs):
         """Add search form and categories to context."""
         context = super().get_context_data(**kwargs)
         context['search_form'] = self.search_form
         context['categories'] = RecipeCategory.objects.filter(is_active=True)
-        context['total_recipes'] = self.get_queryset().count()
+        context['total_recipes'] = cached_count(
+            self.object_list, _filter_cache_key(self.request.GET)
+        )
         
         # Add featured recipes for sidebar
         context['featured_recipes'] = Recipe.objects.filter(
@@ -133,7 +165,15 @@ class RecipeListView(ListView):
         return context
 
 
-class UserRecipeListView(LoginRequiredMixin, ListView):
+def _filter_cache_key(params):
+    """Identify a filter combination for count caching (ignores paging)."""
+    return sorted(
+        (key, params.getlist(key)) for key in params
+        if key not in ('cursor', 'page')
+    )
+
+
+class UserRecipeListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """Display user's own recipes."""
     model = Recipe
     template_name = 'recipe_hub/user_recipes.html'
@@ -144,7 +184,9 @@ class UserRecipeListView(LoginRequiredMixin, ListView):
         """Get recipes for the current user."""
         return Recipe.objects.filter(
             author=self.request.user
-        ).select_related('author').prefetch_related('categories', 'ratings')
+        ).select_related('author').prefetch_related('categories').order_by(
+            *order_by_keys(DEFAULT_SORT_KEYS)
+        )
     
     def get_context_data(self, **kwargs):
         """Add recipe statistics to context."""
@@ -172,20 +214,17 @@ class UserRecipeListView(LoginRequiredMixin, ListView):
             )
             logger.warning(f"Created missing UserProfile for user {user.username}")
         
-        context['recipe_count'] = self.get_queryset().count()
+        context['recipe_count'] = self.object_list.count()
         context['recipe_limit'] = profile.subscription_tier.max_recipes
         context['can_add_recipe'] = (
             profile.subscription_tier.max_recipes == -1 or
             context['recipe_count'] < profile.subscription_tier.max_recipes
         )
         
-        # Recipe statistics
-        context['total_ratings'] = RecipeRating.objects.filter(
-            recipe__author=user
-        ).count()
-        context['total_favorites'] = RecipeFavorite.objects.filter(
-            recipe__author=user
-        ).count()
+        # Recipe statistics (cached per author)
+        stats = get_author_stats(user.pk)
+        context['total_ratings'] = stats['total_ratings']
+        context['total_favorites'] = stats['total_favorites']
         
         return context
 
@@ -203,18 +242,12 @@ class RecipeDetailView(DetailView):
         return Recipe.objects.select_related(
             'author', 'author__profile'
         ).prefetch_related(
+            # Ingredients and instructions load lazily, only when their
+            # cached fragments are missing
             'categories',
-            'ingredients',
-            'instructions',
             Prefetch(
                 'ratings',
                 queryset=RecipeRating.objects.select_related('user')
-            ),
-            Prefetch(
-                'comments',
-                queryset=RecipeComment.objects.filter(
-                    is_approved=True, parent__isnull=True
-                ).select_related('user').prefetch_related('replies')
             )
         )
     
@@ -234,22 +267,32 @@ class RecipeDetailView(DetailView):
             context['is_favorited'] = False
             context['can_edit'] = False
         
+        # Cached ingredient and instruction blocks
+        context['fragment_version'] = fragment_version(self.request, recipe)
+        context['fragment_timeout'] = FRAGMENT_TIMEOUT
+        
         # Forms
         context['rating_form'] = RecipeRatingForm()
         context['comment_form'] = RecipeCommentForm()
         
-        # Similar recipes
-        context['similar_recipes'] = Recipe.objects.filter(
-            categories__in=recipe.categories.all(),
-            is_public=True
-        ).exclude(id=recipe.id).distinct()[:4]
+        # Comment threads, paged by top-level comment
+        context['comment_page'], context['comments'] = comment_threads(
+            recipe, self.request.GET.get('comments')
+        )
+        
+        # Similar recipes (precomputed neighbours, see recipe_hub.similarity)
+        context['similar_recipes'] = [
+            link.similar for link in SimilarRecipe.objects.filter(
+                recipe=recipe, similar__is_public=True
+            ).select_related('similar')[:4]
+        ]
         
         # Log view
         if user.is_authenticated:
-            ActivityLog.objects.create(
-                user=user,
-                action='view_recipe',
-                details=f"Viewed recipe: {recipe.title}"
+            log_activity(
+                user,
+                'view_recipe',
+                f"Viewed recipe: {recipe.title}"
             )
         
         return context
@@ -383,10 +426,10 @@ class RecipeCreateView(LoginRequiredMixin, CreateView):
             instruction_formset.save()
             
             # Log activity
-            ActivityLog.objects.create(
-                user=self.request.user,
-                action='create_recipe',
-                details=f"Created recipe: {self.object.title}"
+            log_activity(
+                self.request.user,
+                'create_recipe',
+                f"Created recipe: {self.object.title}"
             )
             
             messages.success(
@@ -480,10 +523,10 @@ class RecipeUpdateView(UserPassesTestMixin, UpdateView):
             instruction_formset.save()
             
             # Log activity
-            ActivityLog.objects.create(
-                user=self.request.user,
-                action='update_recipe',
-                details=f"Updated recipe: {self.object.title}"
+            log_activity(
+                self.request.user,
+                'update_recipe',
+                f"Updated recipe: {self.object.title}"
             )
             
             messages.success(
@@ -529,10 +572,10 @@ class RecipeDeleteView(UserPassesTestMixin, DeleteView):
         
         try:
             # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='delete_recipe',
-                details=f"Deleted recipe: {recipe_title}"
+            log_activity(
+                request.user,
+                'delete_recipe',
+                f"Deleted recipe: {recipe_title}"
             )
             
             response = super().delete(request, *args, **kwargs)
@@ -560,7 +603,7 @@ class RecipeDeleteView(UserPassesTestMixin, DeleteView):
             return redirect(recipe.get_absolute_url())
 
 
-class FavoriteRecipesView(LoginRequiredMixin, ListView):
+class FavoriteRecipesView(LoginRequiredMixin, KeysetPaginationMixin, RecipeOverlayMixin, ListView):
     """Display user's favorite recipes."""
     model = Recipe
     template_name = 'recipe_hub/favorite_recipes.html'
@@ -572,16 +615,18 @@ class FavoriteRecipesView(LoginRequiredMixin, ListView):
         return Recipe.objects.filter(
             favorites__user=self.request.user,
             is_public=True
-        ).select_related('author').prefetch_related('categories', 'ratings')
+        ).select_related('author').prefetch_related('categories').order_by(
+            *order_by_keys(DEFAULT_SORT_KEYS)
+        )
     
     def get_context_data(self, **kwargs):
         """Add total favorites count."""
         context = super().get_context_data(**kwargs)
-        context['total_favorites'] = self.get_queryset().count()
+        context['total_favorites'] = self.object_list.count()
         return context
 
 
-class CategoryRecipesView(ListView):
+class CategoryRecipesView(KeysetPaginationMixin, RecipeOverlayMixin, ListView):
     """Display recipes from a specific category."""
     model = Recipe
     template_name = 'recipe_hub/category_recipes.html'
@@ -598,16 +643,67 @@ class CategoryRecipesView(ListView):
         return Recipe.objects.filter(
             categories=self.category,
             is_public=True
-        ).select_related('author').prefetch_related('categories', 'ratings')
+        ).select_related('author').prefetch_related('categories').order_by(
+            *order_by_keys(DEFAULT_SORT_KEYS)
+        )
     
     def get_context_data(self, **kwargs):
         """Add category to context."""
         context = super().get_context_data(**kwargs)
         context['category'] = self.category
-        context['total_recipes'] = self.get_queryset().count()
+        context['total_recipes'] = self.object_list.count()
         return context
 
 
+@require_http_methods(["GET"])
+def recipe_feed(request):
+    """
+    JSON feed of public recipes for infinite scroll.
+
+    Accepts the recipe list search parameters plus ``cursor`` and
+    ``limit``; returns one page with cursors for the next and previous
+    pages and the (cached) total.
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 12)), 1), 50)
+    except ValueError:
+        limit = 12
+
+    try:
+        queryset, _, sort_keys = filter_public_recipes(request.GET)
+        page = paginate_keyset(queryset, sort_keys, request.GET.get('cursor'), limit)
+        overlay = get_recipe_overlay(request, page.object_list)
+
+        results = []
+        for recipe in page.object_list:
+            results.append({
+                'id': recipe.id,
+                'title': recipe.title,
+                'slug': recipe.slug,
+                'url': recipe.get_absolute_url(),
+                'image_url': image_variant_url(recipe, CARD_WIDTH),
+                'author': recipe.author.username,
+                'total_time': recipe.total_time,
+                'difficulty': recipe.difficulty,
+                'average_rating': recipe.average_rating,
+                'rating_count': recipe.rating_count,
+                'favorite_count': recipe.favorite_count,
+                'kcal_per_serving': recipe.kcal_per_serving,
+                'is_favorited': overlay.is_favorited(recipe),
+                'created_at': recipe.created_at.isoformat(),
+            })
+
+        return JsonResponse({
+            'results': results,
+            'next_cursor': page.next_cursor,
+            'previous_cursor': page.previous_cursor,
+            'total': cached_count(queryset, _filter_cache_key(request.GET)),
+        })
+    except Exception as e:
+        logger.error(f"Error building recipe feed: {str(e)}")
+        return JsonResponse({'error': 'Unable to load recipes'}, status=500)
+
+
 @login_required
 def import_recipe_csv(request):
     """
@@ -620,11 +716,11 @@ def import_recipe_csv(request):
         
         if form.is_valid():
             try:
-                # Check user's recipe limit
+                # Ensure the user has a profile; the importer enforces its recipe limit
                 from auth_hub.models import UserProfile, SubscriptionTier
                 
                 try:
-                    profile = request.user.profile
+                    request.user.profile
                 except UserProfile.DoesNotExist:
                     default_tier = SubscriptionTier.objects.filter(tier_type='FREE').first()
                     if not default_tier:
@@ -636,45 +732,25 @@ def import_recipe_csv(request):
                             max_menus=3,
                             max_shares=0
                         )
-                    profile = UserProfile.objects.create(
+                    UserProfile.objects.create(
                         user=request.user,
                         subscription_tier=default_tier
                     )
                     logger.warning(f"Created missing UserProfile for user {request.user.username}")
                 
-                # Get CSV data
-                csv_data = form.get_csv_data()
-                if not csv_data:
+                # Stream rows straight into the bulk importer; rows beyond
+                # the plan's recipe limit are reported as row errors
+                import_results = _process_csv_import(form, request.user, form.cleaned_data)
+                
+                if not (import_results['created'] or import_results['skipped'] or import_results['errors']):
                     messages.error(request, "No valid data found in CSV file.")
                     return render(request, 'recipe_hub/recipe_csv_import.html', {'form': form})
                 
-                # Check recipe limits
-                current_count = Recipe.objects.filter(author=request.user).count()
-                max_recipes = profile.subscription_tier.max_recipes
-                
-                if max_recipes != -1:  # Not unlimited
-                    available_slots = max_recipes - current_count
-                    if len(csv_data) > available_slots:
-                        messages.error(
-                            request,
-                            f"CSV contains {len(csv_data)} recipes, but you can only add "
-                            f"{available_slots} more recipes with your current plan. "
-                            f"Please upgrade your subscription or reduce the CSV size."
-                        )
-                        return render(request, 'recipe_hub/recipe_csv_import.html', {'form': form})
-                
-                # Process import
-                import_results = _process_csv_import(
-                    csv_data, 
-                    request.user, 
-                    form.cleaned_data
-                )
-                
                 # Log activity
-                ActivityLog.objects.create(
-                    user=request.user,
-                    action='import_recipes_csv',
-                    details=f"Imported {import_results['created']} recipes from CSV"
+                log_activity(
+                    request.user,
+                    'import_recipes_csv',
+                    f"Imported {import_results['created']} recipes from CSV"
                 )
                 
                 # Show results
@@ -719,106 +795,35 @@ def import_recipe_csv(request):
     })
 
 
-def _process_csv_import(csv_data, user, options):
+def _process_csv_import(form, user, options):
     """
     Process CSV data and create recipes.
     
     Args:
-        csv_data (list): Parsed CSV data
+        form: Valid RecipeCSVImportForm
         user: User creating the recipes
         options (dict): Import options from form
         
     Returns:
         dict: Import results with counts and errors
     """
-    results = {
-        'created': 0,
-        'skipped': 0,
-        'errors': []
-    }
+    importer = RecipeBulkImporter(
+        user,
+        is_public=options.get('make_public', True),
+        skip_duplicates=options.get('skip_duplicates', True),
+        default_category=options.get('default_category'),
+    )
+    result = importer.result
+    importer.import_rows(form.iter_csv_data(on_error=result.add_error))
     
-    skip_duplicates = options.get('skip_duplicates', True)
-    make_public = options.get('make_public', True)
-    default_category = options.get('default_category')
+    for message in result.warnings:
+        logger.warning(f"CSV import for {user.username}: {message}")
     
-    for row_data in csv_data:
-        try:
-            # Check for duplicates
-            if skip_duplicates:
-                existing = Recipe.objects.filter(
-                    title__iexact=row_data['title'],
-                    author=user
-                ).exists()
-                
-                if existing:
-                    logger.info(f"Skipping duplicate recipe: {row_data['title']}")
-                    results['skipped'] += 1
-                    continue
-            
-            # Create recipe
-            with transaction.atomic():
-                recipe = Recipe.objects.create(
-                    author=user,
-                    title=row_data['title'],
-                    description=row_data['description'],
-                    prep_time=row_data['prep_time'],
-                    cook_time=row_data['cook_time'],
-                    servings=row_data['servings'],
-                    difficulty=row_data['difficulty'],
-                    is_public=make_public,
-                    dietary_info=row_data['dietary_info']
-                )
-                
-                # Add categories
-                categories_to_add = []
-                
-                # Add specified categories
-                for cat_name in row_data['categories']:
-                    try:
-                        category = RecipeCategory.objects.get(
-                            name__iexact=cat_name,
-                            is_active=True
-                        )
-                        categories_to_add.append(category)
-                    except RecipeCategory.DoesNotExist:
-                        logger.warning(f"Category not found: {cat_name}")
-                
-                # Add default category if no categories and default is specified
-                if not categories_to_add and default_category:
-                    categories_to_add.append(default_category)
-                
-                if categories_to_add:
-                    recipe.categories.set(categories_to_add)
-                
-                # Create ingredients
-                for i, ingredient_data in enumerate(row_data['ingredients']):
-                    Ingredient.objects.create(
-                        recipe=recipe,
-                        name=ingredient_data['name'],
-                        quantity=ingredient_data['quantity'],
-                        unit=ingredient_data['unit'],
-                        notes=ingredient_data['notes'],
-                        order=i + 1
-                    )
-                
-                # Create instructions
-                for instruction_data in row_data['instructions']:
-                    Instruction.objects.create(
-                        recipe=recipe,
-                        step_number=instruction_data['step_number'],
-                        instruction=instruction_data['instruction'],
-                        time_minutes=instruction_data['time_minutes']
-                    )
-                
-                logger.info(f"Created recipe from CSV: {recipe.title} (ID: {recipe.pk})")
-                results['created'] += 1
-                
-        except Exception as e:
-            error_msg = f"Error creating recipe '{row_data.get('title', 'Unknown')}': {str(e)}"
-            logger.error(error_msg)
-            results['errors'].append(error_msg)
-    
-    return results
+    return {
+        'created': result.created,
+        'skipped': result.skipped,
+        'errors': result.error_messages(),
+    }
 
 
 @login_required
@@ -868,23 +873,29 @@ def toggle_favorite(request, pk):
         )
     
     # Log activity
-    ActivityLog.objects.create(
-        user=request.user,
-        action='toggle_favorite',
-        details=f"{'Added' if is_favorited else 'Removed'} favorite: {recipe.title}"
+    log_activity(
+        request.user,
+        'toggle_favorite',
+        f"{'Added' if is_favorited else 'Removed'} favorite: {recipe.title}"
     )
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({
             'is_favorited': is_favorited,
             'message': message,
-            'favorite_count': recipe.favorites.count()
+            'favorite_count': _refreshed_counters(recipe).favorite_count
         })
     
     messages.success(request, message)
     return redirect(recipe.get_absolute_url())
 
 
+def _refreshed_counters(recipe):
+    """Reload the stored engagement counters after a signal updated them."""
+    recipe.refresh_from_db(fields=COUNTER_FIELDS)
+    return recipe
+
+
 @login_required
 def rate_recipe(request, pk):
     """Rate a recipe."""
@@ -906,10 +917,10 @@ def rate_recipe(request, pk):
             )
             
             # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='rate_recipe',
-                details=f"Rated recipe: {recipe.title} ({rating.rating}/5)"
+            log_activity(
+                request.user,
+                'rate_recipe',
+                f"Rated recipe: {recipe.title} ({rating.rating}/5)"
             )
             
             message = "Thank you for rating this recipe!"
@@ -919,6 +930,7 @@ def rate_recipe(request, pk):
             )
             
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+                _refreshed_counters(recipe)
                 return JsonResponse({
                     'success': True,
                     'message': message,
@@ -958,16 +970,16 @@ def add_comment(request, pk):
             # Handle reply to comment
             parent_id = request.POST.get('parent_id')
             if parent_id:
-                parent_comment = get_object_or_404(RecipeComment, pk=parent_id)
+                parent_comment = get_object_or_404(RecipeComment, pk=parent_id, recipe=recipe)
                 comment.parent = parent_comment
             
             comment.save()
             
             # Log activity
-            ActivityLog.objects.create(
-                user=request.user,
-                action='add_comment',
-                details=f"Commented on recipe: {recipe.title}"
+            log_activity(
+                request.user,
+                'add_comment',
+                f"Commented on recipe: {recipe.title}"
             )
             
             messages.success(request, "Comment added successfully!")